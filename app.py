@@ -2,11 +2,20 @@ import os
 
 os.environ["STREAMLIT_WATCH_USE_POLLING"] = "true"
 import os
+import io
+import re
+import gzip
+import time
+import hashlib
 import configparser
+from types import MappingProxyType
 import pandas as pd
 import streamlit as st
 from datetime import datetime, timedelta
 import src.functions as functions
+import src.search_index as search_index
+from src.background_jobs import GestorTrabajos
+from src.latency_log import MedidorLatencias, resumen_log
 from unidecode import unidecode
 import numpy as np
 
@@ -23,6 +32,18 @@ def cargar_config(config_file="./config/scraper_config.ini"):
     return output_dir
 
 
+def cargar_params_app(config_file="./config/scraper_config.ini"):
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    with open(config_file, encoding='utf-8') as f:
+        config.read_file(f)
+    return {
+        "tamano_pagina": config.getint('app_params', 'tamano_pagina', fallback=100),
+        "log_latencias": config.get('app_params', 'log_latencias', fallback=None),
+        "max_kb_log_latencias": config.getint('app_params', 'max_kb_log_latencias', fallback=5120),
+    }
+
+
 def cargar_columns_ini(columns_file="./config/scraper_columns.ini"):
     config = configparser.ConfigParser()
     config.optionxform = str
@@ -46,8 +67,10 @@ def cargar_columns_ini(columns_file="./config/scraper_columns.ini"):
 # -------------------------------
 # Cargar datos
 # -------------------------------
-@st.cache_data(show_spinner=False)
-def cargar_datos(output_dir, file_mtime):
+SEPARADOR_BUSQUEDA = "\x1f"
+
+
+def cargar_datos(output_dir):
     filename = "licitaciones.csv"
     csv_path = os.path.join(output_dir, filename)
     if not os.path.exists(csv_path):
@@ -57,6 +80,339 @@ def cargar_datos(output_dir, file_mtime):
     return df, csv_path
 
 
+def construir_campo_busqueda(df):
+    """
+    Texto de búsqueda por fila: columnas de texto en minúsculas y sin acentos,
+    concatenadas con un separador que no puede aparecer en una palabra clave.
+    Se calcula una vez por versión del CSV (ver cargar_dataset).
+    """
+    partes = []
+    for col in df.select_dtypes(include=['object']).columns:
+        valores = df[col].astype(str)
+        # unidecode solo una vez por valor distinto
+        plegados = {v: unidecode(v.lower()) for v in valores.unique()}
+        partes.append(valores.map(plegados))
+    if not partes:
+        return pd.Series("", index=df.index)
+    campo = partes[0]
+    for parte in partes[1:]:
+        campo = campo + SEPARADOR_BUSQUEDA + parte
+    return campo
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def cargar_dataset(output_dir, file_mtime, indice_mtime, _medidor=None):
+    """
+    Dataset compartido por todas las sesiones del servidor (una sola copia en memoria):
+    DataFrame renombrado, campo de búsqueda, metadatos de filtros e índice invertido.
+
+    Se construye completo antes de devolverse y, con max_entries=1, un cambio en el
+    mtime de licitaciones.csv (o del índice) lo sustituye de forma atómica: las sesiones
+    que estén a mitad de ejecución siguen usando la versión anterior hasta terminar.
+    Es de solo lectura: nunca se modifica en sitio.
+
+    _medidor (no hasheado) recibe los tiempos de cada paso solo en el rerun que construye el dataset;
+    dentro del tramo "dataset" se registran como "dataset/<paso>".
+    """
+    medidor = _medidor or MedidorLatencias()
+    with medidor.tramo("carga_csv") as tramo:
+        df, csv_path = cargar_datos(output_dir)
+        if df is None:
+            return None
+        tramo["filas"] = len(df)
+    with medidor.tramo("renombrar", filas=len(df)):
+        rename_dict, cols_filtrar = cargar_columns_ini()
+        df = renombrar_columnas(df, rename_dict)
+
+    aviso_indice = None
+    with medidor.tramo("carga_indice"):
+        indice, aviso_indice = cargar_indice(output_dir)
+        if indice is not None and indice.huella != search_index.huella_csv(csv_path):
+            # El índice no corresponde a esta versión del CSV: se usa la búsqueda por subcadena sin prefiltro
+            aviso_indice = "el índice de búsqueda no corresponde a la versión actual de licitaciones.csv"
+            indice = None
+        if aviso_indice:
+            print(f"⚠️ Índice de búsqueda descartado: {aviso_indice}")
+
+    with medidor.tramo("campo_busqueda", filas=len(df)):
+        campo_busqueda = construir_campo_busqueda(df)
+    with medidor.tramo("metadatos_filtros", filas=len(df)):
+        metadatos = calcular_metadatos_filtros(df, cols_filtrar)
+
+    return MappingProxyType({
+        "df": df,
+        "campo_busqueda": campo_busqueda,
+        "metadatos": metadatos,
+        "indice": indice,
+        "aviso_indice": aviso_indice,
+    })
+
+
+def filtrar_por_palabras(campo_busqueda, palabras, modo="OR"):
+    """
+    Máscara booleana de las filas que contienen alguna (OR) o todas (AND) las palabras.
+    En modo OR es una sola pasada vectorizada.
+    """
+    if modo == "AND":
+        mask = pd.Series(True, index=campo_busqueda.index)
+        for palabra in palabras:
+            mask &= campo_busqueda.str.contains(palabra, regex=False, na=False)
+        return mask
+    patron = "|".join(re.escape(p) for p in palabras)
+    return campo_busqueda.str.contains(patron, regex=True, na=False)
+
+
+def filtrar_con_indice(campo_busqueda, palabras, modo, indice, n_filas):
+    """
+    Máscara de la búsqueda por palabras con el índice invertido. Una palabra coincide en una fila
+    si está como subcadena en el texto del CSV (solo se comprueban los candidatos del índice) o
+    si el índice la encuentra entre los términos del PDF de la fila. Las palabras sin caracteres
+    alfanuméricos no se pueden prefiltrar y se buscan en todo campo_busqueda.
+    """
+    mascaras = []
+    for palabra in palabras:
+        candidatos = indice.candidatos_csv(palabra)
+        if candidatos is None:
+            mascara = filtrar_por_palabras(campo_busqueda, [palabra]).to_numpy().copy()
+        else:
+            posiciones = np.asarray(candidatos, dtype=np.int64)
+            posiciones = posiciones[posiciones < n_filas]
+            mascara = np.zeros(n_filas, dtype=bool)
+            if len(posiciones):
+                confirmados = filtrar_por_palabras(campo_busqueda.iloc[posiciones], [palabra]).to_numpy()
+                mascara[posiciones[confirmados]] = True
+        posiciones_pdf = np.asarray(indice.coincidencias_pdf(palabra), dtype=np.int64)
+        mascara[posiciones_pdf[posiciones_pdf < n_filas]] = True
+        mascaras.append(mascara)
+    if not mascaras:
+        return np.ones(n_filas, dtype=bool) if modo == "AND" else np.zeros(n_filas, dtype=bool)
+    return np.logical_and.reduce(mascaras) if modo == "AND" else np.logical_or.reduce(mascaras)
+
+
+def cargar_indice(output_dir):
+    """
+    Carga el índice invertido generado por main_scraping.py.
+
+    Returns:
+        tuple: (índice o None, motivo por el que no se pudo cargar o None)
+    """
+    ruta = os.path.join(output_dir, search_index.NOMBRE_INDICE)
+    if not os.path.exists(ruta):
+        return None, None
+    try:
+        return search_index.IndiceInvertido.cargar(ruta), None
+    except Exception as e:
+        return None, f"error leyendo {ruta}: {e}"
+
+
+def renombrar_columnas(df, rename_dict):
+    """
+    Aplica rename_dict solo a las columnas existentes y elimina columnas duplicadas.
+    """
+    columns_to_rename = {k: v for k, v in rename_dict.items() if k in df.columns}
+    df = df.rename(columns=columns_to_rename)
+    if df.columns.duplicated().any():
+        # Eliminar columnas duplicadas manteniendo la primera aparición
+        df = df.loc[:, ~df.columns.duplicated()]
+    return df
+
+
+def _opciones_ordenadas(serie):
+    opciones = serie.unique().tolist()
+    try:
+        return sorted(opciones)
+    except TypeError:
+        return sorted(opciones, key=str)
+
+
+def calcular_metadatos_filtros(df, cols_filtrar):
+    """
+    Metadatos de los filtros del sidebar (opciones, rangos, cuantiles y fechas parseadas)
+    sobre el DataFrame ya renombrado. Se calculan una vez por versión del CSV (ver cargar_dataset):
+    los widgets los reutilizan y cada interacción solo evalúa las máscaras.
+    """
+    metadatos = {"clasificacion": None, "columnas": {}, "fechas": {}, "fecha_ejecucion": None,
+                 "expedientes": df["Nº Expediente"].astype(str) if "Nº Expediente" in df.columns
+                 else pd.Series("", index=df.index)}
+
+    if 'Fecha Ejecución Proceso' in df.columns:
+        fechas_proceso = pd.to_datetime(df['Fecha Ejecución Proceso'], errors='coerce').dropna()
+        if not fechas_proceso.empty:
+            metadatos["fecha_ejecucion"] = fechas_proceso.max().strftime("%Y-%m-%d")
+
+    clasificacion_cols = [col for col in df.columns if 'clasificacion' in col.lower()]
+    if clasificacion_cols:
+        # Si hay múltiples columnas con 'clasificacion', usar la primera
+        col_clasificacion = clasificacion_cols[0]
+        metadatos["clasificacion"] = {
+            "columna": col_clasificacion,
+            "multiples": len(clasificacion_cols) > 1,
+            "opciones": _opciones_ordenadas(df[col_clasificacion].fillna("No clasificado")),
+        }
+
+    for col in cols_filtrar:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_bool_dtype(df[col]):
+            metadatos["columnas"][col] = {"tipo": "bool"}
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            col_data = df[col].dropna()
+            if col_data.empty or col_data.min() == col_data.max():
+                continue
+            q_high = float(col_data.quantile(0.95))
+            metadatos["columnas"][col] = {
+                "tipo": "numerico",
+                "min": float(col_data.min()),
+                "max": float(col_data.max()),
+                "q_high": q_high,
+                "n_sobre_q_high": int((col_data > q_high).sum()),
+            }
+        elif col == "Fecha Límite Presentación":
+            fechas = pd.to_datetime(df[col], errors="coerce")
+            fechas_validas = fechas.dropna()
+            metadatos["fechas"][col] = fechas
+            metadatos["columnas"][col] = {
+                "tipo": "fecha",
+                "fecha_max": fechas_validas.max().date() if not fechas_validas.empty else None,
+            }
+        else:
+            metadatos["columnas"][col] = {"tipo": "categorico",
+                                          "opciones": _opciones_ordenadas(df[col].fillna(""))}
+    return metadatos
+
+
+def evaluar_plan(df, plan, metadatos, campo_busqueda=None, indice=None):
+    """
+    Evalúa el plan de filtrado como una única máscara booleana de NumPy sobre el DataFrame base.
+
+    Cada condición es una tupla (tipo, columna, argumentos):
+    - ("palabras", None, (modo, palabras)): búsqueda por subcadena de cada palabra o frase en
+      campo_busqueda; con índice, solo sobre sus candidatos y contando también el PDF
+    - ("valores", col, (relleno, valores)): col (con NaN → relleno si no es None) en valores
+    - ("rango", col, (minimo, maximo)): minimo <= col <= maximo
+    - ("fecha_hasta", col, (fecha,)): fecha parseada de col <= fecha (día completo)
+
+    Returns:
+        tuple: (mascara, puntuaciones) donde puntuaciones es {posición: BM25} si la búsqueda usó el índice.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    puntuaciones = None
+    for tipo, col, args in plan:
+        if tipo == "palabras":
+            modo, palabras = args
+            if indice is None:
+                mask &= filtrar_por_palabras(campo_busqueda, list(palabras), modo=modo).to_numpy()
+            else:
+                mask &= filtrar_con_indice(campo_busqueda, list(palabras), modo, indice, len(df))
+            if indice is not None:
+                puntuaciones = indice.buscar(indice.terminos_consulta(palabras))
+        elif tipo == "valores":
+            relleno, valores = args
+            serie = df[col] if relleno is None else df[col].fillna(relleno)
+            mask &= serie.isin(valores).to_numpy()
+        elif tipo == "rango":
+            minimo, maximo = args
+            serie = df[col].to_numpy()
+            mask &= (serie >= minimo) & (serie <= maximo)
+        elif tipo == "fecha_hasta":
+            limite = pd.Timestamp(args[0]) + timedelta(days=1)
+            mask &= (metadatos["fechas"][col] < limite).to_numpy()
+    return mask, puntuaciones
+
+
+def formatos_exportacion():
+    """
+    Formatos de descarga disponibles: {nombre: (extensión, mime)}. XLSX solo si está openpyxl.
+    """
+    formatos = {
+        "CSV": ("csv", "text/csv"),
+        "CSV comprimido (gzip)": ("csv.gz", "application/gzip"),
+        "Parquet": ("parquet", "application/octet-stream"),
+    }
+    try:
+        import openpyxl  # noqa: F401
+        formatos["Excel (XLSX)"] = ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    except ImportError:
+        pass
+    return formatos
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def exportar_bytes(_df, _columnas, clave, formato):
+    """
+    Serializa las columnas pedidas del DataFrame en el formato indicado. _df y _columnas no se
+    hashean: la caché se indexa por 'clave' (hash del plan de filtrado) y formato, así que
+    repetir una descarga es inmediato.
+    """
+    _df = _df[[col for col in _columnas if col in _df.columns]].drop(columns=["Favorito"], errors='ignore')
+    if formato == "CSV comprimido (gzip)":
+        return gzip.compress(_df.to_csv(index=False).encode("utf-8"))
+    if formato == "Parquet":
+        buffer = io.BytesIO()
+        _df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    if formato == "Excel (XLSX)":
+        buffer = io.BytesIO()
+        _df.to_excel(buffer, index=False)
+        return buffer.getvalue()
+    return _df.to_csv(index=False).encode("utf-8")
+
+
+def boton_descarga_lazy(etiqueta, df, columnas, nombre_base, formato, clave):
+    """
+    Muestra primero un botón "Preparar"; solo tras pulsarlo se generan los bytes (memoizados por clave)
+    y aparece el botón de descarga. Mientras no cambie el plan de filtrado, la descarga sigue lista.
+    """
+    clave_estado = f"descarga_preparada_{nombre_base}"
+    clave_completa = f"{clave}-{formato}"
+    if st.session_state.get(clave_estado) != clave_completa:
+        if st.button(f"⚙️ Preparar {etiqueta}", key=f"preparar_{nombre_base}"):
+            st.session_state[clave_estado] = clave_completa
+        else:
+            return
+    extension, mime = formatos_exportacion()[formato]
+    st.download_button(f"📥 Descargar {etiqueta}", data=exportar_bytes(df, columnas, clave, formato),
+                       file_name=f"{nombre_base}.{extension}", mime=mime, key=f"descargar_{nombre_base}")
+
+
+COLOR_FAVORITO = 'background-color: #fff3b0'
+COLOR_COINCIDENCIA = 'background-color: #ffe5e5'
+
+
+def matriz_resaltado(df):
+    """
+    Matriz de estilos (filas x columnas) para Styler.apply(axis=None), calculada de forma
+    vectorizada a partir de las columnas booleanas Favorito y CoincidePalabra.
+    """
+    n = len(df)
+    favorito = df["Favorito"].fillna(False).to_numpy(dtype=bool) if "Favorito" in df.columns else np.zeros(n, bool)
+    coincide = df["CoincidePalabra"].fillna(False).to_numpy(dtype=bool) if "CoincidePalabra" in df.columns \
+        else np.zeros(n, bool)
+    color_fila = np.select([favorito, coincide], [COLOR_FAVORITO, COLOR_COINCIDENCIA], default='')
+    return pd.DataFrame(np.repeat(color_fila[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+
+ORDEN_POR_DEFECTO = "(Relevancia)"
+
+
+def ordenar_y_paginar(df, columna_orden, ascendente, pagina, tamano_pagina):
+    """
+    Devuelve las etiquetas de índice de la página pedida. La ordenación se hace sobre
+    la columna (no sobre el DataFrame completo) y los favoritos quedan siempre arriba.
+    """
+    orden = df.index
+    if columna_orden != ORDEN_POR_DEFECTO and columna_orden in df.columns:
+        try:
+            orden = df[columna_orden].sort_values(ascending=ascendente, kind="stable", na_position="last").index
+        except TypeError:
+            # Columna con tipos mezclados: se ordena por su representación en texto
+            orden = df[columna_orden].astype(str).sort_values(ascending=ascendente, kind="stable").index
+    if "Favorito" in df.columns:
+        orden = df["Favorito"].loc[orden].sort_values(ascending=False, kind="stable").index
+    inicio = (pagina - 1) * tamano_pagina
+    return orden[inicio:inicio + tamano_pagina]
+
+
 # -------------------------------
 # Aplicar filtros principales
 # -------------------------------
@@ -73,36 +429,140 @@ def aplica_filtros_base(df, fecha_ini):
 # -----------------------------------------------------------
 # Buscar actualizaciones en WEBs para licitaciones favoritas
 # -----------------------------------------------------------
-def buscar_actualizaciones_favs(favoritos_df):
-    try:
-        from web_scraping.WS_licitaciones_favs import ScraperLicFav
+def buscar_actualizaciones_favs(favoritos_df, progreso=None):
+    """
+    Busca documentos nuevos en las webs de las licitaciones favoritas.
+    Se ejecuta en un hilo en segundo plano (ver gestor_trabajos), por lo que no usa st.*:
+    los errores se lanzan como excepción y el progreso se informa por el callable 'progreso'.
+    """
+    from web_scraping.WS_licitaciones_favs import ScraperLicFav
+
+    if 'Fecha Ejecución Proceso' not in favoritos_df.columns:
+        raise ValueError("No se encontró 'Fecha Ejecución Proceso' en las filas favoritas.")
+    fecha_ultima_eje = pd.to_datetime(favoritos_df['Fecha Ejecución Proceso'], errors='coerce').max()
+
+    hoy = datetime.today().date()
+    config_path = "./config/scraper_config.ini"
+
+    scraper = ScraperLicFav(
+        df=favoritos_df,
+        fecha_ultima_eje=fecha_ultima_eje,
+        fecha=hoy,
+        url_col="URL",
+        fuente_col="Fuente",
+        config_file=config_path
+    )
+    return scraper.ejecutar(progreso=progreso)
 
-        if 'Fecha Ejecución Proceso' in favoritos_df.columns:
-            fecha_ultima_eje = pd.to_datetime(favoritos_df['Fecha Ejecución Proceso'], errors='coerce').max()
-        else:
-            st.warning("⚠️ No se encontró 'Fecha Ejecución Proceso' en las filas favoritas.")
-            return None
 
-        hoy = datetime.today().date()
-        config_path = "./config/scraper_config.ini"
+@st.cache_resource
+def gestor_trabajos():
+    """
+    Gestor de trabajos en segundo plano compartido por todas las sesiones (un único hilo
+    para no abrir varios navegadores a la vez).
+    """
+    return GestorTrabajos(max_workers=1)
 
-        scraper = ScraperLicFav(
-            df=favoritos_df,
-            fecha_ultima_eje=fecha_ultima_eje,
-            fecha=hoy,
-            url_col="URL",
-            fuente_col="Fuente",
-            config_file=config_path
-        )
-        resultado_df = scraper.ejecutar()
 
-        return resultado_df
-    except ImportError:
-        st.error("❌ Error: No se pudo importar el módulo de scraping")
-        return None
-    except Exception as e:
-        st.error(f"❌ Error buscando actualizaciones: {e}")
-        return None
+def mostrar_resultado_actualizaciones(resultado):
+    if 'Actualización' in resultado.columns and resultado['Actualización'].sum() > 0:
+        st.success(
+            f"✅ Se encontraron {resultado['Actualización'].sum()} licitaciones con actualizaciones")
+    else:
+        st.error(f"❌ No se encontraron actualizaciones")
+
+    # Mostrar resultados solo si hay columnas válidas
+    cols_resultado = [col for col in ['Titulo', 'Nº Expediente', 'URL', 'Actualización'] if
+                      col in resultado.columns]
+    if cols_resultado:
+        st.dataframe(resultado[cols_resultado],
+                     column_config={
+                         "URL": st.column_config.LinkColumn("URL")} if "URL" in cols_resultado else {},
+                     hide_index=True,
+                     use_container_width=True)
+
+    if 'Actualización' in resultado.columns and resultado['Actualización'].sum() > 0:
+        st.markdown("##### 📄 Detalles de actualizaciones por licitación")
+        for idx, row in resultado.iterrows():
+            url = row.get("URL", f"Licitación {idx}")
+            nuevos_docs = row.get("Nuevos Documentos", [])
+            if nuevos_docs:
+                with st.expander(f"🔍 Ver detalles de: {url} ({len(nuevos_docs)} documentos nuevos)"):
+                    st.json(nuevos_docs, expanded=True)
+
+        csv_res = resultado.to_csv(index=False).encode("utf-8")
+        st.download_button("📥 Descargar resultados de actualizaciones",
+                           data=csv_res,
+                           file_name="actualizaciones_favoritas.csv",
+                           mime="text/csv")
+
+
+def mostrar_progreso_favs(trabajo):
+    eventos = trabajo.progreso()
+    hechos = len(eventos)
+    st.progress(hechos / trabajo.total if trabajo.total else 0.0,
+                text=f"Buscando actualizaciones en favoritos: {hechos}/{trabajo.total} "
+                     f"({time.time() - trabajo.inicio:.0f}s)")
+    for evento in eventos:
+        if evento.get('error'):
+            st.caption(f"❌ {evento['url']}: {evento['error']}")
+        else:
+            st.caption(f"✅ {evento['url']}: {evento['nuevos_documentos']} documentos nuevos")
+
+
+def panel_actualizaciones_favs(df_favs):
+    """
+    Lanza (o recupera) la búsqueda de actualizaciones de favoritos como trabajo en segundo
+    plano y muestra su progreso; el resto de la app sigue respondiendo mientras tanto.
+    """
+    gestor = gestor_trabajos()
+    col_exp = 'Nº Expediente' if 'Nº Expediente' in df_favs.columns else None
+    expedientes = sorted(df_favs[col_exp].astype(str)) if col_exp else sorted(df_favs.get("URL", pd.Series(dtype=str)).astype(str))
+    clave = hashlib.md5(repr((expedientes, datetime.today().date().isoformat())).encode("utf-8")).hexdigest()
+
+    trabajo = gestor.obtener(st.session_state.get("trabajo_favs"))
+    if trabajo is None or trabajo.clave != clave:
+        trabajo = gestor.buscar_por_clave(clave)
+
+    col_boton, col_refresco = st.columns([3, 1])
+    with col_boton:
+        lanzar = st.button("🔍 Buscar actualizaciones en licitaciones favoritas",
+                           disabled=trabajo is not None and not trabajo.terminado())
+    with col_refresco:
+        auto_refresco = st.checkbox("Actualizar progreso automáticamente", value=False, key="auto_refresco_favs")
+
+    if lanzar:
+        trabajo = gestor.enviar(
+            clave,
+            lambda t: buscar_actualizaciones_favs(df_favs, progreso=t.registrar_progreso),
+            total=len(df_favs),
+            forzar=trabajo is not None and trabajo.terminado(),
+        )
+    if trabajo is None:
+        return
+    st.session_state["trabajo_favs"] = trabajo.id
+
+    if not trabajo.terminado():
+        if auto_refresco:
+            # Solo se redibuja el bloque de progreso (sin volver a ejecutar toda la app) hasta que
+            # el trabajo termina; cualquier interacción del usuario interrumpe la espera
+            hueco = st.empty()
+            while not trabajo.terminado():
+                with hueco.container():
+                    mostrar_progreso_favs(trabajo)
+                time.sleep(2)
+            st.rerun()
+        mostrar_progreso_favs(trabajo)
+        if st.button("🔄 Refrescar progreso"):
+            st.rerun()
+        return
+    estado, resultado, error, fin = trabajo.instantanea()
+    if estado == trabajo.ERROR:
+        st.error(f"❌ Error buscando actualizaciones: {error}")
+    elif resultado is not None:
+        st.caption(f"Última búsqueda: {datetime.fromtimestamp(fin).strftime('%H:%M:%S')} "
+                   f"({fin - trabajo.inicio:.0f}s)")
+        mostrar_resultado_actualizaciones(resultado)
 
 
 def diagnosticar_columnas(df, nombre_df="DataFrame"):
@@ -127,29 +587,57 @@ def diagnosticar_columnas(df, nombre_df="DataFrame"):
 # -------------------------------
 # MAIN APP
 # -------------------------------
+def diagnosticar_latencias(medidor, ruta_log):
+    """Panel con los tiempos por etapa de este rerun y los p50/p95 acumulados en el log local"""
+    try:
+        with st.sidebar.expander("⏱️ Latencias por etapa", expanded=True):
+            st.markdown(f"**Este rerun:** {medidor.total_ms():.0f} ms")
+            st.dataframe(pd.DataFrame(medidor.tramos, columns=["etapa", "ms", "filas", "padre"]),
+                         hide_index=True, use_container_width=True)
+
+            resumen = resumen_log(ruta_log)
+            if resumen:
+                st.markdown(f"**Histórico** (`{ruta_log}`, últimos {resumen['total']['n']} reruns):")
+                st.dataframe(pd.DataFrame([{"etapa": etapa, **valores} for etapa, valores in resumen.items()]),
+                             hide_index=True, use_container_width=True)
+    except Exception as e:
+        st.sidebar.error(f"Error en diagnóstico de latencias: {e}")
+
+
 def main():
+    # Cada rerun registra sus tiempos por etapa; se añaden al log aunque el script termine con st.stop()
+    medidor = MedidorLatencias()
+    try:
+        renderizar_app(medidor)
+    finally:
+        params_app = cargar_params_app()
+        medidor.guardar(params_app["log_latencias"], max_bytes=params_app["max_kb_log_latencias"] * 1024)
+
+
+def renderizar_app(medidor):
     st.set_page_config(page_title="Buscador de Licitaciones Públicas", layout="wide", page_icon="📁")
     st.title("🔍 Buscador de Licitaciones Públicas")
     st.markdown(f"🕒 Última actualización de la app: `{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}`")
 
     output_dir = cargar_config()
-    rename_dict, _ = cargar_columns_ini()
     csv_path = os.path.join(output_dir, "licitaciones.csv")
+    indice_path = os.path.join(output_dir, search_index.NOMBRE_INDICE)
     file_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else 0
-    df, _ = cargar_datos(output_dir, file_mtime)
-
-    if df is not None and not df.empty:
-        # Aplicar rename_dict solo a columnas que existen en el DataFrame
-        columns_to_rename = {k: v for k, v in rename_dict.items() if k in df.columns}
-        df = df.rename(columns=columns_to_rename)
-
-        if 'Fecha Ejecución Proceso' in df.columns:
-            fechas_proceso = pd.to_datetime(df['Fecha Ejecución Proceso'], errors='coerce').dropna()
-            if not fechas_proceso.empty:
-                fecha_ejecucion = fechas_proceso.max().strftime("%Y-%m-%d")
-                st.info(f"**Fecha de ejecución del scraping:** {fecha_ejecucion}")
-            else:
-                st.info(f"**Fecha de ejecución del scraping:** No disponible")
+    indice_mtime = os.path.getmtime(indice_path) if os.path.exists(indice_path) else 0
+    with medidor.tramo("dataset"):
+        dataset = cargar_dataset(output_dir, file_mtime, indice_mtime, _medidor=medidor)
+
+    if dataset is not None and not dataset["df"].empty:
+        # Referencias al dataset compartido: solo lectura, cada sesión trabaja con máscaras y vistas
+        df = dataset["df"]
+        campo_busqueda = dataset["campo_busqueda"]
+        metadatos = dataset["metadatos"]
+        indice = dataset["indice"]
+        if dataset["aviso_indice"]:
+            st.caption(f"ℹ️ Búsqueda sin índice ({dataset['aviso_indice']}): los resultados no se ordenan por relevancia.")
+
+        if metadatos["fecha_ejecucion"]:
+            st.info(f"**Fecha de ejecución del scraping:** {metadatos['fecha_ejecucion']}")
         else:
             st.info(f"**Fecha de ejecución del scraping:** No disponible")
     else:
@@ -195,342 +683,254 @@ def main():
         value=st.session_state["palabras_clave_input"],
         on_change=actualizar_palabras
     )
+    modo_busqueda = "AND" if st.radio(
+        "Coincidencia de palabras clave",
+        ["Cualquier palabra", "Todas las palabras"],
+        horizontal=True,
+        key="modo_busqueda"
+    ) == "Todas las palabras" else "OR"
 
-    # Base de datos para mostrar
-    df_base = df.copy()
-
-    # Diagnósticar y limpiar columnas duplicadas si las hay
-    if df_base.columns.duplicated().any():
-        # Eliminar columnas duplicadas manteniendo la primera aparición
-        df_base = df_base.loc[:, ~df_base.columns.duplicated()]
+    # Base de datos para mostrar (columnas duplicadas ya eliminadas en renombrar_columnas).
+    # No se copia: los filtros se acumulan en un plan y se materializa una sola vez al final.
+    df_base = df
 
     # Llamar diagnóstico si hay problemas
     if st.sidebar.checkbox("🔍 Mostrar diagnóstico de columnas", False):
         diagnosticar_columnas(df_base, "DataFrame base")
+    mostrar_latencias = st.sidebar.checkbox("⏱️ Mostrar latencias por etapa", False)
 
-    df_base["Favorito"] = df_base["Nº Expediente"].astype(str).isin(st.session_state.get("expedientes_favoritos", []))
-
-    df_favoritos = df_base[df_base["Favorito"]].copy()
-    df_no_favoritos = df_base[~df_base["Favorito"]].copy()
+    # Plan de filtrado: cada widget añade una condición (tipo, columna, argumentos)
+    plan = []
 
     # Búsqueda por palabras clave
-    df_no_favoritos["CoincidePalabra"] = False
     if "palabras_clave" in st.session_state and st.session_state["palabras_clave"]:
-        mask = pd.Series(False, index=df_no_favoritos.index)
-        for col in df_no_favoritos.select_dtypes(include=['object']).columns:
-            col_sin_acentos = df_no_favoritos[col].astype(str).apply(lambda x: unidecode(x.lower()))
-            for palabra in st.session_state["palabras_clave"]:
-                mask |= col_sin_acentos.str.contains(palabra, na=False)
-        df_no_favoritos = df_no_favoritos[mask]
-        df_no_favoritos["CoincidePalabra"] = True
-
-    # Filtros dinámicos
-    with st.sidebar.expander("🎛️ Filtros dinámicos y columnas"):
-        cols_mostrar = [c for c in df_base.columns if c not in ['Favorito']]
-        try:
-            cols_filtrar = cargar_columns_ini()[1]
-        except:
-            cols_filtrar = df_base.columns
+        plan.append(("palabras", None, (modo_busqueda, tuple(st.session_state["palabras_clave"]))))
 
-        # Verificar que cols_filtrar solo contenga columnas que existen
-        cols_filtrar = [col for col in cols_filtrar if col in df_no_favoritos.columns]
+    # Filtros dinámicos (opciones y rangos precalculados una vez por versión del dataset)
+    with st.sidebar.expander("🎛️ Filtros dinámicos y columnas"):
+        cols_mostrar = list(df_base.columns)
 
         # Filtro específico Clasificación en el sidebar
-        clasificacion_cols = [col for col in df_no_favoritos.columns if 'clasificacion' in col.lower()]
-
-        if clasificacion_cols:
-            # Si hay múltiples columnas con 'clasificacion', usar la primera
-            col_clasificacion = clasificacion_cols[0]
-            if len(clasificacion_cols) > 1:
+        meta_clasificacion = metadatos["clasificacion"]
+        if meta_clasificacion:
+            col_clasificacion = meta_clasificacion["columna"]
+            if meta_clasificacion["multiples"]:
                 st.sidebar.info(f"📋 Múltiples columnas de clasificación encontradas. Usando: {col_clasificacion}")
 
-            try:
-                # Obtener la serie de forma segura
-                clasificacion_series = df_no_favoritos[col_clasificacion]
-
-                # Verificar que es una Series
-                if isinstance(clasificacion_series, pd.Series):
-                    opciones_clasificacion = sorted(
-                        clasificacion_series.fillna("No clasificado").unique().tolist()
-                    )
-                    seleccionadas_clasificacion = st.sidebar.multiselect(
-                        f"Clasificación ({col_clasificacion})",
-                        options=opciones_clasificacion,
-                        key="filtro_clasificacion"
-                    )
-                    if seleccionadas_clasificacion:
-                        df_no_favoritos = df_no_favoritos[
-                            df_no_favoritos[col_clasificacion].isin(seleccionadas_clasificacion)
-                        ]
-                else:
-                    st.sidebar.warning(f"⚠️ '{col_clasificacion}' no es una columna válida")
-            except Exception as e:
-                st.sidebar.error(f"Error procesando clasificación: {e}")
-        elif "clasificacion" in df_no_favoritos.columns:
-            # Fallback para el código original
-            try:
-                clasificacion_series = df_no_favoritos["clasificacion"]
-                if hasattr(clasificacion_series, 'unique'):
-                    opciones_clasificacion = sorted(
-                        clasificacion_series.fillna("No clasificado").unique().tolist()
-                    )
-                    seleccionadas_clasificacion = st.sidebar.multiselect(
-                        "Clasificación",
-                        options=opciones_clasificacion,
-                        key="filtro_clasificacion"
-                    )
-                    if seleccionadas_clasificacion:
-                        df_no_favoritos = df_no_favoritos[
-                            df_no_favoritos["clasificacion"].isin(seleccionadas_clasificacion)
-                        ]
-                else:
-                    st.sidebar.warning("⚠️ Error en la columna 'clasificacion'")
-            except Exception as e:
-                st.sidebar.error(f"Error procesando clasificación: {e}")
+            seleccionadas_clasificacion = st.sidebar.multiselect(
+                f"Clasificación ({col_clasificacion})",
+                options=meta_clasificacion["opciones"],
+                key="filtro_clasificacion"
+            )
+            if seleccionadas_clasificacion:
+                plan.append(("valores", col_clasificacion, ("No clasificado", tuple(seleccionadas_clasificacion))))
 
-        for col in cols_filtrar:
+        for col, meta in metadatos["columnas"].items():
             # Verificación adicional de que la columna existe
-            if col not in df_no_favoritos.columns:
+            if col not in df_base.columns:
                 continue
 
-            if pd.api.types.is_bool_dtype(df_base[col]):
-                opciones = [True, False]
-                seleccionadas = st.sidebar.multiselect(f"{col}", options=opciones, key=f"filtro_{col}")
+            if meta["tipo"] == "bool":
+                seleccionadas = st.sidebar.multiselect(f"{col}", options=[True, False], key=f"filtro_{col}")
                 if seleccionadas and len(seleccionadas) < 2:
-                    df_no_favoritos = df_no_favoritos[df_no_favoritos[col].isin(seleccionadas)]
-
-            elif pd.api.types.is_numeric_dtype(df_base[col]):
-                # Verificar que la columna existe y tiene datos
-                if col not in df_no_favoritos.columns:
-                    continue
-
-                col_data = df_no_favoritos[col].dropna()
-                if not col_data.empty and col_data.min() != col_data.max():
-                    max_quantile = 0.95
-                    min_val = float(col_data.min())
-                    max_val = float(col_data.max())
-                    q_high = float(col_data.quantile(max_quantile))
-
-                    # Checkbox para excluir outliers
-                    excluir_outliers = st.sidebar.checkbox(
-                        f"📉 Excluir valores máximos atípicos en {col}",
-                        value=True,
-                        key=f"outliers_{col}"
+                    plan.append(("valores", col, (None, tuple(seleccionadas))))
+
+            elif meta["tipo"] == "numerico":
+                min_val = meta["min"]
+                max_val = meta["max"]
+                q_high = meta["q_high"]
+
+                # Checkbox para excluir outliers
+                excluir_outliers = st.sidebar.checkbox(
+                    f"📉 Excluir valores máximos atípicos en {col}",
+                    value=True,
+                    key=f"outliers_{col}"
+                )
+
+                max_slider_val = q_high if excluir_outliers else max_val
+
+                if excluir_outliers:
+                    st.sidebar.markdown(
+                        f"<small style='color: grey;'>ℹ️ Se excluyen {meta['n_sobre_q_high']} licitaciones con valor superior a {q_high:,.2f}</small>",
+                        unsafe_allow_html=True
                     )
 
-                    max_slider_val = q_high if excluir_outliers else max_val
-
-                    if excluir_outliers:
-                        n_excluidas = (col_data > q_high).sum()
-                        st.sidebar.markdown(
-                            f"<small style='color: grey;'>ℹ️ Se excluyen {n_excluidas} licitaciones con valor superior a {q_high:,.2f}</small>",
-                            unsafe_allow_html=True
-                        )
-
-                    # Slider principal
-                    slider_vals = st.sidebar.slider(
-                        f"{col}",
-                        min_value=min_val,
-                        max_value=max_slider_val,
-                        value=(min_val, max_slider_val),
-                        step=(max_slider_val - min_val) / 100 if max_slider_val > min_val else 1.0,
-                        format="%.2f",
-                        key=f"slider_{col}"
+                # Slider principal
+                slider_vals = st.sidebar.slider(
+                    f"{col}",
+                    min_value=min_val,
+                    max_value=max_slider_val,
+                    value=(min_val, max_slider_val),
+                    step=(max_slider_val - min_val) / 100 if max_slider_val > min_val else 1.0,
+                    format="%.2f",
+                    key=f"slider_{col}"
+                )
+
+                # Inputs manuales debajo del slider
+                col_input_min, col_input_max = st.sidebar.columns(2)
+                with col_input_min:
+                    input_min = st.number_input(
+                        f"Mín. {col}",
+                        value=float(slider_vals[0]),
+                        key=f"{col}_min_input",
+                        format="%.2f"
+                    )
+                with col_input_max:
+                    input_max = st.number_input(
+                        f"Máx. {col}",
+                        value=float(slider_vals[1]),
+                        key=f"{col}_max_input",
+                        format="%.2f"
                     )
 
-                    # Inputs manuales debajo del slider
-                    col_input_min, col_input_max = st.sidebar.columns(2)
-                    with col_input_min:
-                        input_min = st.number_input(
-                            f"Mín. {col}",
-                            value=float(slider_vals[0]),
-                            key=f"{col}_min_input",
-                            format="%.2f"
-                        )
-                    with col_input_max:
-                        input_max = st.number_input(
-                            f"Máx. {col}",
-                            value=float(slider_vals[1]),
-                            key=f"{col}_max_input",
-                            format="%.2f"
-                        )
-
-                    # Validar inputs y aplicar filtros
-                    rango_min = max(min_val, input_min)
-                    rango_max = min(max_slider_val, input_max)
-                    if rango_min > rango_max:
-                        rango_min, rango_max = rango_max, rango_min
-
-                    df_no_favoritos = df_no_favoritos[
-                        (df_no_favoritos[col] >= rango_min) & (df_no_favoritos[col] <= rango_max)
-                        ]
-
-            elif col == "Fecha Límite Presentación":
-                # Verificar que la columna existe antes de procesarla
-                if col not in df_no_favoritos.columns:
-                    continue
-
-                fechas_col = pd.to_datetime(df_no_favoritos[col], errors="coerce").dropna()
-                if fechas_col.empty:
+                # Validar inputs y aplicar filtros
+                rango_min = max(min_val, input_min)
+                rango_max = min(max_slider_val, input_max)
+                if rango_min > rango_max:
+                    rango_min, rango_max = rango_max, rango_min
+
+                plan.append(("rango", col, (rango_min, rango_max)))
+
+            elif meta["tipo"] == "fecha":
+                fecha_max = meta["fecha_max"]
+                if fecha_max is None:
                     fecha_max = datetime.today().date()
                     st.warning(f"⚠️ No hay fechas válidas en '{col}'. Se usa la fecha actual como valor por defecto.")
-                else:
-                    fecha_max = fechas_col.max().date()
 
                 fecha_seleccionada = st.sidebar.date_input(f"{col}", value=fecha_max, key=f"filtro_{col}")
-                df_no_favoritos[col] = pd.to_datetime(df_no_favoritos[col], errors="coerce")
-                df_no_favoritos = df_no_favoritos[df_no_favoritos[col].dt.date <= fecha_seleccionada]
+                plan.append(("fecha_hasta", col, (fecha_seleccionada,)))
+
             else:
-                # Verificar que la columna existe para filtros categóricos
-                if col not in df_no_favoritos.columns:
-                    continue
-
-                try:
-                    # Asegurar que obtenemos una Series, no un DataFrame
-                    col_series = df_no_favoritos[col]
-                    if hasattr(col_series, 'unique'):
-                        opciones = sorted(col_series.fillna("").unique().tolist())
-                        seleccionadas = st.sidebar.multiselect(f"{col}", options=opciones, key=f"filtro_{col}")
-                        if seleccionadas:
-                            df_no_favoritos = df_no_favoritos[df_no_favoritos[col].fillna("").isin(seleccionadas)]
-                    else:
-                        st.sidebar.warning(f"⚠️ Error en la columna '{col}' - tipo inesperado")
-                except Exception as e:
-                    st.sidebar.error(f"Error procesando {col}: {e}")
-                    continue
-
-    # Asegurar que CoincidePalabra existe en df_favoritos
-    if "CoincidePalabra" not in df_favoritos.columns:
-        df_favoritos["CoincidePalabra"] = False
-
-    # Combinar DataFrames de forma segura
-    if df_favoritos.empty and df_no_favoritos.empty:
-        df_filtrado_actual = pd.DataFrame()
-    elif df_favoritos.empty:
-        df_filtrado_actual = df_no_favoritos.copy()
-    elif df_no_favoritos.empty:
-        df_filtrado_actual = df_favoritos.copy()
-    else:
-        df_filtrado_actual = pd.concat(
-            [df_favoritos.dropna(how='all', axis=1), df_no_favoritos.dropna(how='all', axis=1)],
-            ignore_index=True).drop_duplicates()
+                seleccionadas = st.sidebar.multiselect(f"{col}", options=meta["opciones"], key=f"filtro_{col}")
+                if seleccionadas:
+                    plan.append(("valores", col, ("", tuple(seleccionadas))))
+
+    # Evaluar el plan como una única máscara y materializar el resultado una sola vez
+    favoritos = set(st.session_state.get("expedientes_favoritos", []))
+    es_favorito = metadatos["expedientes"].isin(favoritos).to_numpy() if favoritos \
+        else np.zeros(len(df_base), dtype=bool)
+    plan_palabras = [condicion for condicion in plan if condicion[0] == "palabras"]
+    with medidor.tramo("busqueda_palabras") as tramo:
+        mask_plan, puntuaciones = evaluar_plan(df_base, plan_palabras, metadatos, campo_busqueda, indice)
+        tramo["filas"] = int(mask_plan.sum())
+    with medidor.tramo("filtros_sidebar") as tramo:
+        mask_filtros, _ = evaluar_plan(df_base, [c for c in plan if c[0] != "palabras"], metadatos)
+        mask_plan &= mask_filtros
+        tramo["filas"] = int(mask_plan.sum())
+
+    # Favoritos siempre arriba; el resto en orden de relevancia (BM25) si la búsqueda usó el índice
+    with medidor.tramo("materializar_resultado") as tramo:
+        posiciones_fav = np.flatnonzero(es_favorito)
+        posiciones_resto = np.flatnonzero(mask_plan & ~es_favorito)
+        if puntuaciones is not None:
+            relevancia = np.array([puntuaciones.get(p, 0.0) for p in posiciones_resto], dtype=float)
+            posiciones_resto = posiciones_resto[np.argsort(-relevancia, kind="stable")]
+
+        df_filtrado_actual = df_base.iloc[np.concatenate([posiciones_fav, posiciones_resto])].copy()
+        hay_busqueda = any(tipo == "palabras" for tipo, _, _ in plan)
+        df_filtrado_actual["Favorito"] = np.concatenate([np.ones(len(posiciones_fav), dtype=bool),
+                                                         np.zeros(len(posiciones_resto), dtype=bool)])
+        df_filtrado_actual["CoincidePalabra"] = ~df_filtrado_actual["Favorito"] & hay_busqueda
+        tramo["filas"] = len(df_filtrado_actual)
 
     # Verificar que df_filtrado_actual no esté vacío
     if df_filtrado_actual.empty:
         st.warning("⚠️ No hay datos que coincidan con los filtros aplicados.")
         st.stop()
 
-    # Asegurar que las columnas necesarias existen
-    columnas_necesarias = ["Favorito", "CoincidePalabra"]
-    for col in columnas_necesarias:
-        if col not in df_filtrado_actual.columns:
-            df_filtrado_actual[col] = False
-
     # Filtrar cols_mostrar para incluir solo columnas existentes
     cols_existentes = [col for col in cols_mostrar if col in df_filtrado_actual.columns]
 
-    # Crear df_style de forma segura verificando que las columnas existen
-    columnas_style_disponibles = [col for col in (cols_existentes + ["Favorito", "CoincidePalabra"]) if
-                                  col in df_filtrado_actual.columns]
-    df_style = df_filtrado_actual[columnas_style_disponibles].copy()
-
-    def resaltar_filas(row):
-        if row.get("Favorito", False):
-            return ['background-color: #fff3b0'] * len(row)
-        elif row.get("CoincidePalabra", False):
-            return ['background-color: #ffe5e5'] * len(row)
-        else:
-            return [''] * len(row)
-
-    # Convertir Favorito a emoji para mostrar solo si la columna existe
-    if "Favorito" in df_style.columns:
-        df_style["Favorito"] = df_style["Favorito"].apply(lambda x: "⭐" if x else "")
-
-    formato_numerico = {col: "{:,.2f}".format for col in df_style.select_dtypes(include=['float', 'int']).columns}
-
-    st.dataframe(
-        df_style.style.format(formato_numerico).apply(resaltar_filas, axis=1),
-        column_config={"URL": st.column_config.LinkColumn("URL")} if "URL" in df_style.columns else {},
-        hide_index=True,
-        use_container_width=True
-    )
-
-    st.success(f"🎉 {len(df_filtrado_actual)} licitaciones disponibles")
+    # Paginación en servidor: se ordena el resultado completo y solo se estiliza la página visible
+    n_total = len(df_filtrado_actual)
+    params_app = cargar_params_app()
+    tamanos_pagina = sorted({25, 50, 100, 250, 500, params_app["tamano_pagina"]})
+    col_orden, col_sentido, col_tamano, col_pagina = st.columns([3, 2, 2, 2])
+    with col_orden:
+        columna_orden = st.selectbox("Ordenar por", [ORDEN_POR_DEFECTO] + cols_existentes, key="orden_columna")
+    with col_sentido:
+        ascendente = st.radio("Sentido", ["Ascendente", "Descendente"], horizontal=True,
+                              key="orden_sentido") == "Ascendente"
+    with col_tamano:
+        tamano_pagina = st.selectbox("Filas por página", tamanos_pagina,
+                                     index=tamanos_pagina.index(params_app["tamano_pagina"]), key="tamano_pagina")
+    n_paginas = max(1, -(-n_total // tamano_pagina))
+    # El valor inicial va solo en session_state: pasar también value= al widget con la misma key
+    # hace que Streamlit avise de que el valor se fijó por las dos vías
+    if st.session_state.setdefault("pagina_resultados", 1) > n_paginas:
+        st.session_state["pagina_resultados"] = 1
+    with col_pagina:
+        pagina = st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, step=1,
+                                 key="pagina_resultados")
+
+    with medidor.tramo("ordenar_paginar", filas=n_total):
+        indices_pagina = ordenar_y_paginar(df_filtrado_actual, columna_orden, ascendente, pagina, tamano_pagina)
+
+    with medidor.tramo("render_tabla", filas=len(indices_pagina)):
+        # Crear df_style de forma segura verificando que las columnas existen
+        columnas_style_disponibles = [col for col in (cols_existentes + ["Favorito", "CoincidePalabra"]) if
+                                      col in df_filtrado_actual.columns]
+        df_style = df_filtrado_actual.loc[indices_pagina, columnas_style_disponibles].copy()
+
+        # Estilos de fila calculados de una vez a partir de las columnas booleanas
+        matriz_estilos = matriz_resaltado(df_style)
+
+        # Convertir Favorito a emoji para mostrar solo si la columna existe
+        if "Favorito" in df_style.columns:
+            df_style["Favorito"] = np.where(df_style["Favorito"].fillna(False).astype(bool), "⭐", "")
+
+        # Con un Styler, st.dataframe muestra los valores ya formateados por el Styler e ignora el
+        # format de NumberColumn: el formato numérico va en el propio Styler (solo la página visible)
+        column_config = {}
+        if "URL" in df_style.columns:
+            column_config["URL"] = st.column_config.LinkColumn("URL")
+        columnas_numericas = df_style.select_dtypes(include=['float', 'int']).columns
+
+        st.dataframe(
+            df_style.style.apply(lambda _: matriz_estilos, axis=None)
+                          .format(precision=2, thousands=",", na_rep="", subset=columnas_numericas),
+            column_config=column_config,
+            hide_index=True,
+            use_container_width=True
+        )
 
-    # Botones de descarga con verificaciones adicionales
-    col1, _, col2 = st.columns([1, 5, 1])
-    with col1:
-        try:
-            if cols_existentes:
-                # Verificar que las columnas existen antes de crear el CSV
-                cols_para_descarga = [col for col in cols_existentes if col in df_filtrado_actual.columns]
-                if cols_para_descarga:
-                    csv_data = df_filtrado_actual[cols_para_descarga].drop(columns=["Favorito"], errors='ignore')
-                    csv = csv_data.to_csv(index=False).encode("utf-8")
-                    st.download_button("📥 Descargar licitaciones filtradas", data=csv,
-                                       file_name="licitaciones_filtradas.csv", mime="text/csv")
+    st.success(f"🎉 {n_total} licitaciones disponibles "
+               f"(mostrando {len(indices_pagina)} en la página {pagina} de {n_paginas})")
+
+    # Botones de descarga: el fichero se genera solo al pedirlo y se memoiza por plan de filtrado
+    clave_plan = hashlib.md5(
+        repr((file_mtime, plan, sorted(favoritos), cols_existentes)).encode("utf-8")
+    ).hexdigest()
+    col1, col_formato, col2 = st.columns([1, 5, 1])
+    with col_formato:
+        formato = st.selectbox("Formato de descarga", list(formatos_exportacion()), key="formato_descarga")
+    with medidor.tramo("exportar", filas=n_total):
+        with col1:
+            try:
+                if cols_existentes:
+                    boton_descarga_lazy("licitaciones filtradas", df_filtrado_actual, cols_existentes,
+                                        "licitaciones_filtradas", formato, f"{clave_plan}-filtradas")
                 else:
-                    st.warning("No hay columnas válidas para descargar")
-            else:
-                st.warning("No hay columnas para descargar")
-        except Exception as e:
-            st.error(f"Error al preparar descarga: {e}")
+                    st.warning("No hay columnas para descargar")
+            except Exception as e:
+                st.error(f"Error al preparar descarga: {e}")
 
-    with col2:
-        try:
-            if "Favorito" in df_filtrado_actual.columns and not df_filtrado_actual[
-                df_filtrado_actual["Favorito"]].empty:
-                favoritos_data = df_filtrado_actual[df_filtrado_actual['Favorito']]
-                # Verificar que las columnas existen antes de crear el CSV de favoritos
-                cols_para_favoritos = [col for col in cols_existentes if col in favoritos_data.columns]
-                if cols_para_favoritos:
-                    csv_fav_data = favoritos_data[cols_para_favoritos].drop(columns=["Favorito"], errors='ignore')
-                    csv_fav = csv_fav_data.to_csv(index=False).encode("utf-8")
-                    st.download_button("📥 Descargar licitaciones favoritas", data=csv_fav,
-                                       file_name="licitaciones_favoritas.csv", mime="text/csv")
+        with col2:
+            try:
+                if len(posiciones_fav):
+                    boton_descarga_lazy("licitaciones favoritas", df_filtrado_actual.iloc[:len(posiciones_fav)],
+                                        cols_existentes, "licitaciones_favoritas", formato, f"{clave_plan}-favoritas")
                 else:
-                    st.warning("No hay columnas válidas para descargar favoritos")
-            else:
-                st.info("No hay favoritos para descargar")
-        except Exception as e:
-            st.error(f"Error al preparar descarga de favoritos: {e}")
+                    st.info("No hay favoritos para descargar")
+            except Exception as e:
+                st.error(f"Error al preparar descarga de favoritos: {e}")
+
+    if mostrar_latencias:
+        diagnosticar_latencias(medidor, params_app["log_latencias"])
 
     # Búsqueda de actualizaciones en favoritos
     if "Favorito" in df_filtrado_actual.columns and not df_filtrado_actual[df_filtrado_actual["Favorito"]].empty:
-        if st.button("🔍 Buscar actualizaciones en licitaciones favoritas"):
-            with st.spinner("Buscando actualizaciones en favoritos, esto puede tardar..."):
-                resultado = buscar_actualizaciones_favs(df_filtrado_actual[df_filtrado_actual["Favorito"]])
-                if resultado is not None:
-                    if 'Actualización' in resultado.columns and resultado['Actualización'].sum() > 0:
-                        st.success(
-                            f"✅ Se encontraron {resultado['Actualización'].sum()} licitaciones con actualizaciones")
-                    else:
-                        st.error(f"❌ No se encontraron actualizaciones")
-
-                    # Mostrar resultados solo si hay columnas válidas
-                    cols_resultado = [col for col in ['Titulo', 'Nº Expediente', 'URL', 'Actualización'] if
-                                      col in resultado.columns]
-                    if cols_resultado:
-                        st.dataframe(resultado[cols_resultado],
-                                     column_config={
-                                         "URL": st.column_config.LinkColumn("URL")} if "URL" in cols_resultado else {},
-                                     hide_index=True,
-                                     use_container_width=True)
-
-                    if 'Actualización' in resultado.columns and resultado['Actualización'].sum() > 0:
-                        st.markdown("##### 📄 Detalles de actualizaciones por licitación")
-                        for idx, row in resultado.iterrows():
-                            url = row.get("URL", f"Licitación {idx}")
-                            nuevos_docs = row.get("Nuevos Documentos", [])
-                            if nuevos_docs:
-                                with st.expander(f"🔍 Ver detalles de: {url} ({len(nuevos_docs)} documentos nuevos)"):
-                                    st.json(nuevos_docs, expanded=True)
-
-                        csv_res = resultado.to_csv(index=False).encode("utf-8")
-                        st.download_button("📥 Descargar resultados de actualizaciones",
-                                           data=csv_res,
-                                           file_name="actualizaciones_favoritas.csv",
-                                           mime="text/csv")
+        panel_actualizaciones_favs(df_filtrado_actual[df_filtrado_actual["Favorito"]])
 
     # Notas al pie
     st.markdown("---")
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.portal_server import PortalLocal, RUTAS_BASE, iniciar_servidor, escribir_config
+from benchmarks.run_benchmarks import commit_actual
+
+# (nombre, ruta en el portal local, selector CSS que espera el scraper antes de leer la página)
+PAGINAS = [
+    ("andalucia_listado", RUTAS_BASE["base_and"], "table.p-datatable-table"),
+    ("andalucia_detalle", "/and/detalle-licitacion/andalucia-1-1",
+     "div.field, div.block.ng-star-inserted, div.contenido b"),
+    ("euskadi_listado", RUTAS_BASE["base_eus"], "#tablaWidget"),
+    ("euskadi_detalle", "/eus/detalle/euskadi-1-1", "div.cabeceraDetalle"),
+    ("espana_detalle", "/esp/detalle_licitacion?idEvl=espana-1-1", "ul.altoDetalleLicitacion"),
+]
+
+
+def medir_variante(variante, url_base, portal_local, config_file, repeticiones):
+    """
+    Arranca Chrome 'repeticiones' veces con la configuración de la variante y, en cada arranque,
+    carga una vez cada página de PAGINAS. El tiempo por página va de driver.get() hasta que está
+    el selector que espera el scraper, que es lo que cuenta con carga eager.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from src.browser_factory import crear_navegador
+
+    portal_local.reiniciar_estadisticas()
+    arranques = []
+    cargas = {nombre: [] for nombre, _, _ in PAGINAS}
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        driver = crear_navegador(config_file, fuente=f"benchmark_{variante}")
+        arranques.append(time.perf_counter() - t0)
+        try:
+            for nombre, ruta, selector in PAGINAS:
+                t0 = time.perf_counter()
+                driver.get(f"{url_base}{ruta}")
+                WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+                cargas[nombre].append(time.perf_counter() - t0)
+        finally:
+            driver.quit()
+
+    return {
+        "arranque_mediana_s": round(statistics.median(arranques), 3),
+        "carga_mediana_s": {nombre: round(statistics.median(tiempos), 3) for nombre, tiempos in cargas.items()},
+        "carga_total_mediana_s": round(sum(statistics.median(tiempos) for tiempos in cargas.values()), 3),
+        "peticiones": dict(portal_local.estadisticas["peticiones"]),
+        "bytes": portal_local.estadisticas["bytes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque de Chrome y carga de página: navegador completo "
+                                                 "(antes de [navegador]) frente a ligero (eager + recursos bloqueados)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--latencia_ms", type=float, default=50)
+    parser.add_argument("--tamano_recursos_kb", type=int, default=200)
+    parser.add_argument("--config", default="./config/scraper_config.ini")
+    parser.add_argument("--salida", default="./benchmarks/resultados")
+    args = parser.parse_args()
+
+    portal_local = PortalLocal(paginas=1, filas_por_pagina=10, latencia_ms=args.latencia_ms,
+                               tamano_recursos_kb=args.tamano_recursos_kb)
+    servidor, url_base = iniciar_servidor(portal_local)
+    commit = commit_actual()
+    informe = {"fecha": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+               "repeticiones": args.repeticiones, "latencia_ms": args.latencia_ms,
+               "tamano_recursos_kb": args.tamano_recursos_kb, "resultados": {}}
+    try:
+        with tempfile.TemporaryDirectory() as dir_tmp:
+            for variante in ("completo", "ligero"):
+                config_file = escribir_config(url_base, os.path.join(dir_tmp, f"scraper_config_{variante}.ini"),
+                                              config_file=args.config, dir_salida=dir_tmp, navegador=variante)
+                print(f"🟢 Midiendo navegador {variante}...")
+                try:
+                    informe["resultados"][variante] = medir_variante(variante, url_base, portal_local,
+                                                                     config_file, args.repeticiones)
+                except Exception as e:
+                    # Sin Selenium/Chrome en la máquina, etc.
+                    informe["resultados"][variante] = {"omitido": f"{type(e).__name__}: {e}"}
+                print(f"   {variante}: {informe['resultados'][variante]}")
+    finally:
+        servidor.shutdown()
+
+    completo, ligero = informe["resultados"]["completo"], informe["resultados"]["ligero"]
+    if "omitido" not in completo and "omitido" not in ligero:
+        informe["aceleracion"] = {
+            "arranque": round(completo["arranque_mediana_s"] / ligero["arranque_mediana_s"], 2),
+            "carga_total": round(completo["carga_total_mediana_s"] / ligero["carga_total_mediana_s"], 2),
+        }
+        print(f"   aceleración (completo / ligero): {informe['aceleracion']}")
+
+    os.makedirs(args.salida, exist_ok=True)
+    ruta = os.path.join(args.salida, f"navegador_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'sin_commit'}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados de arranque y carga del navegador guardados en: {ruta}")
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/browser_load.py --repeticiones 10 --latencia_ms 100 --tamano_recursos_kb 500
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from src import html_parsing
+from benchmarks.portal_server import PortalLocal
+from benchmarks.run_benchmarks import medir, commit_actual
+
+
+# --- Extracción anterior (BeautifulSoup + html.parser), como referencia de tiempo y de resultados ---
+
+def madrid_detalle_bs4(pagina):
+    soup = BeautifulSoup(pagina, 'html.parser')
+    pares = []
+    for field in soup.find_all('div', class_='field'):
+        label_elem = field.find(class_='field__label')
+        value_elem = field.find(class_='field__item')
+        if label_elem and value_elem:
+            pares.append((label_elem.get_text(strip=True), value_elem.get_text(" ", strip=True)))
+    return pares
+
+
+def madrid_listado_bs4(pagina):
+    soup = BeautifulSoup(pagina, 'html.parser')
+    return [(a['href'], a.get_text(strip=True)) for item in soup.select('div.contratos-result li')
+            if (a := item.find('a'))]
+
+
+def andalucia_detalle_bs4(pagina):
+    soup = BeautifulSoup(pagina, "html.parser")
+    for h2 in soup.select("h2.seccion-indice"):
+        if "información de lotes" in h2.get_text(strip=True).lower():
+            div_lotes = h2.find_next_sibling("div", class_="contenido")
+            if div_lotes:
+                div_lotes.decompose()
+    resultado = {}
+    for selector in ("div.field", "div.block.ng-star-inserted"):
+        for field in soup.select(selector):
+            label = field.select_one(".field__label")
+            item = field.select_one(".field__item")
+            if label and item:
+                clave, valor = label.get_text(strip=True), item.get_text(strip=True)
+                if clave and valor and clave not in resultado:
+                    resultado[clave] = valor
+    for div in soup.select("div.contenido"):
+        for tag in div.find_all(["b", "strong"]):
+            clave = tag.get_text(strip=True).rstrip(":")
+            span = next((sib for sib in tag.next_siblings if getattr(sib, "name", None) == "span"), None)
+            if span:
+                valor = span.get_text(strip=True)
+            else:
+                textos = list(tag.parent.stripped_strings)
+                valor = ' '.join(textos[1:]) if len(textos) > 1 else ""
+            if clave and valor and clave not in resultado:
+                resultado[clave] = valor
+    for h2 in soup.select("h2.seccion-indice"):
+        if "documentación complementaria" in h2.get_text(strip=True).lower():
+            contenedor = h2.find_next("div")
+            if contenedor:
+                resultado["enlaces"] = [link["href"] for link in contenedor.find_all("a", href=True)]
+    return resultado
+
+
+def andalucia_listado_bs4(pagina):
+    soup = BeautifulSoup(pagina, 'html.parser')
+    tabla = soup.select_one('table.p-datatable-table')
+    cabeceras = [th.get_text(strip=True) for th in tabla.select('thead th')]
+    filas = []
+    for fila in tabla.select('tbody tr'):
+        celdas = fila.find_all('td')
+        fila_dict = {cabeceras[i]: celdas[i].get_text(strip=True) for i in range(len(cabeceras))}
+        enlace_tag = celdas[0].find('a', href=True)
+        fila_dict['URL'] = enlace_tag['href'] if enlace_tag else ''
+        filas.append(fila_dict)
+    return filas
+
+
+def euskadi_detalle_bs4(html_cabecera):
+    soup = BeautifulSoup(html_cabecera, 'html.parser')
+    return [(dt.get_text(strip=True), dd.get_text(strip=True)) for dt in soup.find_all('dt')
+            if (dd := dt.find_next_sibling('dd'))]
+
+
+def espana_detalle_bs4(pagina):
+    # El scraper del Estado leía estos pares con dos find_element de Selenium por campo;
+    # sin navegador, la referencia es la misma extracción con BeautifulSoup
+    soup = BeautifulSoup(pagina, 'html.parser')
+    pares = []
+    for ul in soup.select("ul.altoDetalleLicitacion"):
+        label = ul.select_one("span.tipo3")
+        value = ul.select_one("span.outputText")
+        if label and value:
+            pares.append((label.get("title") or label.get_text(" ", strip=True),
+                          value.get("title") or value.get_text(" ", strip=True)))
+    return pares
+
+
+# --- Extracción con src.html_parsing (lxml y selectores precompilados) ---
+
+def andalucia_detalle_lxml(pagina):
+    raiz = html_parsing.parsear(pagina)
+    for h2 in html_parsing.H2_SECCION_INDICE(raiz):
+        if "información de lotes" in html_parsing.texto(h2).lower():
+            div_lotes = html_parsing.primero(html_parsing.DIV_CONTENIDO_HERMANO, h2)
+            if div_lotes is not None:
+                html_parsing.eliminar(div_lotes)
+    resultado = {}
+    pares = (html_parsing.pares_field(raiz) + html_parsing.pares_field(raiz, selector=html_parsing.DIV_BLOQUE_NG)
+             + html_parsing.pares_negrita_span(raiz))
+    for clave, valor in pares:
+        if clave and valor and clave not in resultado:
+            resultado[clave] = valor
+    for h2 in html_parsing.H2_SECCION_INDICE(raiz):
+        if "documentación complementaria" in html_parsing.texto(h2).lower():
+            contenedor = html_parsing.primero(html_parsing.DIV_SIGUIENTE, h2)
+            if contenedor is not None:
+                resultado["enlaces"] = [link.get("href") for link in html_parsing.ENLACES(contenedor)]
+    return resultado
+
+
+def andalucia_listado_lxml(pagina):
+    raiz = html_parsing.parsear(pagina)
+    tabla = html_parsing.primero(html_parsing.TABLA_RESULTADOS_AND, raiz)
+    cabeceras = [html_parsing.texto(th) for th in html_parsing.CABECERAS_THEAD(tabla)]
+    filas = []
+    for fila in html_parsing.FILAS_TBODY(tabla):
+        celdas = html_parsing.CELDAS(fila)
+        fila_dict = {cabeceras[i]: html_parsing.texto(celdas[i]) for i in range(len(cabeceras))}
+        enlace_tag = html_parsing.primero(html_parsing.ENLACES, celdas[0])
+        fila_dict['URL'] = enlace_tag.get('href') if enlace_tag is not None else ''
+        filas.append(fila_dict)
+    return filas
+
+
+def madrid_listado_lxml(pagina):
+    raiz = html_parsing.parsear(pagina)
+    return [(a.attrib['href'], html_parsing.texto(a)) for item in html_parsing.ITEMS_RESULTADOS_MAD(raiz)
+            if (a := html_parsing.primero(html_parsing.PRIMER_ENLACE, item)) is not None]
+
+
+def inner_html_cabecera(pagina):
+    """
+    innerHTML de div.cabeceraDetalle, que es lo que el scraper de Euskadi recibe del navegador.
+    """
+    div = lxml_html.document_fromstring(pagina).find_class("cabeceraDetalle")[0]
+    return (div.text or "") + "".join(lxml_html.tostring(hijo, encoding="unicode") for hijo in div)
+
+
+def casos(portal_local):
+    """
+    (nombre, entrada, extracción anterior, extracción nueva) para cada plantilla de benchmarks/fixtures.
+    """
+    return [
+        ("madrid_detalle", portal_local.detalle("madrid", "madrid-1-1").encode("utf-8"), madrid_detalle_bs4,
+         lambda p: html_parsing.pares_field(html_parsing.parsear(p), separador=" ")),
+        ("madrid_listado", portal_local.listado("madrid", 1).encode("utf-8"), madrid_listado_bs4, madrid_listado_lxml),
+        ("andalucia_detalle", portal_local.detalle("andalucia", "andalucia-1-1"), andalucia_detalle_bs4,
+         andalucia_detalle_lxml),
+        ("andalucia_listado", portal_local.listado("andalucia", 1), andalucia_listado_bs4, andalucia_listado_lxml),
+        ("euskadi_detalle", inner_html_cabecera(portal_local.detalle("euskadi", "euskadi-1-1")), euskadi_detalle_bs4,
+         lambda p: html_parsing.pares_dt_dd(html_parsing.parsear_fragmento(p))),
+        ("espana_detalle", portal_local.detalle("espana", "espana-1-1"), espana_detalle_bs4,
+         lambda p: html_parsing.pares_tipo3_outputtext(html_parsing.parsear(p))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de parseo por página: BeautifulSoup frente a lxml")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--filas", type=int, default=25, help="Filas por página de listado")
+    parser.add_argument("--salida", default="./benchmarks/resultados")
+    args = parser.parse_args()
+
+    portal_local = PortalLocal(paginas=1, filas_por_pagina=args.filas)
+    commit = commit_actual()
+    informe = {"fecha": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+               "repeticiones": args.repeticiones, "filas_listado": args.filas, "resultados": {}}
+
+    for nombre, pagina, anterior, nueva in casos(portal_local):
+        tiempos_bs4, resultado_bs4 = medir(lambda: anterior(pagina), args.repeticiones)
+        tiempos_lxml, resultado_lxml = medir(lambda: nueva(pagina), args.repeticiones)
+        # Mínimo por página: el valor menos afectado por el ruido de la máquina
+        ms_bs4, ms_lxml = min(tiempos_bs4) * 1000, min(tiempos_lxml) * 1000
+        informe["resultados"][nombre] = {
+            "bytes": len(pagina),
+            "bs4_ms": round(ms_bs4, 4),
+            "lxml_ms": round(ms_lxml, 4),
+            "aceleracion": round(ms_bs4 / ms_lxml, 2) if ms_lxml else None,
+            "mismo_resultado": resultado_bs4 == resultado_lxml,
+        }
+        print(f"   {nombre}: {informe['resultados'][nombre]}")
+        if resultado_bs4 != resultado_lxml:
+            print(f"⚠️ {nombre}: la extracción con lxml no coincide con la anterior")
+
+    os.makedirs(args.salida, exist_ok=True)
+    ruta = os.path.join(args.salida, f"parseo_html_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'sin_commit'}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados de parseo guardados en: {ruta}")
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/html_parsing_speed.py --repeticiones 500
@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import mimetypes
+import configparser
+from string import Template
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_tenders import (TITULOS_TEC, TITULOS_NO_TEC, TIPOS_CONTRATO, ESTADOS, ORGANOS,
+                                          PROCEDIMIENTOS, FORMAS_PRESENTACION, LUGARES, SISTEMAS,
+                                          TRAMITACIONES, CPVS)
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Rutas de cada portal en el servidor local (se escriben en [urls] con escribir_config)
+RUTAS_BASE = {
+    "base_and": "/and/buscador-general",
+    "base_esp": "/esp/busqueda",
+    "base_eus": "/eus/anuncios-abiertos.html",
+    "base_mad": "/mad",
+}
+
+
+class PortalLocal:
+    """
+    Estado del servidor que imita los portales de Madrid, Andalucía, Euskadi y Estado
+    a partir de las plantillas HTML de benchmarks/fixtures.
+
+    Los datos de cada licitación se generan de forma determinista a partir de
+    (seed, portal, página, fila), así que dos ejecuciones con la misma configuración
+    sirven exactamente el mismo contenido.
+    """
+
+    def __init__(self, paginas=3, filas_por_pagina=10, latencia_ms=0, jitter_ms=0, tasa_errores=0.0, seed=42,
+                 tamano_recursos_kb=100):
+        self.paginas = paginas
+        self.filas_por_pagina = filas_por_pagina
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.tasa_errores = tasa_errores
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.plantillas = {}
+        for portal in ("madrid", "andalucia", "euskadi", "espana"):
+            for nombre in os.listdir(os.path.join(DIR_FIXTURES, portal)):
+                with open(os.path.join(DIR_FIXTURES, portal, nombre), encoding="utf-8") as f:
+                    self.plantillas[(portal, nombre.split(".")[0])] = Template(f.read())
+        with open(os.path.join(DIR_FIXTURES, "pliego.pdf"), "rb") as f:
+            self.pdf = f.read()
+        # Imágenes y fuentes de relleno (/static/...) que enlazan las páginas de los portales con navegador
+        self.recurso = bytes(int(tamano_recursos_kb * 1024))
+        self.reiniciar_estadisticas()
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            self.estadisticas = {"peticiones": {}, "errores_inyectados": 0, "bytes": 0}
+
+    def registrar(self, tipo, n_bytes=0, error=False):
+        with self._lock:
+            self.estadisticas["peticiones"][tipo] = self.estadisticas["peticiones"].get(tipo, 0) + 1
+            self.estadisticas["bytes"] += n_bytes
+            if error:
+                self.estadisticas["errores_inyectados"] += 1
+
+    def esperar_y_decidir_error(self):
+        """
+        Aplica la latencia configurada y decide si esta petición devuelve un error inyectado.
+        """
+        with self._lock:
+            retardo = self.latencia_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            error = self._rng.random() < self.tasa_errores
+        if retardo:
+            time.sleep(retardo / 1000)
+        return error
+
+    def licitacion(self, portal, pagina, fila):
+        rng = random.Random(f"{self.seed}-{portal}-{pagina}-{fila}")
+        titulo = rng.choice(TITULOS_TEC if rng.random() < 0.35 else TITULOS_NO_TEC)
+        importe = rng.uniform(5000, 2000000)
+        importe_es = f"{importe:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        dia, mes = rng.randint(1, 28), rng.randint(1, 12)
+        return {
+            "id": f"{portal}-{pagina}-{fila}",
+            "expediente": f"{portal[:3].upper()}-{pagina:03d}-{fila:03d}",
+            "titulo": titulo,
+            "tipo": rng.choice(TIPOS_CONTRATO),
+            "estado": rng.choice(ESTADOS),
+            "importe": f"{importe_es} €",
+            "valor": f"{importe_es} euros",
+            "fecha": f"{dia:02d}/{mes:02d}/2030",
+            "fecha_pub": f"{dia:02d}/{mes:02d}/2025",
+            "organo": rng.choice(ORGANOS),
+            "cpv": rng.choice(CPVS),
+            "procedimiento": rng.choice(PROCEDIMIENTOS),
+            "forma": rng.choice(FORMAS_PRESENTACION),
+            "duracion": f"{rng.randint(1, 48)} meses",
+            "lugar": rng.choice(LUGARES),
+            "sistema": rng.choice(SISTEMAS),
+            "tramitacion": rng.choice(TRAMITACIONES),
+            "descripcion": f"{titulo}. Contrato de prueba servido por el portal local.",
+        }
+
+    def detalle(self, portal, id_licitacion):
+        try:
+            _, pagina, fila = id_licitacion.rsplit("-", 2)
+            datos = self.licitacion(portal, int(pagina), int(fila))
+        except ValueError:
+            return None
+        return self.plantillas[(portal, "detalle")].substitute(datos)
+
+    def listado(self, portal, pagina, **extra):
+        """
+        Página de resultados 'pagina' (1..paginas). Más allá de la profundidad configurada no hay filas.
+        """
+        filas = []
+        if 1 <= pagina <= self.paginas:
+            filas = [self.plantillas[(portal, "fila")].substitute(self.licitacion(portal, pagina, fila))
+                     for fila in range(1, self.filas_por_pagina + 1)]
+        ultima = pagina >= self.paginas
+        valores = {
+            "filas": "\n".join(filas),
+            "pagina": pagina,
+            "siguiente": pagina + 1,
+            "total": self.paginas * self.filas_por_pagina,
+            "desactivado": "disabled" if ultima else "",
+            "clase_siguiente": "paginate_disabled_next" if ultima else "paginate_enabled_next",
+            "boton_siguiente": "" if ultima else '<input type="submit" value="Siguiente">',
+        }
+        valores.update(extra)
+        return self.plantillas[(portal, "listado")].substitute(valores)
+
+
+def crear_manejador(portal_local):
+    class Manejador(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, estado, cuerpo, tipo="text/html; charset=utf-8"):
+            if isinstance(cuerpo, str):
+                cuerpo = cuerpo.encode("utf-8")
+            self.send_response(estado)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            if estado == 503:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _pagina(self, query, clave="page", defecto=1):
+            try:
+                return int(query.get(clave, [defecto])[0])
+            except ValueError:
+                return defecto
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            ruta, query = url.path, parse_qs(url.query)
+
+            if ruta == "/__stats":
+                return self._responder(200, json.dumps(portal_local.estadisticas), "application/json")
+            if ruta == "/__reset":
+                portal_local.reiniciar_estadisticas()
+                return self._responder(200, "{}", "application/json")
+
+            if ruta.startswith("/pdf/"):
+                tipo = "pdf"
+            elif ruta.startswith("/static/"):
+                tipo = "recurso"
+            elif "detalle" in ruta or "contrato-publico" in ruta:
+                tipo = "detalle"
+            elif ruta == RUTAS_BASE["base_esp"]:
+                tipo = "busqueda"
+            else:
+                tipo = "listado"
+
+            if portal_local.esperar_y_decidir_error():
+                portal_local.registrar(tipo, error=True)
+                return self._responder(503, "<html><body>Servicio no disponible temporalmente</body></html>")
+
+            cuerpo = None
+            content_type = "text/html; charset=utf-8"
+            if tipo == "pdf":
+                cuerpo, content_type = portal_local.pdf, "application/pdf"
+            elif tipo == "recurso":
+                cuerpo = portal_local.recurso
+                content_type = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+            elif ruta == "/mad/contratos":
+                # Madrid numera las páginas desde 0
+                cuerpo = portal_local.listado("madrid", self._pagina(query, defecto=0) + 1)
+            elif ruta.startswith("/mad/contrato-publico/"):
+                cuerpo = portal_local.detalle("madrid", ruta.rsplit("/", 1)[-1])
+            elif ruta == RUTAS_BASE["base_and"]:
+                cuerpo = portal_local.listado("andalucia", self._pagina(query))
+            elif ruta.startswith("/and/detalle-licitacion/"):
+                cuerpo = portal_local.detalle("andalucia", ruta.rsplit("/", 1)[-1])
+            elif ruta == RUTAS_BASE["base_eus"]:
+                cuerpo = portal_local.listado("euskadi", self._pagina(query))
+            elif ruta.startswith("/eus/detalle/"):
+                cuerpo = portal_local.detalle("euskadi", ruta.rsplit("/", 1)[-1])
+            elif ruta == RUTAS_BASE["base_esp"]:
+                cuerpo = portal_local.plantillas[("espana", "busqueda")].substitute()
+            elif ruta == "/esp/resultados":
+                cuerpo = portal_local.listado("espana", self._pagina(query))
+            elif ruta == "/esp/detalle_licitacion":
+                cuerpo = portal_local.detalle("espana", query.get("idEvl", [""])[0])
+
+            if cuerpo is None:
+                portal_local.registrar("no_encontrado")
+                return self._responder(404, "<html><body>No encontrado</body></html>")
+            portal_local.registrar(tipo, len(cuerpo))
+            return self._responder(200, cuerpo, content_type)
+
+    return Manejador
+
+
+def iniciar_servidor(portal_local, host="127.0.0.1", puerto=0):
+    """
+    Arranca el servidor en un hilo en segundo plano. Devuelve (servidor, url_base).
+    Con puerto=0 el sistema elige un puerto libre.
+    """
+    servidor = ThreadingHTTPServer((host, puerto), crear_manejador(portal_local))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url_base = f"http://{host}:{servidor.server_address[1]}"
+    print(f"✅ Portal local escuchando en {url_base}")
+    return servidor, url_base
+
+
+def escribir_config(url_base, destino, config_file="./config/scraper_config.ini", paginas=None, dir_salida=None,
+                    navegador=None):
+    """
+    Copia scraper_config.ini con las URLs de [urls] apuntando al portal local, sin esperas
+    entre peticiones en Madrid y, opcionalmente, con otro nº de páginas, directorios de salida
+    y Chrome 'ligero' (carga eager y recursos bloqueados) o 'completo' (carga normal de todo,
+    como antes de [navegador]).
+    """
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    with open(config_file, encoding='utf-8') as f:
+        config.read_file(f)
+    for clave, ruta in RUTAS_BASE.items():
+        config.set('urls', clave, f"{url_base}{ruta}")
+    config.set('mad_params', 'delay', '0')
+    if navegador:
+        if not config.has_section('navegador'):
+            config.add_section('navegador')
+        config.set('navegador', 'bloquear_recursos', str(navegador == "ligero"))
+        config.set('navegador', 'page_load_strategy', "eager" if navegador == "ligero" else "normal")
+    if paginas is not None:
+        for seccion in ('and_params', 'esp_params', 'eus_params', 'mad_params'):
+            config.set(seccion, 'max_paginas', str(paginas))
+    if dir_salida:
+        config.set('input_output_path', 'output_dir', os.path.join(dir_salida, "datos"))
+        config.set('input_output_path', 'output_dir_pdf', os.path.join(dir_salida, "pdfs"))
+    directorio = os.path.dirname(destino)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(destino, "w", encoding='utf-8') as f:
+        config.write(f)
+    print(f"✅ Configuración apuntando al portal local guardada en: {destino}")
+    return destino
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portal local con fixtures HTML para probar los scrapers sin red")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--paginas", type=int, default=3, help="Profundidad de paginación de cada portal")
+    parser.add_argument("--filas", type=int, default=10, help="Licitaciones por página")
+    parser.add_argument("--latencia_ms", type=float, default=0, help="Latencia fija por petición")
+    parser.add_argument("--jitter_ms", type=float, default=0, help="Latencia aleatoria adicional (0..jitter)")
+    parser.add_argument("--tasa_errores", type=float, default=0.0, help="Fracción de peticiones que devuelven 503")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tamano_recursos_kb", type=float, default=100,
+                        help="Tamaño de cada imagen/fuente de /static/ enlazada desde las páginas")
+    parser.add_argument("--escribir_config", default=None,
+                        help="Ruta donde guardar una copia de scraper_config.ini apuntando a este servidor")
+    args = parser.parse_args()
+
+    portal_local = PortalLocal(paginas=args.paginas, filas_por_pagina=args.filas, latencia_ms=args.latencia_ms,
+                               jitter_ms=args.jitter_ms, tasa_errores=args.tasa_errores, seed=args.seed,
+                               tamano_recursos_kb=args.tamano_recursos_kb)
+    servidor, url_base = iniciar_servidor(portal_local, args.host, args.puerto)
+    if args.escribir_config:
+        escribir_config(url_base, args.escribir_config, paginas=args.paginas)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/portal_server.py --escribir_config ./config/scraper_config_local.ini
+# python benchmarks/portal_server.py --paginas 10 --latencia_ms 150 --jitter_ms 100 --tasa_errores 0.02
@@ -0,0 +1,332 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+import configparser
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import src.functions as functions
+import benchmarks.synthetic_tenders as synthetic_tenders
+
+BENCHMARKS = ["filtrar_renombrar", "parsear_fechas", "limpiar_importe", "combinar_duplicados",
+              "procesar_completo", "filtros_app", "memoria_unificacion"]
+
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta funcion() 'repeticiones' veces y devuelve los tiempos (s) y el último resultado.
+    """
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos, resultado
+
+
+def resumen_tiempos(tiempos, n_filas):
+    minimo = min(tiempos)
+    return {
+        "filas": n_filas,
+        "repeticiones": len(tiempos),
+        "min_s": round(minimo, 6),
+        "mediana_s": round(statistics.median(tiempos), 6),
+        "filas_por_s": round(n_filas / minimo, 1) if minimo > 0 else None,
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def config_benchmark(config_file, dir_pdf, dir_tmp):
+    """
+    Copia de scraper_config.ini con los PDFs sintéticos y una caché de lemas temporal
+    (para no tocar los datos reales ni reutilizar lemas entre ejecuciones).
+    """
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    with open(config_file, encoding='utf-8') as f:
+        config.read_file(f)
+    config.set('input_output_path', 'output_dir_pdf', dir_pdf)
+    config.set('nlp_params', 'cache_lemas', os.path.join(dir_tmp, "cache_lemas.json"))
+    ruta = os.path.join(dir_tmp, "scraper_config_benchmark.ini")
+    with open(ruta, "w", encoding='utf-8') as f:
+        config.write(f)
+    return ruta
+
+
+def filtrar_renombrar_base(df, comunidad, columnas_finales, columnas_iniciales_comunidad, fecha_proceso):
+    """
+    functions.filtrar_renombrar_dataframe anterior a [user-046] (selección, rename y reindex:
+    tres copias), como referencia para benchmark_memoria_unificacion.
+    """
+    index_to_final_name = {v: k for k, v in columnas_finales.items()}
+    map_comunidad = {'and': 'Andalucía', 'esp': 'España', 'eus': 'Euskadi', 'mad': 'Comunidad de Madrid'}
+    rename_dict = {}
+    for col_real, idx in columnas_iniciales_comunidad.items():
+        if idx in index_to_final_name:
+            rename_dict[col_real] = index_to_final_name[idx]
+    columnas_a_usar = [col for col in rename_dict if col in df.columns]
+    df_filtrado = df[columnas_a_usar].rename(columns=rename_dict)
+    if df_filtrado.columns.duplicated().any():
+        df_filtrado = df_filtrado.loc[:, ~df_filtrado.columns.duplicated()]
+    df_final = df_filtrado.reindex(columns=list(columnas_finales.keys()))
+    for col in [col for col in df_final.columns if 'fecha' in col]:
+        df_final[col] = functions.parsear_fechas_inteligente(df_final[col])
+    for col in df_final.columns:
+        if any(kw in col.lower() for kw in ['importe', 'valor', 'presupuesto']):
+            df_final[col] = df_final[col].apply(functions.limpiar_importe)
+    df_final["fuente"] = map_comunidad.get(comunidad, '')
+    df_final["fecha_proceso"] = fecha_proceso
+    return df_final
+
+
+def preparar_para_publicacion_base(df):
+    """
+    Limpieza de publicación de main_scraping anterior a [user-046] (dropna y select_dtypes().fillna()
+    reconstruyendo el DataFrame), como referencia para benchmark_memoria_unificacion.
+    """
+    df = df.dropna(subset=['titulo'])
+    df[df.select_dtypes(include=['object']).columns] = df.select_dtypes(include=['object']).fillna('NotFound')
+    df[df.select_dtypes(include=['float', 'int']).columns] = df.select_dtypes(include=['float', 'int']).fillna(-1)
+    return df.loc[:, ~df.columns.str.contains('^Unnamed')]
+
+
+def benchmark_memoria_unificacion(dfs_crudos, columnas_fuentes, columnas_finales):
+    """
+    Memoria del camino de main_scraping desde los DataFrames por fuente hasta el CSV final
+    (normalizado → unificado → preparación para publicación), medida con tracemalloc
+    (incluye los arrays de numpy). Los crudos ya existen antes de medir y no cuentan.
+
+    Se mide el camino actual y el anterior a [user-046] ('base': filtrar_renombrar_base y
+    preparar_para_publicacion_base) con los mismos datos, y se comprueba que dan el mismo CSV.
+    """
+    import gc
+    import tracemalloc
+    caminos = {
+        "actual": (functions.filtrar_renombrar_dataframe, functions.preparar_para_publicacion),
+        "base": (filtrar_renombrar_base, preparar_para_publicacion_base),
+    }
+    resultados = {}
+    csvs = {}
+    for camino, (filtrar_renombrar, preparar) in caminos.items():
+        fases = {}
+        gc.collect()
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+
+            def fase(nombre):
+                actual, pico = tracemalloc.get_traced_memory()
+                fases[nombre] = {"pico_mib": round((pico - base) / 2 ** 20, 1),
+                                 "retenida_mib": round((actual - base) / 2 ** 20, 1)}
+                tracemalloc.reset_peak()
+
+            normalizados = [filtrar_renombrar(df, comunidad, columnas_finales, columnas_fuentes[comunidad],
+                                              "2025-07-01")
+                            for comunidad, df in dfs_crudos.items()]
+            fase("filtrar_renombrar")
+            df = pd.concat(normalizados, ignore_index=True)
+            normalizados.clear()
+            fase("unificacion")
+            df = preparar(df)
+            fase("preparar_para_publicacion")
+        finally:
+            tracemalloc.stop()
+        fases["pico_total_mib"] = max(valores["pico_mib"] for valores in fases.values())
+        resultados[camino] = fases
+        csvs[camino] = df.to_csv(index=False, sep="\t")
+        df = None
+    resultados["mismo_csv"] = csvs["actual"] == csvs["base"]
+    return resultados
+
+
+def preparar_df_app(df_unificado, seed):
+    """
+    DataFrame con el mismo formato que licitaciones.csv ya renombrado por la app.
+    """
+    import app
+    rng = np.random.default_rng(seed)
+    df = df_unificado.copy()
+    df["topicos_lda"] = ""
+    df["clasificacion"] = rng.choice(["Tecnológica", "No tecnológica", "Dudosa"], size=len(df))
+    rename_dict, cols_filtrar = app.cargar_columns_ini()
+    return app.renombrar_columnas(df, rename_dict), cols_filtrar
+
+
+def benchmark_filtros_app(df_app, cols_filtrar, repeticiones):
+    """
+    Camino de filtrado de la app: preparación por versión del CSV (campo de búsqueda, metadatos,
+    índice) y evaluación por rerun de un plan típico con y sin índice invertido.
+    """
+    import app
+    import src.search_index as search_index
+    resultados = {}
+    n = len(df_app)
+
+    tiempos, campo_busqueda = medir(lambda: app.construir_campo_busqueda(df_app), repeticiones)
+    resultados["construir_campo_busqueda"] = resumen_tiempos(tiempos, n)
+    tiempos, metadatos = medir(lambda: app.calcular_metadatos_filtros(df_app, cols_filtrar), repeticiones)
+    resultados["calcular_metadatos_filtros"] = resumen_tiempos(tiempos, n)
+    df_indice = df_app.rename(columns={"Titulo": "titulo", "Descripción": "descripcion",
+                                       "Órgano de contratación": "organo_contratacion",
+                                       "Nº Expediente": "numero_expediente"})
+    tiempos, indice = medir(lambda: search_index.IndiceInvertido.construir(df_indice), 1)
+    resultados["construir_indice"] = resumen_tiempos(tiempos, n)
+
+    plan = [("palabras", None, ("OR", ("software", "servidores", "big data")))]
+    for col, meta in metadatos["columnas"].items():
+        if meta["tipo"] == "numerico":
+            plan.append(("rango", col, (meta["min"], meta["q_high"])))
+        elif meta["tipo"] == "fecha" and meta["fecha_max"] is not None:
+            plan.append(("fecha_hasta", col, (meta["fecha_max"],)))
+        elif meta["tipo"] == "categorico" and col == "Fuente":
+            plan.append(("valores", col, ("", tuple(meta["opciones"][:2]))))
+
+    tiempos, (mask, _) = medir(lambda: app.evaluar_plan(df_app, plan, metadatos, campo_busqueda, None),
+                               repeticiones)
+    resultados["evaluar_plan_subcadena"] = {**resumen_tiempos(tiempos, n), "filas_resultado": int(mask.sum())}
+    tiempos, (mask, _) = medir(lambda: app.evaluar_plan(df_app, plan, metadatos, campo_busqueda, indice),
+                               repeticiones)
+    resultados["evaluar_plan_indice"] = {**resumen_tiempos(tiempos, n), "filas_resultado": int(mask.sum())}
+    return resultados
+
+
+def ejecutar_tamano(n_filas, args, columnas_fuentes, columnas_finales, pdfs, config_nlp):
+    print(f"🟢 Benchmark con {n_filas} filas...")
+    resultados = {}
+    t0 = time.perf_counter()
+    dfs_crudos = synthetic_tenders.generar_licitaciones(n_filas, seed=args.seed, pdfs=pdfs)
+    resultados["generar_datos"] = resumen_tiempos([time.perf_counter() - t0], n_filas)
+
+    dfs_finales = []
+    tiempos_totales = [0.0] * args.repeticiones
+    for comunidad, df_crudo in dfs_crudos.items():
+        tiempos, df_final = medir(lambda: functions.filtrar_renombrar_dataframe(
+            df_crudo, comunidad, columnas_finales, columnas_fuentes[comunidad], "2025-07-01"), args.repeticiones)
+        tiempos_totales = [a + b for a, b in zip(tiempos_totales, tiempos)]
+        dfs_finales.append(df_final)
+    if "filtrar_renombrar" in args.benchmarks:
+        resultados["filtrar_renombrar_dataframe"] = resumen_tiempos(tiempos_totales, n_filas)
+    df_unificado = pd.concat(dfs_finales, ignore_index=True)
+
+    # Columnas crudas de fechas e importes (todas las fuentes) para las funciones de limpieza aisladas
+    fechas = pd.concat([df[col] for comunidad, df in dfs_crudos.items()
+                        for col, idx in columnas_fuentes[comunidad].items() if idx == 6], ignore_index=True)
+    importes = pd.concat([df[col] for comunidad, df in dfs_crudos.items()
+                          for col, idx in columnas_fuentes[comunidad].items() if idx == 4], ignore_index=True)
+    if "parsear_fechas" in args.benchmarks:
+        tiempos, _ = medir(lambda: functions.parsear_fechas_inteligente(fechas), args.repeticiones)
+        resultados["parsear_fechas_inteligente"] = resumen_tiempos(tiempos, len(fechas))
+    if "limpiar_importe" in args.benchmarks:
+        tiempos, _ = medir(lambda: importes.apply(functions.limpiar_importe), args.repeticiones)
+        resultados["limpiar_importe"] = resumen_tiempos(tiempos, len(importes))
+
+    if "combinar_duplicados" in args.benchmarks:
+        if n_filas <= args.max_filas_lentas:
+            tiempos, df_combinado = medir(lambda: functions.combinar_duplicados_por_expediente(
+                df_unificado, col_exp='numero_expediente'), 1)
+            resultados["combinar_duplicados_por_expediente"] = {**resumen_tiempos(tiempos, n_filas),
+                                                                "filas_resultado": len(df_combinado)}
+        else:
+            resultados["combinar_duplicados_por_expediente"] = {"omitido": f"más de {args.max_filas_lentas} filas"}
+
+    if "procesar_completo" in args.benchmarks:
+        df_nlp = df_unificado.head(args.max_filas_nlp)
+        try:
+            from src.lda_processor import LicitacionTextProcessor
+            t0 = time.perf_counter()
+            processor = LicitacionTextProcessor(df_nlp, config_file=config_nlp)
+            processor.procesar_completo()
+            resultados["procesar_completo"] = {
+                **resumen_tiempos([time.perf_counter() - t0], len(df_nlp)),
+                "con_pdf": int(df_nlp["pdf"].notna().sum()) if "pdf" in df_nlp.columns else 0,
+                "tokens_lematizados": processor.n_palabras_lematizadas,
+            }
+        except (ImportError, OSError) as e:
+            # Sin spaCy/gensim o sin el modelo es_core_news_* instalado
+            resultados["procesar_completo"] = {"omitido": str(e)}
+
+    if "memoria_unificacion" in args.benchmarks:
+        resultados["memoria_unificacion"] = benchmark_memoria_unificacion(dfs_crudos, columnas_fuentes,
+                                                                          columnas_finales)
+
+    if "filtros_app" in args.benchmarks:
+        try:
+            df_app, cols_filtrar = preparar_df_app(df_unificado, args.seed)
+            resultados["filtros_app"] = benchmark_filtros_app(df_app, cols_filtrar, args.repeticiones)
+        except ImportError as e:
+            resultados["filtros_app"] = {"omitido": str(e)}
+
+    for nombre, valores in resultados.items():
+        print(f"   {nombre}: {valores}")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks con licitaciones sintéticas")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000],
+                        help="Nº de filas de cada ejecución (p. ej. 1000 10000 100000 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--benchmarks", nargs="+", default=BENCHMARKS, choices=BENCHMARKS)
+    parser.add_argument("--pdfs", type=int, default=0, help="Nº de PDFs sintéticos a generar (0 = sin PDFs)")
+    parser.add_argument("--max_filas_nlp", type=int, default=2000,
+                        help="Filas usadas en procesar_completo (spaCy + LDA es lento)")
+    parser.add_argument("--max_filas_lentas", type=int, default=100000,
+                        help="Por encima de este tamaño se omite combinar_duplicados_por_expediente")
+    parser.add_argument("--config", default="./config/scraper_config.ini")
+    parser.add_argument("--salida", default="./benchmarks/resultados")
+    args = parser.parse_args()
+
+    columnas_fuentes, columnas_finales = synthetic_tenders.cargar_columnas_fuentes()
+    commit = commit_actual()
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "repeticiones": args.repeticiones,
+        "pdfs": args.pdfs,
+        "resultados": {},
+    }
+
+    with tempfile.TemporaryDirectory() as dir_tmp:
+        dir_pdf = os.path.join(dir_tmp, "pdfs")
+        pdfs = synthetic_tenders.generar_pdfs(dir_pdf, args.pdfs, seed=args.seed) if args.pdfs else []
+        config_nlp = config_benchmark(args.config, dir_pdf, dir_tmp)
+        for n_filas in args.tamanos:
+            informe["resultados"][str(n_filas)] = ejecutar_tamano(n_filas, args, columnas_fuentes,
+                                                                  columnas_finales, pdfs, config_nlp)
+
+    os.makedirs(args.salida, exist_ok=True)
+    nombre = f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'sin_commit'}.json"
+    ruta = os.path.join(args.salida, nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados del benchmark guardados en: {ruta}")
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/run_benchmarks.py                                  1k y 10k filas, sin PDFs
+# python benchmarks/run_benchmarks.py --tamanos 1000 100000 1000000    Escalado hasta 1M filas
+# python benchmarks/run_benchmarks.py --pdfs 50 --benchmarks procesar_completo
+# python benchmarks/run_benchmarks.py --tamanos 100000 --benchmarks memoria_unificacion
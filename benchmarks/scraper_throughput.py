@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.portal_server import PortalLocal, iniciar_servidor, escribir_config
+from benchmarks.run_benchmarks import commit_actual
+from src.pipeline_metrics import metricas
+
+SCRAPERS = ["madrid", "andalucia", "euskadi", "espana"]
+
+
+def crear_scraper(nombre, config_file, fecha, fecha_minima):
+    """
+    Instancia el Scraper* de la fuente (import perezoso: Selenium solo si se usa).
+    """
+    if nombre == "madrid":
+        from web_scraping.WS_madrid import ScraperMadrid
+        return ScraperMadrid(fecha=fecha, config_file=config_file, fecha_minima=fecha_minima)
+    if nombre == "andalucia":
+        from web_scraping.WS_andalucia import ScraperAndalucia
+        return ScraperAndalucia(fecha=fecha, fecha_minima=fecha_minima, config_file=config_file)
+    if nombre == "euskadi":
+        from web_scraping.WS_euskadi import ScraperEuskadi
+        return ScraperEuskadi(fecha=fecha, fecha_minima=fecha_minima, config_file=config_file)
+    if nombre == "espana":
+        from web_scraping.WS_espana import ScraperEspana
+        return ScraperEspana(fecha=fecha, config_file=config_file, fecha_minima=fecha_minima)
+    raise ValueError(f"Scraper no reconocido: {nombre}")
+
+
+def medir_scraper(nombre, portal_local, config_file):
+    """
+    Ejecuta un scraper contra el portal local y devuelve páginas/s y filas/s.
+    Las páginas son las peticiones HTML servidas (listados, búsqueda y detalles);
+    los PDF y los recursos estáticos (imágenes, fuentes) se cuentan aparte. Para los scrapers
+    con Chrome se añaden el arranque del navegador y el tiempo de carga por página.
+    """
+    portal_local.reiniciar_estadisticas()
+    metricas.reiniciar()
+    fecha = datetime.today().date()
+    fecha_minima = datetime(2000, 1, 1)
+    t0 = time.perf_counter()
+    try:
+        scraper = crear_scraper(nombre, config_file, fecha, fecha_minima)
+        t_arranque = time.perf_counter() - t0
+        df = scraper.ejecutar()
+    except Exception as e:
+        # Sin Selenium/Chrome en la máquina, etc.
+        return {"omitido": f"{type(e).__name__}: {e}"}
+    segundos = time.perf_counter() - t0
+
+    peticiones = dict(portal_local.estadisticas["peticiones"])
+    n_paginas = sum(n for tipo, n in peticiones.items() if tipo in ("listado", "busqueda", "detalle"))
+    n_filas = 0 if df is None else len(df)
+    return {
+        "segundos": round(segundos, 3),
+        "arranque_s": round(t_arranque, 3),
+        "paginas": n_paginas,
+        "filas": n_filas,
+        "filas_esperadas": portal_local.paginas * portal_local.filas_por_pagina,
+        "paginas_por_s": round(n_paginas / segundos, 2) if segundos else None,
+        "filas_por_s": round(n_filas / segundos, 2) if segundos else None,
+        "peticiones": peticiones,
+        "errores_inyectados": portal_local.estadisticas["errores_inyectados"],
+        "bytes": portal_local.estadisticas["bytes"],
+        "navegador": {h["nombre"]: {"n": h["n"], "media_s": h["media"], "max_s": h["max"]}
+                      for h in metricas.resumen()["histogramas"] if h["nombre"].startswith("navegador_")},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput de los scrapers contra el portal local")
+    parser.add_argument("--scrapers", nargs="+", default=SCRAPERS, choices=SCRAPERS)
+    parser.add_argument("--paginas", type=int, default=3)
+    parser.add_argument("--filas", type=int, default=10)
+    parser.add_argument("--latencia_ms", type=float, default=50)
+    parser.add_argument("--jitter_ms", type=float, default=0)
+    parser.add_argument("--tasa_errores", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--navegador", choices=["ligero", "completo"], default="ligero",
+                        help="Chrome con carga eager y recursos bloqueados, o carga completa de todo")
+    parser.add_argument("--config", default="./config/scraper_config.ini")
+    parser.add_argument("--salida", default="./benchmarks/resultados")
+    args = parser.parse_args()
+
+    portal_local = PortalLocal(paginas=args.paginas, filas_por_pagina=args.filas, latencia_ms=args.latencia_ms,
+                               jitter_ms=args.jitter_ms, tasa_errores=args.tasa_errores, seed=args.seed)
+    servidor, url_base = iniciar_servidor(portal_local)
+    commit = commit_actual()
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "portal": {"paginas": args.paginas, "filas_por_pagina": args.filas, "latencia_ms": args.latencia_ms,
+                   "jitter_ms": args.jitter_ms, "tasa_errores": args.tasa_errores, "seed": args.seed,
+                   "navegador": args.navegador},
+        "resultados": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory() as dir_tmp:
+            config_file = escribir_config(url_base, os.path.join(dir_tmp, "scraper_config_local.ini"),
+                                          config_file=args.config, paginas=args.paginas, dir_salida=dir_tmp,
+                                          navegador=args.navegador)
+            for nombre in args.scrapers:
+                print(f"🟢 Midiendo scraper {nombre}...")
+                informe["resultados"][nombre] = medir_scraper(nombre, portal_local, config_file)
+                print(f"   {nombre}: {informe['resultados'][nombre]}")
+    finally:
+        servidor.shutdown()
+
+    os.makedirs(args.salida, exist_ok=True)
+    ruta = os.path.join(args.salida, f"throughput_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'sin_commit'}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados de throughput guardados en: {ruta}")
+
+
+if __name__ == "__main__":
+    main()
+
+# python benchmarks/scraper_throughput.py --scrapers madrid --paginas 5 --latencia_ms 100
+# python benchmarks/scraper_throughput.py --tasa_errores 0.05
+# python benchmarks/scraper_throughput.py --scrapers euskadi espana --navegador completo   sin bloqueo de recursos
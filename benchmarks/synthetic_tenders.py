@@ -0,0 +1,204 @@
+import os
+import configparser
+import numpy as np
+import pandas as pd
+import src.functions as functions
+
+# Comunidad del benchmark → (sección de columnas en scraper_columns.ini, prefijo de URL)
+FUENTES = {
+    'and': ('and_columns_order', "https://www.juntadeandalucia.es/haciendayadministracionpublica/apl/pdc-front-publico/perfiles-licitaciones/detalle-licitacion?idExpediente="),
+    'esp': ('esp_columns_order', "https://contrataciondelestado.es/wps/poc?uri=deeplink:detalle_licitacion&idEvl="),
+    'eus': ('eus_columns_order', "https://www.uragentzia.euskadi.eus/webura00-contents/es/contenidos/anuncio_contratacion/"),
+    'mad': ('mad_columns_order', "https://contratos-publicos.comunidad.madrid/contrato-publico/"),
+}
+
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+         "septiembre", "octubre", "noviembre", "diciembre"]
+
+TITULOS_TEC = [
+    "Suministro de servidores y virtualización para el centro de datos",
+    "Servicio de mantenimiento informático y soporte de software ERP",
+    "Plataforma de big data y analítica avanzada",
+    "Servicios de ciberseguridad y hosting en la nube",
+    "Implantación de CRM y automatización de procesos con RPA",
+    "Desarrollo de modelos predictivos e inteligencia artificial",
+]
+TITULOS_NO_TEC = [
+    "Obras de pavimentación y rehabilitación de aceras",
+    "Servicio de limpieza y jardinería de zonas verdes",
+    "Catering y comedores escolares",
+    "Arrendamiento de vehículos para transporte escolar",
+    "Suministro de mobiliario y material de oficina",
+    "Mantenimiento de viales y reparación de firmes",
+]
+TIPOS_CONTRATO = ["Servicios", "Suministros", "Obras", "Concesión de servicios", "Privado"]
+ESTADOS = ["Publicada", "En plazo", "Evaluación", "Adjudicada", "Resuelta"]
+ORGANOS = ["Ayuntamiento de Sevilla", "Diputación de Málaga", "Servicio Andaluz de Salud",
+           "Ministerio de Hacienda", "Ayuntamiento de Bilbao", "Osakidetza",
+           "Canal de Isabel II", "Consejería de Sanidad", "Universidad de Granada"]
+PROCEDIMIENTOS = ["Abierto", "Abierto simplificado", "Negociado sin publicidad", "Restringido", "Basado en acuerdo marco"]
+FORMAS_PRESENTACION = ["Electrónica", "Manual", "Manual y electrónica"]
+LUGARES = ["ES612 Córdoba", "ES618 Sevilla", "ES213 Bizkaia", "ES300 Madrid", "ES617 Málaga", "ES211 Araba/Álava"]
+SISTEMAS = ["No aplica", "Acuerdo marco", "Sistema dinámico de adquisición"]
+TRAMITACIONES = ["Ordinaria", "Urgente", "Emergencia"]
+CPVS = ["72000000", "48000000", "30200000", "45233140", "90910000", "55520000", "34110000", "39130000"]
+
+
+def cargar_columnas_fuentes(columns_file="./config/scraper_columns.ini"):
+    """
+    Devuelve {comunidad: {columna_cruda: indice_final}} y las columnas finales desde el .ini,
+    para que los datos sintéticos sigan siempre el mismo formato que los scrapers.
+    """
+    columns_ini = configparser.ConfigParser()
+    columns_ini.read(columns_file, encoding='utf-8')
+    columnas_fuentes = {comunidad: functions.get_columns_dict(columns_ini[seccion])
+                        for comunidad, (seccion, _) in FUENTES.items()}
+    columnas_finales = functions.get_columns_dict(columns_ini["final_columns_order"])
+    return columnas_fuentes, columnas_finales
+
+
+def _importes(rng, n):
+    """
+    Importes en los formatos que devuelven los portales: '1.234,56 €', '1234,56', '12.500,00 euros', '1500.5'.
+    """
+    valores = np.round(rng.lognormal(mean=10.5, sigma=1.5, size=n), 2)
+    formato = rng.integers(0, 4, size=n)
+    salida = []
+    for valor, f in zip(valores, formato):
+        es = f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        if f == 0:
+            salida.append(f"{es} €")
+        elif f == 1:
+            salida.append(es.replace(".", ""))
+        elif f == 2:
+            salida.append(f"{es} euros")
+        else:
+            salida.append(f"{valor}")
+    return salida
+
+
+def _fechas(rng, n, fecha_base):
+    """
+    Fechas límite en los formatos vistos en los portales (texto en español, dd/mm/aaaa, ISO, con hora).
+    Un pequeño porcentaje queda vacío para ejercitar la fecha por defecto.
+    """
+    dias = rng.integers(1, 120, size=n)
+    formato = rng.integers(0, 5, size=n)
+    vacias = rng.random(n) < 0.03
+    base = pd.Timestamp(fecha_base)
+    salida = []
+    for d, f, vacia in zip(dias, formato, vacias):
+        if vacia:
+            salida.append(None)
+            continue
+        fecha = base + pd.Timedelta(days=int(d))
+        if f == 0:
+            salida.append(f"{fecha.day} de {MESES[fecha.month - 1]} del {fecha.year} 23:59")
+        elif f == 1:
+            salida.append(fecha.strftime("%d/%m/%Y"))
+        elif f == 2:
+            salida.append(fecha.strftime("%Y-%m-%d"))
+        elif f == 3:
+            salida.append(fecha.strftime("%d/%m/%Y 14:00"))
+        else:
+            salida.append(fecha.strftime("%d-%m-%Y"))
+    return salida
+
+
+def _valores_por_indice(rng, n, comunidad, expedientes, fecha_base, pdfs):
+    """
+    Genera las columnas sintéticas indexadas por su posición en final_columns_order.
+    """
+    es_tec = rng.random(n) < 0.35
+    titulos = np.where(es_tec, rng.choice(TITULOS_TEC, size=n), rng.choice(TITULOS_NO_TEC, size=n))
+    lotes = rng.integers(1, 9, size=n)
+    titulos = [f"{t} - Lote {l}" for t, l in zip(titulos, lotes)]
+    descripciones = [f"{t}. Contrato de {tipo.lower()} para {organo}."
+                     for t, tipo, organo in zip(titulos, rng.choice(TIPOS_CONTRATO, size=n), rng.choice(ORGANOS, size=n))]
+    url_base = FUENTES[comunidad][1]
+    if pdfs:
+        con_pdf = rng.random(n) < 0.5
+        columna_pdf = [pdfs[i] if tiene else None for i, tiene in zip(rng.integers(0, len(pdfs), size=n), con_pdf)]
+    else:
+        columna_pdf = [None] * n
+    return {
+        0: titulos,
+        1: expedientes,
+        2: rng.choice(TIPOS_CONTRATO, size=n),
+        3: rng.choice(ESTADOS, size=n),
+        4: _importes(rng, n),
+        5: _importes(rng, n),
+        6: _fechas(rng, n, fecha_base),
+        7: rng.choice(ORGANOS, size=n),
+        8: [f"{url_base}{e}" for e in expedientes],
+        9: rng.choice(CPVS, size=n),
+        10: rng.choice(PROCEDIMIENTOS, size=n),
+        11: rng.choice(FORMAS_PRESENTACION, size=n),
+        12: [f"{m} meses" for m in rng.integers(1, 49, size=n)],
+        13: rng.choice(["Sí", "No"], size=n, p=[0.1, 0.9]),
+        14: _fechas(rng, n, fecha_base),
+        15: rng.choice(LUGARES, size=n),
+        16: rng.choice(SISTEMAS, size=n),
+        17: rng.choice(TRAMITACIONES, size=n),
+        18: descripciones,
+        19: columna_pdf,
+    }
+
+
+def generar_pdfs(directorio, n_pdfs, seed=42):
+    """
+    Genera n_pdfs pliegos sintéticos de varias páginas con PyMuPDF (si está instalado).
+    Devuelve la lista de nombres de fichero (relativos a 'directorio').
+    """
+    try:
+        import fitz
+    except ImportError:
+        print("⚠️ PyMuPDF no está instalado: se generan los datos sin PDFs")
+        return []
+    rng = np.random.default_rng(seed)
+    os.makedirs(directorio, exist_ok=True)
+    nombres = []
+    for i in range(n_pdfs):
+        nombre = f"pliego_sintetico_{i:05d}.pdf"
+        doc = fitz.open()
+        titulos = TITULOS_TEC if i % 3 == 0 else TITULOS_NO_TEC
+        for _ in range(int(rng.integers(2, 12))):
+            pagina = doc.new_page()
+            parrafos = rng.choice(titulos + TITULOS_NO_TEC, size=25)
+            pagina.insert_textbox(pagina.rect + (40, 40, -40, -40),
+                                  "\n".join(f"{p}. Prescripciones técnicas del contrato." for p in parrafos),
+                                  fontsize=9)
+        doc.save(os.path.join(directorio, nombre))
+        doc.close()
+        nombres.append(nombre)
+    print(f"✅ {len(nombres)} PDFs sintéticos generados en {directorio}")
+    return nombres
+
+
+def generar_licitaciones(n_filas, seed=42, fecha_base="2025-07-01", pdfs=None, solape=0.1,
+                         columns_file="./config/scraper_columns.ini"):
+    """
+    Genera DataFrames crudos con el formato de columnas de cada portal.
+
+    Args:
+        n_filas: nº total de filas a repartir entre las cuatro fuentes
+        seed: semilla (misma semilla → mismos datos)
+        fecha_base: fecha a partir de la cual se generan las fechas límite
+        pdfs: nombres de PDF generados (ver generar_pdfs) para rellenar la columna de pliego
+        solape: fracción de expedientes repetidos entre fuentes (para combinar duplicados)
+
+    Returns:
+        dict {comunidad: DataFrame crudo}
+    """
+    rng = np.random.default_rng(seed)
+    columnas_fuentes, _ = cargar_columnas_fuentes(columns_file)
+    reparto = rng.multinomial(n_filas, [0.3, 0.4, 0.1, 0.2])
+    n_unicos = max(1, int(n_filas * (1 - solape)))
+
+    dfs = {}
+    for (comunidad, columnas), n in zip(columnas_fuentes.items(), reparto):
+        ids = rng.integers(0, n_unicos, size=n)
+        expedientes = [f"EXP-{i:07d}" for i in ids]
+        valores = _valores_por_indice(rng, n, comunidad, expedientes, fecha_base, pdfs or [])
+        dfs[comunidad] = pd.DataFrame({col: valores[idx] for col, idx in columnas.items()})
+    return dfs
@@ -1,16 +1,126 @@
 import os
+import time
+T_INICIO_IMPORT = time.perf_counter()
 import pandas as pd
 import src.functions as functions
 import src.lda_processor as lda_processor
+import src.search_index as search_index
+from src.lemma_cache import LemmaCache
+from src.pipeline_metrics import metricas
+from src.stage_profiler import PerfiladorEtapas, MODOS_PERFIL, rss_pico_bytes
+from src.pipeline_stages import AlmacenEtapas, huella_dataframe, huella_fichero, huella_ficheros, seccion_ini
 import configparser
-from web_scraping.WS_andalucia import ScraperAndalucia
-from web_scraping.WS_espana import ScraperEspana
-from web_scraping.WS_euskadi import ScraperEuskadi
-from web_scraping.WS_madrid import ScraperMadrid
+from collections import Counter
 from datetime import datetime, timedelta
+# Los scrapers (Selenium, webdriver_manager...) se importan solo al ejecutar cada fuente
+T_FIN_IMPORT = time.perf_counter()
 
 
-def main(fecha_proceso = None, usar_scraping = True):
+FUENTES = [("andalucia", "and"), ("espana", "esp"), ("euskadi", "eus"), ("madrid", "mad")]
+
+
+class SinDatosCrudos(ValueError):
+    """
+    La fuente no tiene datos crudos (el scraper o el fichero no devolvieron nada): se omite.
+    """
+
+
+def ejecutar_scrapers(fecha_ejecucion, fecha_minima, config_path, perfilador):
+    """
+    Etapa cruda en modo scraping: ejecuta los cuatro scrapers.
+
+    Returns:
+        dict: {fuente: DataFrame} (None si el scraper no devolvió nada)
+    """
+    dfs = {}
+    # Ejecutar scrapers
+    print("🟢 Ejecutando scraper Andalucía...")
+    from web_scraping.WS_andalucia import ScraperAndalucia
+    with perfilador.etapa("scrape_andalucia"), metricas.temporizador("scraper", fuente="andalucia"):
+        dfs["andalucia"] = ScraperAndalucia(fecha = fecha_ejecucion,
+                                            fecha_minima=fecha_minima,
+                                            config_file = config_path).ejecutar()
+    print("✅ Scraper Andalucía completado!")
+
+    print("🟢 Ejecutando scraper Estado...")
+    from web_scraping.WS_espana import ScraperEspana
+    with perfilador.etapa("scrape_espana"), metricas.temporizador("scraper", fuente="espana"):
+        dfs["espana"] = ScraperEspana(fecha = fecha_ejecucion,
+                                      config_file = config_path).ejecutar()
+    print("✅ Scraper España completado!")
+    print("🟢 Ejecutando scraper Euskadi...")
+    from web_scraping.WS_euskadi import ScraperEuskadi
+    with perfilador.etapa("scrape_euskadi"), metricas.temporizador("scraper", fuente="euskadi"):
+        dfs["euskadi"] = ScraperEuskadi(fecha = fecha_ejecucion,
+                                        fecha_minima=fecha_minima,
+                                        config_file = config_path).ejecutar()
+    print("✅ Scraper Euskadi completado!")
+    print("🟢 Ejecutando scraper Madrid...")
+    from web_scraping.WS_madrid import ScraperMadrid
+    with perfilador.etapa("scrape_madrid"), metricas.temporizador("scraper", fuente="madrid"):
+        dfs["madrid"] = ScraperMadrid(fecha = fecha_ejecucion,
+                                      config_file = config_path,
+                                      fecha_minima = fecha_minima).ejecutar()
+    print("✅ Scraper Madrid completado!")
+    return dfs
+
+
+def entradas_crudas(usar_scraping, config, config_path, fecha_proceso, fecha_ejecucion, perfilador):
+    """
+    Etapa cruda: datos de cada fuente, recién scrapeados o leídos de los CSV de la carpeta de datos.
+    Los CSV no se leen aquí: su clave es la huella del fichero y solo se leen si la etapa
+    normalizada de esa fuente tiene que recalcularse.
+
+    Returns:
+        dict: {fuente: (clave_crudo, funcion que devuelve el DataFrame crudo)}
+    """
+    crudos = {}
+    if usar_scraping:
+        dias_fecha_min = int(config.get("all_params", "dias_fecha_min"))
+        fecha_minima = datetime.today() + timedelta(days=dias_fecha_min)
+        dfs = ejecutar_scrapers(fecha_ejecucion, fecha_minima, config_path, perfilador)
+        for fuente, df_ in dfs.items():
+            if df_ is not None:
+                metricas.contar("filas_total", len(df_), etapa="entrada", fuente=fuente)
+                # pop: el DataFrame crudo se libera en cuanto se normaliza
+                crudos[fuente] = (huella_dataframe(df_), lambda fuente=fuente: dfs.pop(fuente))
+        return crudos
+
+    print(f"🟢 Localizando ficheros de licitaciones...")
+    # 🟠 Datos desde CSVs en carpeta de datos
+    input_dir = config.get("input_output_path", "output_dir", fallback="./datos")
+
+    def leer(fuente):
+        print(f"🟢 Fichero {fuente.capitalize()}...")
+        with perfilador.etapa(f"lectura_{fuente}"), metricas.temporizador("lectura_fichero", fuente=fuente):
+            df_ = functions.leer_fichero_licitaciones(input_dir = input_dir,
+                                                      comunidad = fuente,
+                                                      sep = '\t',
+                                                      fecha_proceso = fecha_proceso)
+        if df_ is not None:
+            metricas.contar("filas_total", len(df_), etapa="entrada", fuente=fuente)
+        return df_
+
+    for fuente, _ in FUENTES:
+        try:
+            ruta = functions.ruta_fichero_licitaciones(input_dir, fuente, fecha_proceso)
+            if ruta is not None:
+                crudos[fuente] = (huella_fichero(ruta), lambda fuente=fuente: leer(fuente))
+        except Exception as e:
+            print(f"⚠️ Error cargando {fuente.capitalize()}: {e}")
+    return crudos
+
+
+def registrar_memoria(etapa):
+    """
+    Pico de RSS del proceso al terminar la etapa (no disponible en Windows).
+    """
+    pico = rss_pico_bytes()
+    if pico is not None:
+        metricas.fijar("memoria_rss_pico_bytes", pico, etapa=etapa)
+
+
+def main(fecha_proceso = None, usar_scraping = True, perfil = None, recalcular = False):
     # Cargar configs
     config_path = "./config/scraper_config.ini"
     columns_path = "./config/scraper_columns.ini"
@@ -20,144 +130,173 @@ def main(fecha_proceso = None, usar_scraping = True):
     columns_ini.read(columns_path)
 
     output_dir = config.get("input_output_path", "output_dir_final", fallback="./output_final")
-    dias_fecha_min = int(config.get("all_params", "dias_fecha_min"))
     os.makedirs(output_dir, exist_ok=True)
 
-    # Extraer columnas finales y por comunidad
+    # Extraer columnas finales
     columnas_finales = functions.get_columns_dict(columns_ini["final_columns_order"])
-    columns_and = functions.get_columns_dict(columns_ini["and_columns_order"])
-    columns_esp = functions.get_columns_dict(columns_ini["esp_columns_order"])
-    columns_eus = functions.get_columns_dict(columns_ini["eus_columns_order"])
-    columns_mad = functions.get_columns_dict(columns_ini["mad_columns_order"])
     hoy = datetime.today()
     fecha_ejecucion = fecha_proceso if fecha_proceso else hoy.date()
     print(f'fecha ejecucion {fecha_ejecucion}')
 
-    if usar_scraping:
-        fecha_minima = hoy + timedelta(days=dias_fecha_min)
-        df_and = df_esp = df_eus = df_mad = None
-        # Ejecutar scrapers
-        print("🟢 Ejecutando scraper Andalucía...")
-        df_and = ScraperAndalucia(fecha = fecha_ejecucion,
-                                  fecha_minima=fecha_minima,
-                                  config_file = config_path).ejecutar()
-        print("✅ Scraper Andalucía completado!")
-
-        print("🟢 Ejecutando scraper Estado...")
-        df_esp = ScraperEspana(fecha = fecha_ejecucion,
-                               config_file = config_path).ejecutar()
-        print("✅ Scraper España completado!")
-        print("🟢 Ejecutando scraper Euskadi...")
-        df_eus = ScraperEuskadi(fecha = fecha_ejecucion,
-                                fecha_minima=fecha_minima,
-                                config_file = config_path).ejecutar()
-        print("✅ Scraper Euskadi completado!")
-        print("🟢 Ejecutando scraper Madrid...")
-        df_mad = ScraperMadrid(fecha = fecha_ejecucion,
-                               config_file = config_path,
-                               fecha_minima = fecha_minima).ejecutar()
-        print("✅ Scraper Madrid completado!")
-    else:
-        print(f"🟢 Leyendo ficheros de licitaciones...")
-        # 🟠 Leer datos desde CSVs en carpeta de datos
-        input_dir = config.get("input_output_path", "output_dir", fallback="./datos")
-        df_and = df_esp = df_eus = df_mad = None
-        try:
-            print("🟢 Fichero Andalucía...")
-            df_and = functions.leer_fichero_licitaciones(input_dir = input_dir,
-                                                         comunidad = 'andalucia',
-                                                         sep = '\t',
-                                                         fecha_proceso = fecha_proceso)
+    metricas.reiniciar()
+    # Perfilado opcional por etapa (--profile cpu|mem): resultados junto al CSV de salida
+    perfilador = PerfiladorEtapas(perfil, os.path.join(output_dir, f"perfil_{perfil}"))
+    metricas.fijar("arranque_import_segundos", round(T_FIN_IMPORT - T_INICIO_IMPORT, 3))
+    # Artefactos intermedios: solo se recalculan las etapas cuyas entradas han cambiado
+    almacen = AlmacenEtapas(config.get("input_output_path", "dir_etapas", fallback=os.path.join(output_dir, "etapas")),
+                            forzar=recalcular)
 
-        except Exception as e:
-            print(f"⚠️ Error cargando Andalucía: {e}")
+    # 1. Crudo
+    crudos = entradas_crudas(usar_scraping, config, config_path, fecha_proceso, fecha_ejecucion, perfilador)
 
-        try:
-            print("🟢 Fichero España...")
-            df_esp = functions.leer_fichero_licitaciones(input_dir = input_dir, 
-                                                         comunidad = 'espana', 
-                                                         sep = '\t',
-                                                         fecha_proceso = fecha_proceso)
-        except Exception as e:
-            print(f"⚠️ Error cargando España: {e}")
+    # 2. Normalizado por fuente: filtrar, renombrar y añadir info
+    normalizados = []
+    for fuente, abreviatura in FUENTES:
+        if fuente not in crudos:
+            continue
+        clave_crudo, obtener_crudo = crudos.pop(fuente)
+        seccion_columnas = f"{abreviatura}_columns_order"
+        etapa = f"normalizado:{fuente}"
+        clave = almacen.clave(etapa, clave_crudo, seccion_ini(columns_ini, seccion_columnas),
+                              seccion_ini(columns_ini, "final_columns_order"), str(fecha_ejecucion))
 
-        try:
-            print("🟢 Fichero Euskadi...")
-            df_eus = functions.leer_fichero_licitaciones(input_dir = input_dir,
-                                                         comunidad = 'euskadi',
-                                                         sep ="\t",
-                                                         fecha_proceso = fecha_proceso)
-        except Exception as e:
-            print(f"⚠️ Error cargando Euskadi: {e}")
+        # Los datos crudos se leen antes de la etapa (y solo si hay que recalcularla), para que la
+        # lectura tenga su propio perfil y no cuente en el tiempo de filtrar_renombrar
+        df_crudo = None if almacen.reutilizable(etapa, clave) else obtener_crudo()
 
+        def normalizar():
+            # Si el artefacto resulta ilegible se recalcula y hay que leer los datos crudos aquí
+            crudo = df_crudo if df_crudo is not None else obtener_crudo()
+            if crudo is None:
+                raise SinDatosCrudos(f"sin datos crudos de {fuente}")
+            print(f"🔹 Filtrando y renombrando DataFrame {fuente.capitalize()}...")
+            return functions.filtrar_renombrar_dataframe(crudo, abreviatura, columnas_finales,
+                                                         functions.get_columns_dict(columns_ini[seccion_columnas]),
+                                                         fecha_ejecucion)
         try:
-            print("🟢 Fichero Madrid...")
-            df_mad = functions.leer_fichero_licitaciones(input_dir = input_dir,
-                                                comunidad = 'madrid',
-                                                sep ="\t",
-                                                fecha_proceso = fecha_proceso)
-        except Exception as e:
-            print(f"⚠️ Error cargando Madrid: {e}")
-
-    # Filtrar, renombrar y añadir info
-    df_and_final = df_esp_final = df_eus_final = df_mad_final = None
-
-    if df_and is not None:
-        print("🔹 Filtrando y renombrando DataFrame Andalucía...")
-        df_and_final = functions.filtrar_renombrar_dataframe(df_and, "and", columnas_finales, columns_and, fecha_ejecucion)
-        print(f"✅ Andalucía procesada: {df_and_final.shape[0]} registros")
-
-    if df_esp is not None:
-        print("🔹 Filtrando y renombrando DataFrame Estado...")
-        df_esp_final = functions.filtrar_renombrar_dataframe(df_esp, "esp", columnas_finales, columns_esp, fecha_ejecucion)
-        print(f"✅ Estado procesado: {df_esp_final.shape[0]} registros")
-        
-    if df_eus is not None:
-        print("🔹 Filtrando y renombrando DataFrame Euskadi...")
-        df_eus_final = functions.filtrar_renombrar_dataframe(df_eus, "eus", columnas_finales, columns_eus, fecha_ejecucion)
-        print(f"✅ Euskadi procesado: {df_eus_final.shape[0]} registros")
-
-    if df_mad is not None:
-        print("🔹 Filtrando y renombrando DataFrame Madrid...")
-        df_mad_final = functions.filtrar_renombrar_dataframe(df_mad, "mad", columnas_finales, columns_mad, fecha_ejecucion)
-        print(f"✅ Madrid procesado: {df_mad_final.shape[0]} registros")
-
-    # Unificar
-    print("🔹 Unificando los DataFrames de las distintas comunidades...")
+            with perfilador.etapa("filtrar_renombrar"), metricas.temporizador("filtrar_renombrar", fuente=fuente):
+                df_normalizado, _ = almacen.obtener(etapa, clave, normalizar)
+        except SinDatosCrudos as e:
+            # Solo se omite la fuente sin entrada; un fallo al normalizar datos que sí existen se propaga
+            print(f"⚠️ {fuente.capitalize()} omitida: {e}")
+            continue
+        finally:
+            df_crudo = None
+        metricas.contar("filas_total", df_normalizado.shape[0], etapa="filtrar_renombrar", fuente=fuente)
+        print(f"✅ {fuente.capitalize()} procesada: {df_normalizado.shape[0]} registros")
+        normalizados.append((clave, df_normalizado))
+    # Fuera de 'normalizados' no queda ninguna referencia a datos crudos ni normalizados
+    obtener_crudo = df_normalizado = None
 
-    # Filtra los DataFrames que no sean None antes de concatenar
-    dfs_a_unir = [df for df in [df_and_final, df_esp_final, df_eus_final, df_mad_final] if df is not None]
+    # 3. Unificado
+    print("🔹 Unificando los DataFrames de las distintas comunidades...")
+    clave_unificado = almacen.clave("unificado", [clave for clave, _ in normalizados])
 
-    if dfs_a_unir:
-        print("🔹 Unificando información...")
-        print(f'uniendo {len(dfs_a_unir)} dataframes...')
-        for df_ in dfs_a_unir:
+    def unificar():
+        if not normalizados:
+            print("⚠️ No hay DataFrames para unificar. El DataFrame unificado está vacío.")
+            return pd.DataFrame()
+        print(f'uniendo {len(normalizados)} dataframes...')
+        for _, df_ in normalizados:
             print(f'shape dataset {df_.shape}')
-        df_unificado = pd.concat(dfs_a_unir, ignore_index=True)
         # df_unificado = functions.combinar_duplicados_por_expediente(df_unificado, col_exp = 'numero_expediente')
-        print(f"✅ Unificación completada. Total registros: {df_unificado.shape[0]}")
-    else:
-        df_unificado = pd.DataFrame()
-        print("⚠️ No hay DataFrames para unificar. El DataFrame unificado está vacío.")
+        return pd.concat([df_ for _, df_ in normalizados], ignore_index=True)
+
+    with perfilador.etapa("unificacion"), metricas.temporizador("unificacion"):
+        df_unificado, _ = almacen.obtener("unificado", clave_unificado, unificar)
+    # pd.concat reserva una sola vez cada bloque del resultado; las copias por fuente se sueltan ya
+    normalizados.clear()
+    registrar_memoria("unificacion")
+    metricas.contar("filas_total", df_unificado.shape[0], etapa="unificacion")
+    print(f"✅ Unificación completada. Total registros: {df_unificado.shape[0]}")
+
+    # 4. Características NLP (PDF, lematización, LDA y palabras clave detectadas en el PDF):
+    # dependen de la columna pdf, de los propios PDFs, de [nlp_params] y de las palabras clave,
+    # no de la fecha de proceso. El texto del PDF no se guarda, solo características compactas
+    dir_pdf = config.get('input_output_path', 'output_dir_pdf', fallback="./pdfs")
+    nombres_pdf = df_unificado["pdf"] if "pdf" in df_unificado.columns else pd.Series([""] * len(df_unificado))
+    entradas_nlp = [huella_dataframe(nombres_pdf.to_frame("pdf")), huella_ficheros(dir_pdf, nombres_pdf),
+                    seccion_ini(config, "nlp_params", excluir=("cache_lemas", "max_entradas_cache_lemas")),
+                    seccion_ini(config, "palabras_clave_tecnologia"),
+                    seccion_ini(config, "palabras_descarte_tecnologia")]
+    clave_nlp = almacen.clave("caracteristicas_nlp", *entradas_nlp)
+
+    def calcular_caracteristicas():
+        print("🟢 Clasificación de texto...")
+        t_inicio_init = time.perf_counter()
+        processor = lda_processor.LicitacionTextProcessor(df_unificado, config_file=config_path, copiar=False)
+        print(f"⏱️ Arranque: import {T_FIN_IMPORT - T_INICIO_IMPORT:.3f} s + "
+              f"init procesador {time.perf_counter() - t_inicio_init:.3f} s")
+        return processor.calcular_caracteristicas()
+
+    with perfilador.etapa("caracteristicas_nlp"), metricas.temporizador("caracteristicas_nlp"):
+        caracteristicas, _ = almacen.obtener("caracteristicas_nlp", clave_nlp, calcular_caracteristicas)
+
+    # 5. Clasificación con las palabras clave del .ini
+    clave_clasificacion = almacen.clave("clasificacion", clave_unificado, clave_nlp,
+                                        seccion_ini(config, "palabras_clave_tecnologia"),
+                                        seccion_ini(config, "palabras_descarte_tecnologia"))
 
-    # Inicializar el clasificador de tecnología
-    print("🟢 Clasificación de texto...")
-    processor = lda_processor.LicitacionTextProcessor(df_unificado, config_file="./config/scraper_config.ini")
-    df_final = processor.procesar_completo()
+    def clasificar():
+        processor = lda_processor.LicitacionTextProcessor(df_unificado, config_file=config_path, copiar=False)
+        return processor.clasificar(caracteristicas)
+
+    with perfilador.etapa("clasificacion"), metricas.temporizador("clasificacion"):
+        df_final, _ = almacen.obtener("clasificacion", clave_clasificacion, clasificar)
+    # Si la clasificación viene del almacén, df_unificado es otra copia completa que ya no hace falta
+    df_unificado = nombres_pdf = None
     print(f'df final linea 147 {df_final.shape}')
 
-    # Guardar
-    print("Conteo de NaN en columna 'titulo' por comunidad:")
-    print(df_unificado.fuente.unique())
+    # 6. Publicación: CSV de la app e índice de búsqueda
     output_file = os.path.join(output_dir, f"licitaciones.csv")
-    df_final = df_final.dropna(subset=['titulo'])
-    df_final[df_final.select_dtypes(include=['object']).columns] = df_final.select_dtypes(include=['object']).fillna('NotFound')
-    df_final[df_final.select_dtypes(include=['float','int']).columns] = df_final.select_dtypes(include=['float','int']).fillna(-1)
+    ruta_indice = os.path.join(output_dir, search_index.NOMBRE_INDICE)
+    clave_publicacion = almacen.clave("publicacion", clave_clasificacion)
+    if almacen.vigente("publicacion", clave_publicacion, salidas=[output_file, ruta_indice]):
+        print(f"♻️ {output_file} ya está al día, no se vuelve a escribir")
+        almacen.marcar("publicacion", clave_publicacion, "reutilizada", salidas=[output_file, ruta_indice])
+    else:
+        t_publicacion = time.perf_counter()
+        # Guardar
+        print("Conteo de NaN en columna 'titulo' por comunidad:")
+        print(df_final.fuente.unique() if "fuente" in df_final.columns else [])
+        functions.preparar_para_publicacion(df_final)
+        print(f'df final linea 156 {df_final.shape}')
+        with perfilador.etapa("escritura"), metricas.temporizador("escritura_csv"):
+            df_final.to_csv(output_file, index=False,sep="\t", encoding="utf-8-sig")
+        metricas.contar("filas_total", df_final.shape[0], etapa="escritura_csv")
+        print(f"✅ Archivo final de licitaciones guardado en: {output_file}")
+
+        # Índice invertido para la búsqueda por palabras clave de la app
+        print("🔹 Construyendo índice de búsqueda...")
+        with metricas.temporizador("indice_busqueda"):
+            # El índice se construye sobre el CSV tal y como lo leerá la app (texto, mismas filas)
+            # y su huella es la del fichero escrito, no la del DataFrame en memoria
+            df_publicado = pd.read_csv(output_file, sep="\t", encoding="utf-8-sig", dtype=str)
+            terminos_pdf = {}
+            for posicion, conteo in enumerate(caracteristicas["terminos_pdf"].reindex(df_final.index)):
+                if isinstance(conteo, dict) and conteo:
+                    terminos = terminos_pdf[posicion] = Counter()
+                    for termino, frecuencia in conteo.items():
+                        for token in search_index.tokenizar_busqueda(termino):
+                            terminos[token] += frecuencia
+            cache_lemas = LemmaCache(config.get("nlp_params", "cache_lemas", fallback=None),
+                                     config.getint("nlp_params", "max_entradas_cache_lemas", fallback=200000))
+            indice = search_index.IndiceInvertido.construir(df_publicado, terminos_extra=terminos_pdf,
+                                                            lemas=cache_lemas.lemas,
+                                                            huella=search_index.huella_csv(output_file))
+            indice.guardar(ruta_indice)
+            df_publicado = cache_lemas = None
+        almacen.marcar("publicacion", clave_publicacion, "calculada", time.perf_counter() - t_publicacion,
+                       salidas=[output_file, ruta_indice])
+    metricas.fijar("csv_bytes", os.path.getsize(output_file))
+    metricas.fijar("indice_busqueda_bytes", os.path.getsize(ruta_indice))
+    registrar_memoria("publicacion")
+    almacen.guardar_estado()
 
-    df_final = df_final.loc[:, ~df_final.columns.str.contains('^Unnamed')]
-    print(f'df final linea 156 {df_final.shape}')
-    df_final.to_csv(output_file, index=False,sep="\t", encoding="utf-8-sig")
-    print(f"✅ Archivo final de licitaciones guardado en: {output_file}")
+    # Resumen de métricas de la ejecución (JSON + formato texto de Prometheus) junto al CSV
+    metricas.guardar(output_dir, max_lineas_historico=config.getint("input_output_path", "max_lineas_historico_metricas",
+                                                                    fallback=520))
+    perfilador.guardar_resumen()
 
 
 import argparse
@@ -175,14 +314,32 @@ if __name__ == "__main__":
         help="Ejecutar scraping en lugar de leer archivos existentes"
     )
 
+    parser.add_argument(
+        "--profile",
+        choices=MODOS_PERFIL,
+        default=None,
+        help="Perfilar cada etapa: 'cpu' (cProfile → .pstats) o 'mem' (tracemalloc + pico de RSS)"
+    )
+
+    parser.add_argument(
+        "--recalcular",
+        action="store_true",
+        help="Recalcular todas las etapas aunque sus artefactos intermedios estén al día"
+    )
+
     args = parser.parse_args()
 
     main(fecha_proceso=args.fecha_proceso,
-         usar_scraping=args.usar_scraping)
+         usar_scraping=args.usar_scraping,
+         perfil=args.profile,
+         recalcular=args.recalcular)
 
 #python main_scraping.py                  No hace scraping, lee ficheros con fecha más actualizada
 #python main_scraping.py 2024-06-01       No hace scraping, lee ficheros con fecha la que se le pasa
 #python main_scraping.py --usar_scraping  Hace scraping
+#python main_scraping.py --profile cpu    Perfil de CPU por etapa en <output_dir_final>/perfil_cpu
+#python main_scraping.py --profile mem    Asignaciones y pico de memoria por etapa en <output_dir_final>/perfil_mem
+#python main_scraping.py --recalcular     Ignora los artefactos de [input_output_path] dir_etapas y recalcula todo
 
 
 
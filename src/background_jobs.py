@@ -0,0 +1,145 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Trabajo:
+    """
+    Trabajo en segundo plano con identificador, estado, progreso por elemento y resultado.
+    El hilo trabajador escribe y la app (otro hilo) lee: el progreso y el final del trabajo
+    (estado, resultado, error y fin, que se escriben juntos con finalizar()) se leen bajo el
+    lock con progreso() e instantanea().
+    """
+
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en_curso"
+    COMPLETADO = "completado"
+    ERROR = "error"
+
+    def __init__(self, clave, total):
+        self.id = uuid.uuid4().hex[:12]
+        self.clave = clave
+        self.total = total
+        self.estado = self.PENDIENTE
+        self.resultado = None
+        self.error = None
+        self.inicio = time.time()
+        self.fin = None
+        self._progreso = []
+        self._lock = threading.Lock()
+
+    def registrar_progreso(self, evento):
+        with self._lock:
+            self._progreso.append(evento)
+
+    def progreso(self):
+        with self._lock:
+            return list(self._progreso)
+
+    def iniciar(self):
+        with self._lock:
+            self.estado = self.EN_CURSO
+
+    def finalizar(self, resultado=None, error=None):
+        """
+        Cierra el trabajo: fin, resultado/error y estado final cambian a la vez.
+        """
+        with self._lock:
+            self.fin = time.time()
+            self.resultado = resultado
+            self.error = error
+            self.estado = self.ERROR if error is not None else self.COMPLETADO
+
+    def instantanea(self):
+        """
+        Devuelve (estado, resultado, error, fin) leídos de forma consistente.
+        """
+        with self._lock:
+            return self.estado, self.resultado, self.error, self.fin
+
+    def terminado(self):
+        with self._lock:
+            return self.estado in (self.COMPLETADO, self.ERROR)
+
+
+class GestorTrabajos:
+    """
+    Ejecuta trabajos en un pool de hilos fuera del script de Streamlit, de modo que un
+    rerun o el cierre de la pestaña no los interrumpe.
+
+    Los trabajos se indexan por id y por 'clave' (p. ej. los expedientes favoritos):
+    si ya hay uno en curso o terminado hace menos de ttl_resultados segundos con la
+    misma clave, se reutiliza en lugar de volver a lanzarlo. Los trabajos terminados hace
+    más de ttl_resultados se eliminan al lanzar uno nuevo.
+    """
+
+    def __init__(self, max_workers=1, ttl_resultados=6 * 3600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trabajo")
+        self.ttl_resultados = ttl_resultados
+        self.trabajos = {}
+        self.por_clave = {}
+        self._lock = threading.Lock()
+
+    def _caducado(self, trabajo):
+        _, _, _, fin = trabajo.instantanea()
+        return fin is not None and (time.time() - fin) >= self.ttl_resultados
+
+    def _vigente(self, trabajo):
+        if trabajo is None:
+            return False
+        estado, _, _, fin = trabajo.instantanea()
+        if estado == Trabajo.ERROR:
+            return False
+        return fin is None or (time.time() - fin) < self.ttl_resultados
+
+    def _podar(self):
+        """
+        Quita los trabajos terminados hace más de ttl_resultados (llamar con self._lock tomado).
+        """
+        for id_trabajo in [i for i, trabajo in self.trabajos.items() if self._caducado(trabajo)]:
+            trabajo = self.trabajos.pop(id_trabajo)
+            if self.por_clave.get(trabajo.clave) == id_trabajo:
+                del self.por_clave[trabajo.clave]
+
+    def enviar(self, clave, funcion, total, forzar=False):
+        """
+        Lanza funcion(trabajo) en segundo plano y devuelve el Trabajo (o el vigente con la misma clave).
+        La función debe informar del progreso con trabajo.registrar_progreso(...) y devolver el resultado.
+        """
+        with self._lock:
+            self._podar()
+            existente = self.trabajos.get(self.por_clave.get(clave))
+            if not forzar and self._vigente(existente):
+                return existente
+            if existente is not None and not existente.terminado():
+                # Nunca dos ejecuciones simultáneas de la misma búsqueda
+                return existente
+            trabajo = Trabajo(clave, total)
+            self.trabajos[trabajo.id] = trabajo
+            self.por_clave[clave] = trabajo.id
+
+        def ejecutar():
+            trabajo.iniciar()
+            try:
+                resultado = funcion(trabajo)
+            except Exception as e:
+                print(f"❌ Error en trabajo {trabajo.id}: {e}")
+                trabajo.finalizar(error=str(e))
+            else:
+                trabajo.finalizar(resultado=resultado)
+
+        self.executor.submit(ejecutar)
+        return trabajo
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            return self.trabajos.get(id_trabajo)
+
+    def buscar_por_clave(self, clave):
+        """
+        Devuelve el último trabajo con esa clave si sigue vigente (en curso o con resultado reciente).
+        """
+        with self._lock:
+            trabajo = self.trabajos.get(self.por_clave.get(clave))
+        return trabajo if self._vigente(trabajo) else None
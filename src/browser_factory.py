@@ -0,0 +1,98 @@
+import time
+import threading
+import configparser
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from src.pipeline_metrics import metricas
+
+# Patrones de Network.setBlockedURLs por defecto (si el .ini no trae [navegador])
+PATRONES_BLOQUEADOS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                       "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+                       "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m4a"]
+SCRIPTS_TERCEROS_BLOQUEADOS = ["*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+                               "*connect.facebook.net*", "*hotjar.com*", "*addthis.com*"]
+
+_lock = threading.Lock()
+_ruta_driver = None
+
+
+def ruta_chromedriver(config=None):
+    """
+    Ruta del chromedriver, resuelta una sola vez por ejecución: la de [navegador] ruta_chromedriver
+    si está definida o, si no, la que descarga/encuentra ChromeDriverManager (que consulta la red).
+    """
+    global _ruta_driver
+    with _lock:
+        if _ruta_driver is None:
+            ruta = config.get("navegador", "ruta_chromedriver", fallback="").strip() if config else ""
+            if not ruta:
+                from webdriver_manager.chrome import ChromeDriverManager
+                with metricas.temporizador("navegador_driver_resolucion"):
+                    ruta = ChromeDriverManager().install()
+            _ruta_driver = ruta
+    return _ruta_driver
+
+
+def _lista(config, opcion, defecto):
+    if not config.has_option("navegador", opcion):
+        return list(defecto)
+    return [p.strip() for p in config.get("navegador", opcion).replace("\n", ",").split(",") if p.strip()]
+
+
+class NavegadorMedido(webdriver.Chrome):
+    """
+    webdriver.Chrome que registra el tiempo de cada get() en el histograma navegador_carga_segundos.
+    """
+
+    def __init__(self, *args, fuente="", **kwargs):
+        self.fuente = fuente
+        super().__init__(*args, **kwargs)
+
+    def get(self, url):
+        with metricas.temporizador("navegador_carga", fuente=self.fuente):
+            super().get(url)
+
+
+def crear_navegador(config_file="./config/scraper_config.ini", fuente="",
+                    argumentos=("--headless", "--window-size=1920,1080")):
+    """
+    Chrome para los scrapers, configurado en la sección [navegador] del .ini:
+    - El chromedriver se resuelve una vez por ejecución (ruta_chromedriver).
+    - page_load_strategy (eager por defecto): get() vuelve con el DOM listo, sin esperar a
+      imágenes ni hojas de estilo; los scrapers ya esperan a sus elementos con WebDriverWait.
+    - Con bloquear_recursos, imágenes, vídeo/audio, fuentes y los scripts de terceros listados
+      se cortan por DevTools (Network.setBlockedURLs) antes de descargarse.
+
+    El arranque y cada carga de página se registran en las métricas (navegador_arranque_segundos,
+    navegador_carga_segundos) con la etiqueta fuente.
+    """
+    config = configparser.ConfigParser()
+    config.optionxform = str
+    config.read(config_file)
+    bloquear = config.getboolean("navegador", "bloquear_recursos", fallback=True)
+    estrategia = config.get("navegador", "page_load_strategy", fallback="eager")
+
+    options = Options()
+    for argumento in argumentos:
+        options.add_argument(argumento)
+    options.page_load_strategy = estrategia
+    if bloquear:
+        # Además del bloqueo por DevTools, Chrome ni siquiera intenta decodificar imágenes
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    service = Service(ruta_chromedriver(config))
+    t0 = time.perf_counter()
+    with metricas.temporizador("navegador_arranque", fuente=fuente):
+        driver = NavegadorMedido(service=service, options=options, fuente=fuente)
+        if bloquear:
+            patrones = (_lista(config, "patrones_bloqueados", PATRONES_BLOQUEADOS)
+                        + _lista(config, "scripts_terceros_bloqueados", SCRIPTS_TERCEROS_BLOQUEADOS))
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patrones})
+            except Exception as e:
+                print(f"⚠️ No se pudo activar el bloqueo de recursos por DevTools: {e}")
+    print(f"🌐 Chrome ({fuente or 'sin fuente'}) listo en {time.perf_counter() - t0:.2f}s "
+          f"(carga {estrategia}, bloqueo de recursos {'activado' if bloquear else 'desactivado'})")
+    return driver
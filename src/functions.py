@@ -1,5 +1,6 @@
 
 import pandas as pd 
+import numpy as np
 import re 
 import os
 import unicodedata
@@ -132,23 +133,25 @@ def filtrar_renombrar_dataframe(df, comunidad, columnas_finales, columnas_inicia
     # Invertir columnas_finales para buscar por índice
     index_to_final_name = {v: k for k, v in columnas_finales.items()}
     map_comunidad = {'and':'Andalucía','esp':'España','eus':'Euskadi','mad':'Comunidad de Madrid'}
-    rename_dict = {}
+    # Columna de la comunidad que alimenta cada columna final (la primera si hay varias)
+    origen = {}
+    duplicadas = []
     for col_real, idx in columnas_iniciales_comunidad.items():
-        if idx in index_to_final_name:
+        if idx in index_to_final_name and col_real in df.columns:
             col_final = index_to_final_name[idx]
-            rename_dict[col_real] = col_final
+            if col_final in origen:
+                duplicadas.append(col_final)
+            else:
+                origen[col_final] = col_real
+    # Depuración opcional
+    if duplicadas:
+        print("⚠️ Hay columnas duplicadas antes del reindex:", duplicadas)
 
-    # Filtrar y renombrar
-    columnas_a_usar = [col for col in rename_dict if col in df.columns]
-    df_filtrado = df[columnas_a_usar].rename(columns=rename_dict)
-    
-    # Ordenar según columnas_finales
+    # Filtrar, renombrar y ordenar según columnas_finales en una sola copia
+    # (las columnas que la comunidad no tiene quedan a NaN, como con reindex)
     final_order = list(columnas_finales.keys())
-    # Depuración opcional
-    if df_filtrado.columns.duplicated().any():
-        print("⚠️ Hay columnas duplicadas antes del reindex:", df_filtrado.columns[df_filtrado.columns.duplicated()])
-        df_filtrado = df_filtrado.loc[:, ~df_filtrado.columns.duplicated()]
-    df_final = df_filtrado.reindex(columns=final_order)
+    df_final = pd.DataFrame({col: df[origen[col]] if col in origen else np.nan for col in final_order},
+                            index=df.index)
      # Formatear columna fecha fin presentacion
     # Intentar convertir formatos conocidos
     for  col in [col for col in df_final.columns if 'fecha' in col]:
@@ -162,6 +165,21 @@ def filtrar_renombrar_dataframe(df, comunidad, columnas_finales, columnas_inicia
     df_final["fecha_proceso"] = fecha_proceso   
     return df_final
 
+def preparar_para_publicacion(df):
+    """
+    Limpieza final antes de escribir licitaciones.csv, en el sitio (sin reconstruir el DataFrame):
+    quita filas sin título, rellena nulos ('NotFound' en texto, -1 en numéricas) y
+    elimina las columnas 'Unnamed'.
+    """
+    df.dropna(subset=['titulo'], inplace=True)
+    # Tipos de columna a partir de una vista vacía: select_dtypes no copia datos
+    vacio = df.head(0)
+    relleno = {**dict.fromkeys(vacio.select_dtypes(include=['object']).columns, 'NotFound'),
+               **dict.fromkeys(vacio.select_dtypes(include=['float','int']).columns, -1)}
+    df.fillna(relleno, inplace=True)
+    df.drop(columns=df.columns[df.columns.str.contains('^Unnamed')], inplace=True)
+    return df
+
 def normalizar_texto(texto):
     """
     Convierte una cadena de texto a minúsculas y elimina acentos.
@@ -179,28 +197,23 @@ def normalizar_texto(texto):
     texto = texto.encode("ascii", "ignore").decode("utf-8")
     return texto
 
-def leer_fichero_licitaciones(input_dir, comunidad,sep = '\t', fecha_proceso=None):
+def ruta_fichero_licitaciones(input_dir, comunidad, fecha_proceso=None):
     """
-    Lee el fichero CSV de licitaciones para la comunidad y fecha indicadas.
-    Si no se pasa fecha_proceso, busca la fecha más reciente disponible.
-
-    Args:
-        input_dir (str): Directorio donde están los ficheros CSV.
-        comunidad (str): Comunidad ('andalucia', 'espana', 'euskadi', 'madrid').
-        fecha_proceso (str, optional): Fecha en formato 'YYYY-MM-DD'. Defaults a None.
+    Ruta del fichero CSV de licitaciones para la comunidad y fecha indicadas.
+    Si no se pasa fecha_proceso, usa la fecha más reciente disponible.
 
     Returns:
-        DataFrame: El dataframe leído, o None si no se pudo cargar.
+        str: La ruta del fichero, o None si no hay ficheros de la comunidad.
     """
     patron = re.compile(rf"licitaciones_{comunidad}_(\d{{4}}-\d{{2}}-\d{{2}})\.csv")
-    
+
     if not fecha_proceso:
         fechas = []
         for file in os.listdir(input_dir):
             match = patron.match(file)
             if match:
                 fechas.append(match.group(1))
-        
+
         if fechas:
             fecha_proceso = max(fechas)
             print(f"🟢 {comunidad.capitalize()}: usando la fecha más reciente encontrada: {fecha_proceso}")
@@ -208,13 +221,30 @@ def leer_fichero_licitaciones(input_dir, comunidad,sep = '\t', fecha_proceso=Non
             print(f"❌ No se encontraron ficheros de {comunidad} en {input_dir}")
             return None
 
-    # Construir el path
-    file_path = os.path.join(input_dir, f"licitaciones_{comunidad}_{fecha_proceso}.csv")
-    
+    return os.path.join(input_dir, f"licitaciones_{comunidad}_{fecha_proceso}.csv")
+
+
+def leer_fichero_licitaciones(input_dir, comunidad,sep = '\t', fecha_proceso=None):
+    """
+    Lee el fichero CSV de licitaciones para la comunidad y fecha indicadas.
+    Si no se pasa fecha_proceso, busca la fecha más reciente disponible.
+
+    Args:
+        input_dir (str): Directorio donde están los ficheros CSV.
+        comunidad (str): Comunidad ('andalucia', 'espana', 'euskadi', 'madrid').
+        fecha_proceso (str, optional): Fecha en formato 'YYYY-MM-DD'. Defaults a None.
+
+    Returns:
+        DataFrame: El dataframe leído, o None si no se pudo cargar.
+    """
+    file_path = ruta_fichero_licitaciones(input_dir, comunidad, fecha_proceso)
+    if file_path is None:
+        return None
+
     try:
         df = pd.read_csv(file_path, sep = sep)
-        print(f"✅ {comunidad.capitalize()}: fichero cargado con fecha {fecha_proceso}")
+        print(f"✅ {comunidad.capitalize()}: fichero cargado de {file_path}")
         return df
     except Exception as e:
-        print(f"⚠️ Error cargando {comunidad} para fecha {fecha_proceso}: {e}")
+        print(f"⚠️ Error cargando {comunidad} de {file_path}: {e}")
         return None
@@ -0,0 +1,190 @@
+from lxml import etree, html as lxml_html
+
+
+def _clase(nombre):
+    """
+    Condición XPath equivalente al selector CSS '.nombre' (la clase como palabra completa de @class).
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {nombre} ')"
+
+
+# Selectores precompilados: se compilan una vez al importar el módulo y no en cada página.
+# Los que empiezan por 'descendant::' o 'following' son relativos al elemento que se les pasa.
+
+# Pares etiqueta/valor de Drupal (Madrid y Andalucía): div.field > .field__label + .field__item
+DIV_FIELD = etree.XPath(f"//div[{_clase('field')}]")
+# Variante de la ficha de Andalucía renderizada por Angular: div.block.ng-star-inserted
+DIV_BLOQUE_NG = etree.XPath(f"//div[{_clase('block')} and {_clase('ng-star-inserted')}]")
+_ETIQUETA_FIELD = etree.XPath(f"descendant::*[{_clase('field__label')}][1]")
+_VALOR_FIELD = etree.XPath(f"descendant::*[{_clase('field__item')}][1]")
+
+# Pares <dt>/<dd> (cabecera de detalle de Euskadi)
+_DT = etree.XPath("descendant::dt")
+_DD_SIGUIENTE = etree.XPath("following-sibling::dd[1]")
+
+# Pares span.tipo3/span.outputText dentro de ul.altoDetalleLicitacion (Plataforma del Estado)
+_UL_ALTO_DETALLE = etree.XPath(f"//ul[{_clase('altoDetalleLicitacion')}]")
+_SPAN_TIPO3 = etree.XPath(f"descendant::span[{_clase('tipo3')}][1]")
+_SPAN_OUTPUT_TEXT = etree.XPath(f"descendant::span[{_clase('outputText')}][1]")
+
+# Pares <b>/<strong> + <span> dentro de div.contenido (Andalucía)
+_DIV_CONTENIDO = etree.XPath(f"//div[{_clase('contenido')}]")
+_NEGRITAS = etree.XPath("descendant::*[self::b or self::strong]")
+_SPAN_HERMANO = etree.XPath("following-sibling::span[1]")
+
+# Secciones y tablas de las fichas
+H2_SECCION_INDICE = etree.XPath(f"//h2[{_clase('seccion-indice')}]")
+DIV_CONTENIDO_HERMANO = etree.XPath(f"following-sibling::div[{_clase('contenido')}][1]")
+DIV_SIGUIENTE = etree.XPath("(descendant::div | following::div)[1]")
+DIV_CONTENIDO_SIGUIENTE = etree.XPath(f"(descendant::div[{_clase('contenido')}] | following::div[{_clase('contenido')}])[1]")
+TABLA_SIGUIENTE = etree.XPath("(descendant::table | following::table)[1]")
+DIVS_TITULO_SIGUIENTES = etree.XPath(f"descendant::div[{_clase('field--name-field-titulo')}] | "
+                                     f"following::div[{_clase('field--name-field-titulo')}]")
+ENLACES = etree.XPath("descendant::a[@href]")
+PARRAFOS = etree.XPath("descendant::p")
+H2 = etree.XPath("//h2")
+FILAS_TBODY = etree.XPath("descendant::tbody//tr")
+CELDAS = etree.XPath("descendant::td")
+CABECERAS_THEAD = etree.XPath("descendant::thead//th")
+DIV_CABECERA_DETALLE = etree.XPath(f"//div[{_clase('cabeceraDetalle')}][1]")
+FILAS_TABLA_EUS = etree.XPath("//table[@id='tablaWidget']//tbody//tr")
+TABLA_RESULTADOS_AND = etree.XPath(f"//table[{_clase('p-datatable-table')}][1]")
+ITEMS_RESULTADOS_MAD = etree.XPath(f"//div[{_clase('contratos-result')}]//li")
+PRIMER_ENLACE = etree.XPath("descendant::a[1]")
+DIV_FECHA_PUB = etree.XPath(f"(descendant::td[{_clase('fechaPubLeft')}]//div)[1]")
+DIV_TIPO_DOCUMENTO = etree.XPath(f"(descendant::td[{_clase('tipoDocumento')}]//div)[1]")
+SPAN_RESUMEN_LICITACION = etree.XPath("//span[@title='Resumen Licitación'][1]")
+SPAN_FECHA_ACTUALIZACION = etree.XPath(f"//span[{_clase('outputText')} and contains(@id, 'FechaActualizacion')][1]")
+
+
+def parsear(contenido):
+    """
+    Parsea una página HTML completa (str o bytes, p. ej. driver.page_source o response.content).
+    """
+    if isinstance(contenido, bytes):
+        try:
+            contenido = contenido.decode("utf-8")
+        except UnicodeDecodeError:
+            # Sin UTF-8 válido: libxml2 aplica el charset declarado en la propia página
+            return lxml_html.document_fromstring(contenido)
+    return lxml_html.document_fromstring(contenido)
+
+
+def parsear_fragmento(contenido):
+    """
+    Parsea un fragmento HTML (p. ej. el innerHTML de un elemento) dentro de un <div> contenedor.
+    """
+    return lxml_html.fragment_fromstring(contenido, create_parent="div")
+
+
+def primero(selector, elemento):
+    """
+    Primer resultado de un selector precompilado, o None.
+    """
+    resultado = selector(elemento)
+    return resultado[0] if resultado else None
+
+
+def textos(elemento):
+    """
+    Fragmentos de texto no vacíos del elemento, sin espacios sobrantes (stripped_strings de BeautifulSoup).
+    """
+    return [t.strip() for t in elemento.itertext() if t.strip()]
+
+
+def texto(elemento, separador=""):
+    """
+    Texto del elemento con cada fragmento limpio (get_text(separador, strip=True) de BeautifulSoup).
+    """
+    return separador.join(textos(elemento))
+
+
+def cadena_unica(elemento):
+    """
+    Texto del elemento solo si es su único contenido (equivale a .string de BeautifulSoup,
+    que se usa en los find(..., string=...)); None si mezcla texto y etiquetas.
+    """
+    while True:
+        if len(elemento) == 0:
+            return elemento.text
+        if len(elemento) > 1 or elemento.text or elemento[0].tail:
+            return None
+        elemento = elemento[0]
+
+
+def titulo_que_contiene(raiz, fragmento, selector=H2):
+    """
+    Primer título (por defecto <h2>) cuyo texto único contiene 'fragmento' (sin distinguir mayúsculas).
+    """
+    for titulo in selector(raiz):
+        cadena = cadena_unica(titulo)
+        if cadena and fragmento in cadena.lower():
+            return titulo
+    return None
+
+
+def pares_field(raiz, selector=DIV_FIELD, separador=""):
+    """
+    Pares (etiqueta, valor) de los bloques con .field__label y .field__item, en orden de aparición.
+    'separador' se usa para unir los fragmentos del valor.
+    """
+    pares = []
+    for bloque in selector(raiz):
+        etiqueta = primero(_ETIQUETA_FIELD, bloque)
+        valor = primero(_VALOR_FIELD, bloque)
+        if etiqueta is not None and valor is not None:
+            pares.append((texto(etiqueta), texto(valor, separador)))
+    return pares
+
+
+def pares_dt_dd(raiz):
+    """
+    Pares (dt, dd) de las listas de definición; cada <dt> con el primer <dd> hermano que le sigue.
+    """
+    pares = []
+    for dt in _DT(raiz):
+        dd = primero(_DD_SIGUIENTE, dt)
+        if dd is not None:
+            pares.append((texto(dt), texto(dd)))
+    return pares
+
+
+def pares_tipo3_outputtext(raiz):
+    """
+    Pares (span.tipo3, span.outputText) de cada ul.altoDetalleLicitacion. Como en la página,
+    se prefiere el atributo title y, si no lo hay, el texto del span.
+    """
+    pares = []
+    for ul in _UL_ALTO_DETALLE(raiz):
+        etiqueta = primero(_SPAN_TIPO3, ul)
+        valor = primero(_SPAN_OUTPUT_TEXT, ul)
+        if etiqueta is not None and valor is not None:
+            pares.append((etiqueta.get("title") or texto(etiqueta, " "),
+                          valor.get("title") or texto(valor, " ")))
+    return pares
+
+
+def pares_negrita_span(raiz):
+    """
+    Pares '<b>Clave:</b> <span>valor</span>' dentro de div.contenido. Sin <span> hermano, el valor
+    es el resto del texto del párrafo.
+    """
+    pares = []
+    for div in _DIV_CONTENIDO(raiz):
+        for negrita in _NEGRITAS(div):
+            clave = texto(negrita).rstrip(":")
+            span = primero(_SPAN_HERMANO, negrita)
+            if span is not None:
+                valor = texto(span)
+            else:
+                fragmentos = textos(negrita.getparent())
+                valor = " ".join(fragmentos[1:]) if len(fragmentos) > 1 else ""
+            pares.append((clave, valor))
+    return pares
+
+
+def eliminar(elemento):
+    """
+    Quita el elemento del árbol conservando el texto que le sigue (como decompose() de BeautifulSoup).
+    """
+    elemento.drop_tree()
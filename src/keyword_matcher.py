@@ -0,0 +1,62 @@
+import re
+
+
+class KeywordMatcher:
+    """
+    Buscador de múltiples palabras clave en una sola pasada.
+
+    Construye un trie a nivel de token con las palabras clave de varios grupos
+    (p. ej. tecnológicas y de descarte). Las frases con '_' se tratan como
+    secuencias de palabras separadas por un espacio, igual que el patrón
+    rf"\\b{palabra.replace('_', ' ')}\\b" que se usaba antes por cada palabra.
+    """
+
+    _FIN = None  # clave del nodo que marca el final de una palabra clave
+    _PATRON_TOKEN = re.compile(r"\w+")
+
+    def __init__(self, grupos):
+        """
+        Args:
+            grupos (dict): {nombre_grupo: [palabra_clave, ...]} en el orden del .ini
+        """
+        self.grupos = {nombre: list(palabras) for nombre, palabras in grupos.items()}
+        self.trie = {}
+        for nombre, palabras in self.grupos.items():
+            for palabra in palabras:
+                nodo = self.trie
+                for token in palabra.lower().split('_'):
+                    nodo = nodo.setdefault(token, {})
+                nodo.setdefault(self._FIN, []).append((nombre, palabra))
+
+    def _recorrer(self, texto):
+        """
+        Genera los (grupo, palabra_clave) encontrados en el texto.
+        """
+        tokens = [(m.group(), m.start(), m.end()) for m in self._PATRON_TOKEN.finditer(texto)]
+        for i in range(len(tokens)):
+            nodo = self.trie.get(tokens[i][0])
+            j = i
+            while nodo is not None:
+                for encontrada in nodo.get(self._FIN, ()):
+                    yield encontrada
+                j += 1
+                # La siguiente palabra de la frase debe ir separada por un único espacio
+                if j >= len(tokens) or texto[tokens[j - 1][2]:tokens[j][1]] != " ":
+                    break
+                nodo = nodo.get(tokens[j][0])
+
+    def buscar(self, texto):
+        """
+        Devuelve {nombre_grupo: [palabras detectadas]} respetando el orden del .ini.
+        """
+        detectadas = {nombre: set() for nombre in self.grupos}
+        for nombre, palabra in self._recorrer(texto):
+            detectadas[nombre].add(palabra)
+        return {nombre: [p for p in palabras if p in detectadas[nombre]]
+                for nombre, palabras in self.grupos.items()}
+
+    def contiene(self, texto, grupo):
+        """
+        Indica si aparece alguna palabra clave del grupo (se detiene en la primera).
+        """
+        return any(nombre == grupo for nombre, _ in self._recorrer(texto))
@@ -0,0 +1,111 @@
+import json
+import math
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def percentil(valores, p):
+    """
+    Percentil p (0-100) por rango más cercano de una lista de valores.
+    """
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[posicion - 1]
+
+
+class MedidorLatencias:
+    """
+    Tramos de tiempo de una ejecución (rerun) de la app.
+
+    Cada tramo guarda etapa, duración en ms y, opcionalmente, nº de filas. Un tramo abierto
+    dentro de otro se registra como "padre/hijo" (con 'padre'): su tiempo ya está incluido en
+    el del padre y no debe sumarse a él. Al terminar el rerun se añade una línea JSON al log
+    local, de donde se calculan p50/p95 por etapa.
+    El log rota al superar max_bytes (se conserva una copia anterior, ruta + ".1").
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fecha = datetime.now().isoformat(timespec="seconds")
+        self.tramos = []
+        self._abiertos = []
+
+    @contextmanager
+    def tramo(self, etapa, filas=None):
+        """
+        Mide el bloque 'with'. Devuelve un dict en el que se puede fijar 'filas' al final.
+        """
+        registro = {"etapa": etapa, "filas": filas}
+        if self._abiertos:
+            registro["padre"] = self._abiertos[-1]
+            registro["etapa"] = f"{registro['padre']}/{etapa}"
+        self._abiertos.append(registro["etapa"])
+        t0 = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            self._abiertos.pop()
+            self.tramos.append(registro)
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.inicio) * 1000, 2)
+
+    def guardar(self, ruta, max_bytes=5 * 1024 * 1024):
+        """
+        Añade el rerun como una línea JSON al log. Si el log ya ocupa max_bytes, antes se
+        renombra a ruta + ".1" (sustituyendo la copia anterior). Nunca interrumpe la app si falla.
+        """
+        if not ruta or not self.tramos:
+            return
+        try:
+            directorio = os.path.dirname(ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            if max_bytes and os.path.exists(ruta) and os.path.getsize(ruta) >= max_bytes:
+                os.replace(ruta, f"{ruta}.1")
+            linea = {"fecha": self.fecha, "total_ms": self.total_ms(), "tramos": self.tramos}
+            with open(ruta, "a", encoding="utf-8") as f:
+                f.write(json.dumps(linea, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"⚠️ Error guardando log de latencias {ruta}: {e}")
+
+
+def resumen_log(ruta, ultimas=1000):
+    """
+    Lee las últimas reruns del log y devuelve {etapa: {'n', 'p50_ms', 'p95_ms', 'filas_p50', 'padre'}},
+    incluyendo una etapa 'total' con la duración completa del rerun. Las etapas con 'padre' son
+    pasos dentro de esa etapa: su tiempo ya está contado en ella.
+    """
+    if not ruta or not os.path.exists(ruta):
+        return {}
+    # Solo se retienen las últimas líneas mientras se recorre el fichero
+    with open(ruta, encoding="utf-8") as f:
+        lineas = deque(f, maxlen=ultimas)
+
+    tiempos = {}
+    filas = {}
+    padres = {}
+    for linea in lineas:
+        try:
+            rerun = json.loads(linea)
+        except ValueError:
+            continue
+        tiempos.setdefault("total", []).append(rerun.get("total_ms", 0.0))
+        for tramo in rerun.get("tramos", []):
+            tiempos.setdefault(tramo["etapa"], []).append(tramo["ms"])
+            padres[tramo["etapa"]] = tramo.get("padre")
+            if tramo.get("filas") is not None:
+                filas.setdefault(tramo["etapa"], []).append(tramo["filas"])
+
+    return {etapa: {"n": len(valores),
+                    "p50_ms": percentil(valores, 50),
+                    "p95_ms": percentil(valores, 95),
+                    "filas_p50": percentil(filas.get(etapa, []), 50),
+                    "padre": padres.get(etapa)}
+            for etapa, valores in tiempos.items()}
@@ -1,18 +1,23 @@
-import fitz  # PyMuPDF
 import unicodedata
 import string
-import spacy
-import gensim
-from gensim import corpora
 import configparser
-from nltk.corpus import stopwords
 import os
-import re
+import time
+import bisect
+from collections import Counter
+from src.keyword_matcher import KeywordMatcher
+from src.lemma_cache import LemmaCache
+from src.pipeline_metrics import metricas, BUCKETS_TAMANO
 
 
 class LicitacionTextProcessor:
-    def __init__(self, df, config_file="./config/scraper_config.ini"):
-        self.df = df.copy()
+    def __init__(self, df, config_file="./config/scraper_config.ini", copiar=True, recoger_terminos_pdf=False):
+        # copiar=False trabaja sobre el DataFrame recibido y evita duplicarlo en memoria
+        self.df = df.copy() if copiar else df
+        # recoger_terminos_pdf=True guarda la frecuencia de cada token limpio del PDF por fila
+        # (Counter, mucho más compacto que la lista de tokens) para el índice de búsqueda
+        self.recoger_terminos_pdf = recoger_terminos_pdf
+        self.terminos_pdf = {}
         self.config = configparser.ConfigParser()
         self.config.read(config_file)
 
@@ -20,10 +25,20 @@ class LicitacionTextProcessor:
 
         self.palabras_tecnologia = self._get_keywords('palabras_clave_tecnologia')
         self.palabras_descartes = self._get_keywords('palabras_descarte_tecnologia')
+
+        # Presupuesto de extracción de PDFs (páginas / caracteres)
+        self.max_paginas_pdf = self._get_limite('nlp_params', 'max_paginas_pdf')
+        self.max_caracteres_pdf = self._get_limite('nlp_params', 'max_caracteres_pdf')
+        self.parada_temprana = self.config.getboolean('nlp_params', 'parada_temprana', fallback=False)
+
+        # Buscador de palabras clave construido una sola vez a partir del .ini
+        self.matcher = KeywordMatcher({'tecnologia': self.palabras_tecnologia,
+                                       'descarte': self.palabras_descartes})
         
-        #  Cargar modelo de spaCy en español
-        self.nlp = spacy.load("es_core_news_sm")
-        self.nlp.max_length = 2000000  
+        # spaCy, stopwords de NLTK y caché de lemas se cargan en el primer uso real
+        self._nlp = None
+        self._stop_custom_completed = None
+        self._cache_lemas = None
 
         self.stop_custom = {'mucha', 'casos', 'alli','actuales', 'mio', 'poca', 'respectiva', 'ninguna', 'pocas', 
                             'actual','tambien', 'tipo', 'misma', 'cierto', 'veces', 'dentro', 'cierta', 'menor', 'ejemplo',
@@ -36,27 +51,97 @@ class LicitacionTextProcessor:
                                'ciertas', 'detras', 'cuales', 'segundos', 'ahi', 'propia', 'cuyo', 'segunda', 'primeros', 
                                'caso', 'realizacion', 'modos', 'conforme', 'hacia', 'cada', 'usted', 'mayor', 'propios', 
                                'posterior', 'respecto', 'segundas', 'anteriores', 'etc', 'parte', 'cuyos', 'ustedes'}
-        self.stop_custom_completed = set(stopwords.words('spanish')) | self.stop_custom
+        self.n_palabras_lematizadas = 0
+        self.tiempo_lematizacion = 0.0
 
-        self.textos_limpios = []
+    @property
+    def nlp(self):
+        """
+        Modelo de spaCy en español, cargado solo cuando hay algún texto que lematizar.
+        """
+        if self._nlp is None:
+            import spacy
+            print("🧠 Cargando modelo spaCy es_core_news_sm...")
+            self._nlp = spacy.load("es_core_news_sm")
+            self._nlp.max_length = 2000000
+        return self._nlp
+
+    @property
+    def stop_custom_completed(self):
+        if self._stop_custom_completed is None:
+            from nltk.corpus import stopwords
+            self._stop_custom_completed = set(stopwords.words('spanish')) | self.stop_custom
+        return self._stop_custom_completed
+
+    @property
+    def cache_lemas(self):
+        """
+        Caché persistente forma → lemas para no pasar por spaCy el vocabulario ya conocido.
+        """
+        if self._cache_lemas is None:
+            self._cache_lemas = LemmaCache(
+                ruta=self.config.get('nlp_params', 'cache_lemas', fallback=None),
+                max_entradas=self.config.getint('nlp_params', 'max_entradas_cache_lemas', fallback=200000)
+            )
+        return self._cache_lemas
 
     def _get_keywords(self, section):
         if section not in self.config:
             return []
         return list(self.config.options(section))
 
+    def _get_limite(self, section, option):
+        """
+        Lee un límite numérico del .ini. 'None' o vacío → sin límite.
+        """
+        valor = self.config.get(section, option, fallback="None")
+        return None if valor.strip().lower() in ["none", ""] else int(valor)
+
+    @staticmethod
+    def _normalizar(texto):
+        texto = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode("utf-8").lower()
+        return texto.translate(str.maketrans('', '', string.punctuation))
+
    # Función para leer PDF
     def _extraer_texto_pdf(self, ruta):
+        """
+        Lee el PDF página a página respetando el presupuesto configurado en [nlp_params].
+        Se detiene al agotar páginas/caracteres o, con parada_temprana, en cuanto
+        aparece una palabra tecnológica (la clasificación ya no puede cambiar).
+
+        Returns:
+            tuple: (texto, truncado) donde truncado indica si quedaron páginas sin leer.
+        """
+        import fitz  # PyMuPDF
+
         print(f"📄 Extrayendo texto de: {ruta}")
         try:
-            doc = fitz.open(ruta)
-            texto = ""
-            for pagina in doc:
-                texto += pagina.get_text()
-            return texto
+            with fitz.open(ruta) as doc:
+                partes = []
+                n_caracteres = 0
+                truncado = False
+                for num_pagina, pagina in enumerate(doc):
+                    if self.max_paginas_pdf is not None and num_pagina >= self.max_paginas_pdf:
+                        truncado = True
+                        break
+                    texto_pagina = pagina.get_text()
+                    if self.max_caracteres_pdf is not None and n_caracteres + len(texto_pagina) > self.max_caracteres_pdf:
+                        partes.append(texto_pagina[:self.max_caracteres_pdf - n_caracteres])
+                        truncado = True
+                        break
+                    partes.append(texto_pagina)
+                    n_caracteres += len(texto_pagina)
+                    if self.parada_temprana and self.matcher.contiene(self._normalizar(texto_pagina), 'tecnologia'):
+                        truncado = num_pagina + 1 < doc.page_count
+                        if truncado:
+                            print(f"⏹️ Decisión tecnológica segura en la página {num_pagina + 1}, se detiene la lectura.")
+                        break
+            if truncado:
+                print(f"✂️ PDF truncado a {len(partes)} páginas / {sum(len(p) for p in partes)} caracteres")
+            return "".join(partes), truncado
         except Exception as e:
             print(f"⚠️ Error leyendo {ruta}: {e}")
-            return ""
+            return "", False
         
 
 
@@ -64,32 +149,90 @@ class LicitacionTextProcessor:
         print("🧹 Limpiando y tokenizando texto...")
 
         # 1. Normalización básica
-        texto = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode("utf-8").lower()
-        texto = texto.translate(str.maketrans('', '', string.punctuation))
+        texto = self._normalizar(texto)
 
         # 2. Filtro previo de palabras que están en tu lista de stopwords personalizadas
         palabras = texto.split()
         palabras_filtradas = [p for p in palabras if p not in self.stop_custom_completed]
-        texto_filtrado = " ".join(palabras_filtradas)
 
-        # 3. Procesar con spaCy en chunks si el texto es muy largo
-        max_chars = self.nlp.max_length
-        tokens = []
+        # 3. Lematizar: las palabras conocidas salen de la caché, solo las nuevas pasan por spaCy
+        inicio = time.perf_counter()
+        lemas_por_palabra = {}
+        desconocidas = []
+        for palabra, apariciones in Counter(palabras_filtradas).items():
+            lemas = self.cache_lemas.get(palabra, apariciones)
+            if lemas is None:
+                desconocidas.append(palabra)
+            else:
+                lemas_por_palabra[palabra] = lemas
+        if desconocidas:
+            lemas_por_palabra.update(self._lematizar_spacy(desconocidas))
+
+        tokens = [
+            lema for palabra in palabras_filtradas for lema in lemas_por_palabra[palabra]
+            if len(lema) > 2
+            and lema not in self.stop_custom_completed  # filtro posterior
+        ]
+        self.n_palabras_lematizadas += len(palabras_filtradas)
+        self.tiempo_lematizacion += time.perf_counter() - inicio
 
-        for i in range(0, len(texto_filtrado), max_chars):
-            chunk = texto_filtrado[i:i + max_chars]
-            doc = self.nlp(chunk)
+        return tokens
 
-            tokens.extend([
-                token.lemma_ for token in doc
-                if token.is_alpha
-                and len(token.lemma_) > 2
-                and token.lemma_ not in self.stop_custom_completed  # filtro posterior
-            ])
+    def _lematizar_spacy(self, palabras):
+        """
+        Pasa por spaCy solo las palabras que no están en la caché (en chunks si el texto es muy largo)
+        y guarda en la caché los lemas alfabéticos de cada una.
 
-        return tokens
+        Returns:
+            dict: {palabra: [lemas]}
+        """
+        print(f"🧠 Lematizando {len(palabras)} palabras nuevas con spaCy...")
+        max_chars = self.nlp.max_length
+        nuevos = {}
+        i = 0
+        while i < len(palabras):
+            # Agrupar palabras hasta llenar un chunk, recordando dónde empieza cada una
+            inicios = []
+            chunk = []
+            n_chars = 0
+            while i < len(palabras) and (not chunk or n_chars + len(palabras[i]) < max_chars):
+                inicios.append(n_chars)
+                chunk.append(palabras[i])
+                n_chars += len(palabras[i]) + 1
+                i += 1
+
+            lemas_chunk = [[] for _ in chunk]
+            doc = self.nlp(" ".join(chunk))
+            for token in doc:
+                if token.is_alpha:
+                    lemas_chunk[bisect.bisect_right(inicios, token.idx) - 1].append(token.lemma_)
+
+            for palabra, lemas in zip(chunk, lemas_chunk):
+                nuevos[palabra] = lemas
+                self.cache_lemas.put(palabra, lemas)
+        return nuevos
+
+    def _reportar_lematizacion(self):
+        """
+        Muestra la tasa de aciertos de la caché de lemas y el rendimiento, y persiste la caché.
+        """
+        if self._cache_lemas is None:
+            return
+        palabras_por_seg = self.n_palabras_lematizadas / self.tiempo_lematizacion if self.tiempo_lematizacion else 0.0
+        print(f"📊 Caché de lemas: {self.cache_lemas.tasa_aciertos():.1%} aciertos "
+              f"({self.cache_lemas.aciertos} aciertos / {self.cache_lemas.fallos} fallos), "
+              f"{palabras_por_seg:,.0f} tokens/s")
+        metricas.contar("nlp_cache_lemas_aciertos_total", self.cache_lemas.aciertos)
+        metricas.contar("nlp_cache_lemas_fallos_total", self.cache_lemas.fallos)
+        metricas.fijar("nlp_lematizacion_tokens_por_segundo", round(palabras_por_seg, 1))
+        try:
+            self.cache_lemas.guardar()
+        except Exception as e:
+            print(f"⚠️ Error guardando caché de lemas: {e}")
 
     def _modelo_lda(self,corpus,diccionario, num_temas = 5):
+        import gensim
+
         print("⚡ Aplicando modelo LDA...")
         lda_model = gensim.models.LdaModel(
             corpus=corpus,
@@ -103,121 +246,186 @@ class LicitacionTextProcessor:
         return lda_model, sorted(temas, key=lambda x: -x[1])
         
 
-    def _procesar_textos(self):
-        print("🚀 Procesando textos de los PDFs...")
-        textos = []
-        resultados_lda = []
-        textos_limpios = []
-        for _, row in self.df.iterrows():
-            nombre_pdf = str(row.get('pdf', '')).strip()
+    def _iterar_documentos(self):
+        """
+        Generador que recorre el DataFrame documento a documento: extrae el texto del PDF
+        y lo tokeniza. Solo el documento en curso está en memoria.
+
+        Yields:
+            tuple: (tokens, truncado) para cada fila, en el orden del DataFrame.
+        """
+        columna_pdf = self.df['pdf'] if 'pdf' in self.df.columns else [''] * len(self.df)
+        for valor_pdf in columna_pdf:
+            nombre_pdf = str(valor_pdf).strip()
             if not nombre_pdf or nombre_pdf.lower() == 'nan':
-                textos.append("")
-                textos_limpios.append([])
-                resultados_lda.append("Sin tema") 
+                yield [], False
                 continue
             ruta = os.path.join(self.input_dir_pdf, nombre_pdf)
-            # 1 - Extracción de texto
-            texto = self._extraer_texto_pdf(ruta)
+            # 1 - Extracción de texto (con presupuesto de páginas/caracteres)
+            with metricas.temporizador("nlp_extraccion_pdf"):
+                texto, truncado = self._extraer_texto_pdf(ruta)
+            metricas.observar("nlp_pdf_caracteres", len(texto), buckets=BUCKETS_TAMANO)
+            if truncado:
+                metricas.contar("nlp_pdf_truncados_total")
             # 2 - Limpieza y tokenización
-            tokens = self._limpiar_y_tokenizar(texto)
-            textos_limpios.append(tokens)
-            # 3 - Entrenar modelo LDA
-            # 3.1 - Preparación del corpus para modelo LDA (Se trata el documento como una "lista de palabras")
-            texts = [tokens]
-            print(f"📦 N° de documentos tokenizados: {len(texts)}")
-        
-            # 3.2 - Crear diccionario y corpus
-            diccionario = corpora.Dictionary(texts)
-            corpus = [diccionario.doc2bow(texto) for texto in texts]
-
-            # 4 - Validación antes de aplicar modelo
-            if not corpus or all(len(doc) == 0 for doc in corpus) or len(diccionario) == 0:
-                print("⚠️ Corpus o diccionario vacío. Se asigna 'Sin tema'.")
-                resultados_lda.append("Sin tema")
-                continue
+            with metricas.temporizador("nlp_tokenizacion"):
+                tokens = self._limpiar_y_tokenizar(texto)
+            metricas.contar("nlp_tokens_total", len(tokens))
+            yield tokens, truncado
 
-            # 5 - Aplicación del modelo LDA
-            lda_model, temas = self._modelo_lda(corpus=corpus, diccionario=diccionario)
-
-            # 6 - Descripción de temas
-            descripciones = []
-            for id_tema, prob in temas:
-                prob = round(prob, 2)
-                if prob <= 0.0:
-                    continue
-                palabras = ", ".join([p for p, _ in lda_model.show_topic(id_tema, topn=10)])
-                descripciones.append(f"{palabras} ({prob})")
-
-            resultados_lda.append(" | ".join(descripciones) if descripciones else "Sin tema")
-        if len(resultados_lda) != len(self.df):
-             raise ValueError(f"❌ Longitud de resultados_lda ({len(resultados_lda)}) no coincide con el DataFrame ({len(self.df)}).")
-        self.df["topicos_lda"] = resultados_lda
-        self.textos_limpios = textos_limpios
-        print("✅ LDA completado y añadido al DataFrame.")
-        return self.df
+    def _topicos_lda(self, tokens):
+        """
+        Entrena un LDA sobre el documento (tratado como una "lista de palabras")
+        y devuelve la descripción de sus temas.
+        """
+        from gensim import corpora
 
-    def aplicar_clasificacion_manual(self, fallback_columna="descripcion"):
-        def contiene_termino(palabra_clave, texto):
-            # Reemplaza _ por espacio y busca como palabra completa
-            patron = rf"\b{re.escape(palabra_clave.replace('_', ' '))}\b"
-            return re.search(patron, texto)
-        
-        print("⚡ Aplicando clasificación tecnológica/no tecnológica (sobre texto de PDF)...")
+        if not tokens:
+            return "Sin tema"
 
-        clasificaciones = []
-        claves_tecnologicas_detectadas  = []
-        claves_descartadas_detectadas = []
+        # Crear diccionario y corpus
+        diccionario = corpora.Dictionary([tokens])
+        corpus = [diccionario.doc2bow(tokens)]
 
-        for idx, row in self.df.iterrows():
-            # Usa texto limpio si está disponible, sino fallback
-            if idx < len(self.textos_limpios) and self.textos_limpios[idx]:
-                texto = " ".join(self.textos_limpios[idx])  # tokens a string
-            else:
-                texto = str(row.get(fallback_columna, "")).lower()
-            
-            # Detecta palabras encontradas en cada grupo
-            detectadas_tec = [p for p in self.palabras_tecnologia if contiene_termino(p, texto)]
-            detectadas_no_tec = [p for p in self.palabras_descartes if contiene_termino(p, texto)]
-
-            # Clasificación
-            if detectadas_tec:
-                clasificacion = "Tecnológica"
-            elif detectadas_no_tec:
-                clasificacion = "No tecnológica"
-            else:
-                clasificacion = "N/S"
+        # Validación antes de aplicar modelo
+        if not corpus or all(len(doc) == 0 for doc in corpus) or len(diccionario) == 0:
+            print("⚠️ Corpus o diccionario vacío. Se asigna 'Sin tema'.")
+            return "Sin tema"
 
-            clasificaciones.append(clasificacion)
-            claves_tecnologicas_detectadas.append(", ".join(detectadas_tec))
-            claves_descartadas_detectadas.append(", ".join(detectadas_no_tec))
+        # Aplicación del modelo LDA
+        lda_model, temas = self._modelo_lda(corpus=corpus, diccionario=diccionario)
 
-        # Guardar en el DataFrame
-        self.df["clasificacion"] = clasificaciones
-        self.df["palabras_tecnologicas_detectadas"] = claves_tecnologicas_detectadas
-        self.df["palabras_descartadas_detectadas"] = claves_descartadas_detectadas
+        # Descripción de temas
+        descripciones = []
+        for id_tema, prob in temas:
+            prob = round(prob, 2)
+            if prob <= 0.0:
+                continue
+            palabras = ", ".join([p for p, _ in lda_model.show_topic(id_tema, topn=10)])
+            descripciones.append(f"{palabras} ({prob})")
 
-        print("✅ Clasificación completada.")
-        return self.df
+        return " | ".join(descripciones) if descripciones else "Sin tema"
 
-    def procesar_completo(self):
+    def aplicar_clasificacion_manual(self, texto):
         """
-        Aplica todo el flujo: extracción de texto, limpieza, LDA y clasificación manual.
-        Elimina la variable temporal 'textos_limpios' al final.
+        Clasifica un texto como tecnológico/no tecnológico según las palabras clave del .ini.
+
+        Returns:
+            tuple: (clasificacion, palabras_tecnologicas_detectadas, palabras_descartadas_detectadas)
         """
-        print("🚀 Iniciando procesamiento completo...")
+        # Detecta palabras encontradas en cada grupo (una sola pasada por el texto)
+        return self._clasificar_detectadas(self.matcher.buscar(texto))
 
-        # 1. Procesar textos (extrae, limpia, aplica LDA)
-        self._procesar_textos()
+    @staticmethod
+    def _clasificar_detectadas(detectadas):
+        """
+        Clasificación a partir de las palabras clave ya detectadas ({'tecnologia': [...], 'descarte': [...]}).
+        """
+        detectadas_tec = detectadas['tecnologia']
+        detectadas_no_tec = detectadas['descarte']
 
-        # 2. Aplicar clasificación tecnológica
-        self.aplicar_clasificacion_manual()
+        # Clasificación
+        if detectadas_tec:
+            clasificacion = "Tecnológica"
+        elif detectadas_no_tec:
+            clasificacion = "No tecnológica"
+        else:
+            clasificacion = "N/S"
 
-        # 3. Eliminar variable temporal si se desea no guardar tokens
-        if hasattr(self, "textos_limpios"):
-            del self.textos_limpios
-            print("🗑️ Variable 'textos_limpios' eliminada tras el procesamiento.")
+        return clasificacion, ", ".join(detectadas_tec), ", ".join(detectadas_no_tec)
 
+    def _caracteristicas_documentos(self):
+        """
+        Genera documento a documento (etiqueta, topicos_lda, truncado, tokens): extracción del PDF,
+        limpieza y LDA. Al agotarse persiste la caché de lemas.
+        """
+        for etiqueta, (tokens, truncado) in zip(self.df.index, self._iterar_documentos()):
+            if self.recoger_terminos_pdf and tokens:
+                self.terminos_pdf[etiqueta] = Counter(tokens)
+            with metricas.temporizador("nlp_lda"):
+                topicos = self._topicos_lda(tokens)
+            yield etiqueta, topicos, truncado, tokens
+        self._reportar_lematizacion()
+
+    def _clasificar_documento(self, texto_pdf, valor_fallback):
+        """
+        Clasificación tecnológica: texto limpio del PDF si existe, sino la columna de fallback.
+        """
+        texto = texto_pdf if texto_pdf else str(valor_fallback).lower()
+        resultado = self.aplicar_clasificacion_manual(texto)
+        metricas.contar("nlp_documentos_total", clasificacion=resultado[0], con_pdf=bool(texto_pdf))
+        return resultado
+
+    def _guardar_resultados(self, topicos_lda, pdfs_truncados, clasificaciones):
+        self.df["topicos_lda"] = topicos_lda
+        self.df["pdf_truncado"] = pdfs_truncados
+        self.df["clasificacion"] = [c for c, _, _ in clasificaciones]
+        self.df["palabras_tecnologicas_detectadas"] = [tec for _, tec, _ in clasificaciones]
+        self.df["palabras_descartadas_detectadas"] = [desc for _, _, desc in clasificaciones]
+
+    def procesar_completo(self, fallback_columna="descripcion"):
+        """
+        Aplica todo el flujo documento a documento: extracción de texto, limpieza, LDA
+        y clasificación manual. Los resultados se escriben en listas preasignadas y los
+        tokens de cada documento se descartan en cuanto se han usado, por lo que la
+        memoria depende del documento más grande y no del tamaño del corpus.
+        """
+        print("🚀 Iniciando procesamiento completo...")
+        n = len(self.df)
+        topicos_lda = ["Sin tema"] * n
+        pdfs_truncados = [False] * n
+        clasificaciones = [("N/S", "", "")] * n
+        columna_fallback = self.df[fallback_columna] if fallback_columna in self.df.columns else [""] * n
+
+        documentos = zip(self._caracteristicas_documentos(), columna_fallback)
+        for i, ((_, topicos, truncado, tokens), valor_fallback) in enumerate(documentos):
+            topicos_lda[i] = topicos
+            pdfs_truncados[i] = truncado
+            clasificaciones[i] = self._clasificar_documento(" ".join(tokens), valor_fallback)
+
+        self._guardar_resultados(topicos_lda, pdfs_truncados, clasificaciones)
         print("✅ Procesamiento completo finalizado.")
         return self.df
 
+    def calcular_caracteristicas(self):
+        """
+        Etapa de características NLP del pipeline por etapas. Por fila guarda solo datos
+        compactos, nunca el texto del PDF (los tokens de cada documento se descartan en cuanto
+        se han usado, como en procesar_completo):
+        - topicos_lda y pdf_truncado
+        - palabras_detectadas_pdf: palabras clave del .ini encontradas en el PDF limpio
+          ({'tecnologia': [...], 'descarte': [...]}), o None si no hay texto de PDF
+        - terminos_pdf: {token: frecuencia} del PDF limpio, para el índice de búsqueda
+
+        Returns:
+            DataFrame: esas cuatro columnas, con el índice de self.df.
+        """
+        import pandas as pd
+
+        print("🚀 Calculando características NLP...")
+        filas = []
+        for _, topicos, truncado, tokens in self._caracteristicas_documentos():
+            detectadas = self.matcher.buscar(" ".join(tokens)) if tokens else None
+            filas.append((topicos, truncado, detectadas, dict(Counter(tokens))))
+        return pd.DataFrame(filas, index=self.df.index,
+                            columns=["topicos_lda", "pdf_truncado", "palabras_detectadas_pdf", "terminos_pdf"])
 
+    def clasificar(self, caracteristicas, fallback_columna="descripcion"):
+        """
+        Etapa de clasificación del pipeline por etapas: aplica las palabras clave del .ini
+        sobre las características ya calculadas (sin volver a leer PDFs ni lematizar).
+        """
+        n = len(self.df)
+        columna_fallback = self.df[fallback_columna] if fallback_columna in self.df.columns else [""] * n
+        clasificaciones = []
+        for detectadas, valor_fallback in zip(caracteristicas["palabras_detectadas_pdf"], columna_fallback):
+            if detectadas is None:
+                resultado = self.aplicar_clasificacion_manual(str(valor_fallback).lower())
+            else:
+                resultado = self._clasificar_detectadas(detectadas)
+            metricas.contar("nlp_documentos_total", clasificacion=resultado[0], con_pdf=detectadas is not None)
+            clasificaciones.append(resultado)
+        self._guardar_resultados(list(caracteristicas["topicos_lda"]), list(caracteristicas["pdf_truncado"]),
+                                 clasificaciones)
+        print("✅ Clasificación finalizada.")
+        return self.df
@@ -0,0 +1,73 @@
+import json
+import os
+from collections import OrderedDict
+
+
+class LemmaCache:
+    """
+    Caché persistente forma superficial → lemas con política LRU.
+
+    Cada palabra (ya normalizada) se guarda con la lista de lemas alfabéticos que
+    spaCy devolvió para ella. Las palabras ya vistas no vuelven a pasar por el
+    modelo; la caché se carga y guarda en JSON entre ejecuciones y nunca supera
+    max_entradas.
+    """
+
+    def __init__(self, ruta, max_entradas=200000):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.lemas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self._cargar()
+
+    def _cargar(self):
+        if not self.ruta or not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                for palabra, lemas in json.load(f):
+                    self.lemas[palabra] = lemas
+            print(f"📚 Caché de lemas cargada: {len(self.lemas)} entradas")
+        except Exception as e:
+            print(f"⚠️ Error cargando caché de lemas {self.ruta}: {e}")
+            self.lemas = OrderedDict()
+
+    def guardar(self):
+        if not self.ruta:
+            return
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        tmp = f"{self.ruta}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(list(self.lemas.items()), f, ensure_ascii=False)
+        os.replace(tmp, self.ruta)
+        print(f"💾 Caché de lemas guardada: {len(self.lemas)} entradas en {self.ruta}")
+
+    def get(self, palabra, apariciones=1):
+        """
+        Devuelve los lemas de la palabra o None si no está en caché.
+
+        Los aciertos y fallos se cuentan por token: 'apariciones' es cuántas veces aparece la
+        palabra en el texto. Si no está, solo la primera aparición es un fallo; las demás usan
+        los lemas que se acaban de calcular, igual que si se consultaran token a token.
+        """
+        lemas = self.lemas.get(palabra)
+        if lemas is None:
+            self.fallos += 1
+            self.aciertos += apariciones - 1
+            return None
+        self.lemas.move_to_end(palabra)
+        self.aciertos += apariciones
+        return lemas
+
+    def put(self, palabra, lemas):
+        self.lemas[palabra] = lemas
+        self.lemas.move_to_end(palabra)
+        while len(self.lemas) > self.max_entradas:
+            self.lemas.popitem(last=False)
+
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
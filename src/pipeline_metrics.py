@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Límites superiores (le) de los buckets de los histogramas
+BUCKETS_SEGUNDOS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+BUCKETS_TAMANO = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+
+def _clave(nombre, etiquetas):
+    return nombre, tuple(sorted((k, str(v)) for k, v in etiquetas.items()))
+
+
+def _etiquetas_prometheus(etiquetas, extra=()):
+    pares = list(etiquetas) + list(extra)
+    if not pares:
+        return ""
+    # Escapado del formato de texto de Prometheus: \ → \\, " → \", salto de línea → \n
+    escapar = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in pares) + "}"
+
+
+class RegistroMetricas:
+    """
+    Métricas de una ejecución del pipeline: contadores, valores (gauges) e histogramas,
+    con etiquetas (p. ej. fuente="madrid"). Todas las etapas informan al registro global
+    'metricas' y al final de la ejecución se vuelca un resumen JSON y un fichero de texto
+    en formato Prometheus (para node_exporter textfile o para comparar ejecuciones).
+
+    Es seguro entre hilos: los scrapers pueden informar desde varios a la vez.
+    """
+
+    def __init__(self, prefijo="licitaciones"):
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.inicio = time.time()
+            self.contadores = {}
+            self.valores = {}
+            self.histogramas = {}
+
+    def contar(self, nombre, valor=1, **etiquetas):
+        """
+        Suma 'valor' al contador (los nombres de contador terminan en _total).
+        """
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            self.contadores[clave] = self.contadores.get(clave, 0) + valor
+
+    def fijar(self, nombre, valor, **etiquetas):
+        with self._lock:
+            self.valores[_clave(nombre, etiquetas)] = valor
+
+    def observar(self, nombre, valor, buckets=BUCKETS_SEGUNDOS, **etiquetas):
+        """
+        Añade una observación al histograma (duraciones, bytes, caracteres...).
+        """
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            hist = self.histogramas.get(clave)
+            if hist is None:
+                hist = self.histogramas[clave] = {"buckets": tuple(buckets), "conteos": [0] * len(buckets),
+                                                  "n": 0, "suma": 0.0, "min": None, "max": None}
+            hist["n"] += 1
+            hist["suma"] += valor
+            hist["min"] = valor if hist["min"] is None else min(hist["min"], valor)
+            hist["max"] = valor if hist["max"] is None else max(hist["max"], valor)
+            for i, limite in enumerate(hist["buckets"]):
+                if valor <= limite:
+                    hist["conteos"][i] += 1
+                    break
+
+    @contextmanager
+    def temporizador(self, nombre, **etiquetas):
+        """
+        Mide el bloque 'with' y lo registra en el histograma '<nombre>_segundos'
+        (también si el bloque lanza una excepción).
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(f"{nombre}_segundos", time.perf_counter() - t0, **etiquetas)
+
+    def resumen(self):
+        """
+        Resumen serializable a JSON de todas las métricas.
+        """
+        with self._lock:
+            return {
+                "inicio": datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+                "duracion_segundos": round(time.time() - self.inicio, 3),
+                "contadores": [{"nombre": n, "etiquetas": dict(e), "valor": v}
+                               for (n, e), v in sorted(self.contadores.items())],
+                "valores": [{"nombre": n, "etiquetas": dict(e), "valor": v}
+                            for (n, e), v in sorted(self.valores.items())],
+                "histogramas": [{"nombre": n, "etiquetas": dict(e), "n": h["n"], "suma": round(h["suma"], 6),
+                                 "media": round(h["suma"] / h["n"], 6) if h["n"] else None,
+                                 "min": h["min"], "max": h["max"]}
+                                for (n, e), h in sorted(self.histogramas.items())],
+            }
+
+    def texto_prometheus(self):
+        lineas = []
+        with self._lock:
+            tipos_vistos = set()
+
+            def cabecera(nombre, tipo):
+                if nombre not in tipos_vistos:
+                    tipos_vistos.add(nombre)
+                    lineas.append(f"# TYPE {nombre} {tipo}")
+
+            for (nombre, etiquetas), valor in sorted(self.contadores.items()):
+                metrica = f"{self.prefijo}_{nombre}"
+                cabecera(metrica, "counter")
+                lineas.append(f"{metrica}{_etiquetas_prometheus(etiquetas)} {valor}")
+            for (nombre, etiquetas), valor in sorted(self.valores.items()):
+                metrica = f"{self.prefijo}_{nombre}"
+                cabecera(metrica, "gauge")
+                lineas.append(f"{metrica}{_etiquetas_prometheus(etiquetas)} {valor}")
+            for (nombre, etiquetas), hist in sorted(self.histogramas.items()):
+                metrica = f"{self.prefijo}_{nombre}"
+                cabecera(metrica, "histogram")
+                acumulado = 0
+                for limite, conteo in zip(hist["buckets"], hist["conteos"]):
+                    acumulado += conteo
+                    lineas.append(f"{metrica}_bucket{_etiquetas_prometheus(etiquetas, [('le', f'{limite:g}')])} {acumulado}")
+                lineas.append(f"{metrica}_bucket{_etiquetas_prometheus(etiquetas, [('le', '+Inf')])} {hist['n']}")
+                lineas.append(f"{metrica}_sum{_etiquetas_prometheus(etiquetas)} {hist['suma']:.6f}")
+                lineas.append(f"{metrica}_count{_etiquetas_prometheus(etiquetas)} {hist['n']}")
+            metrica = f"{self.prefijo}_ejecucion_inicio_timestamp_segundos"
+            cabecera(metrica, "gauge")
+            lineas.append(f"{metrica} {self.inicio:.0f}")
+        return "\n".join(lineas) + "\n"
+
+    def guardar(self, directorio, nombre_base="metricas_pipeline", max_lineas_historico=520):
+        """
+        Escribe <nombre_base>.json y <nombre_base>.prom en el directorio indicado y añade
+        el resumen como una línea a <nombre_base>_historico.jsonl (tendencia entre ejecuciones).
+        Del histórico solo se conservan las últimas max_lineas_historico ejecuciones (0: sin límite).
+        """
+        os.makedirs(directorio, exist_ok=True)
+        ruta_json = os.path.join(directorio, f"{nombre_base}.json")
+        ruta_prom = os.path.join(directorio, f"{nombre_base}.prom")
+        ruta_historico = os.path.join(directorio, f"{nombre_base}_historico.jsonl")
+        resumen = self.resumen()
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+        lineas = []
+        if os.path.exists(ruta_historico):
+            with open(ruta_historico, encoding="utf-8") as f:
+                lineas = list(deque(f, maxlen=max_lineas_historico - 1 if max_lineas_historico else None))
+        lineas.append(json.dumps(resumen, ensure_ascii=False) + "\n")
+        # El histórico se versiona en el repositorio: se recorta en lugar de rotarlo a otro fichero
+        with open(f"{ruta_historico}.tmp", "w", encoding="utf-8") as f:
+            f.writelines(lineas)
+        os.replace(f"{ruta_historico}.tmp", ruta_historico)
+        # Escritura atómica: el colector de Prometheus nunca lee un fichero a medias
+        with open(f"{ruta_prom}.tmp", "w", encoding="utf-8") as f:
+            f.write(self.texto_prometheus())
+        os.replace(f"{ruta_prom}.tmp", ruta_prom)
+        print(f"📈 Métricas de la ejecución guardadas en: {ruta_json} y {ruta_prom}")
+        return ruta_json, ruta_prom
+
+
+# Registro global de la ejecución en curso
+metricas = RegistroMetricas()
@@ -0,0 +1,179 @@
+import os
+import json
+import glob
+import hashlib
+import time
+from datetime import datetime
+from src.pipeline_metrics import metricas
+
+# Subir la versión de una etapa cuando cambie su código invalida sus artefactos (y los posteriores)
+VERSIONES_ETAPAS = {
+    "normalizado": 1,
+    "unificado": 1,
+    "caracteristicas_nlp": 2,
+    "clasificacion": 1,
+    "publicacion": 3,
+}
+
+
+def huella_fichero(ruta):
+    """
+    Huella barata de un fichero (ruta, tamaño y fecha de modificación) sin leerlo.
+    """
+    estado = os.stat(ruta)
+    return [os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns]
+
+
+def huella_ficheros(directorio, nombres):
+    """
+    Huellas de los ficheros de 'directorio' cuyos nombres aparecen en 'nombres' (p. ej. la columna
+    pdf): un PDF que se vuelve a descargar invalida la etapa aunque el nombre no cambie.
+    """
+    huellas = []
+    for nombre in sorted({str(n).strip() for n in nombres} - {"", "nan", "None"}):
+        ruta = os.path.join(directorio, nombre)
+        huellas.append(huella_fichero(ruta) if os.path.exists(ruta) else [ruta, None, None])
+    return huellas
+
+
+def huella_dataframe(df):
+    """
+    Hash del contenido de un DataFrame (valores, índice y columnas), para los datos recién scrapeados.
+    """
+    import pandas as pd
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    # Se hashea columna a columna, sin convertir antes todo el DataFrame a texto
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def seccion_ini(config, seccion, excluir=()):
+    """
+    Contenido de una sección del .ini como dict, para usarlo en la clave de una etapa.
+    """
+    if not config.has_section(seccion):
+        return {}
+    return {k: v for k, v in config.items(seccion, raw=True) if k not in excluir}
+
+
+class AlmacenEtapas:
+    """
+    Artefactos intermedios del pipeline por etapas:
+
+        crudo → normalizado (por fuente) → unificado → caracteristicas_nlp → clasificacion → publicacion
+
+    Cada artefacto es un DataFrame en pickle cuyo nombre lleva la clave de la etapa: un hash de
+    sus entradas (claves de las etapas anteriores, secciones del .ini que le afectan, huellas
+    de ficheros y versión del código de la etapa). Si al volver a ejecutar la clave no ha
+    cambiado, el artefacto se reutiliza y la etapa no se recalcula.
+
+    estado_etapas.json guarda la última clave de cada etapa y si se reutilizó o se recalculó.
+    """
+
+    def __init__(self, directorio, forzar=False, versiones_por_etapa=3):
+        self.directorio = directorio
+        # forzar=True recalcula todas las etapas (y sobrescribe sus artefactos)
+        self.forzar = forzar
+        self.versiones_por_etapa = versiones_por_etapa
+        os.makedirs(self.directorio, exist_ok=True)
+        self.ruta_estado = os.path.join(self.directorio, "estado_etapas.json")
+        self.estado = self._cargar_estado()
+
+    def _cargar_estado(self):
+        if not os.path.exists(self.ruta_estado):
+            return {}
+        try:
+            with open(self.ruta_estado, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error leyendo {self.ruta_estado}: {e}")
+            return {}
+
+    def guardar_estado(self):
+        tmp = f"{self.ruta_estado}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.ruta_estado)
+
+    @staticmethod
+    def clave(etapa, *entradas):
+        """
+        Clave de una etapa: hash de su nombre, su versión y todas sus entradas (serializables a JSON).
+        """
+        base = etapa.split(":")[0]
+        contenido = json.dumps([etapa, VERSIONES_ETAPAS.get(base, 0), entradas],
+                               sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+    def _ruta(self, etapa, clave):
+        return os.path.join(self.directorio, f"{etapa.replace(':', '_')}__{clave[:16]}.pkl")
+
+    def _registrar(self, etapa, clave, resultado, segundos):
+        base = etapa.split(":")[0]
+        self.estado[etapa] = {"clave": clave, "resultado": resultado, "segundos": round(segundos, 3),
+                              "fecha": datetime.now().isoformat(timespec="seconds")}
+        metricas.contar("etapas_total", etapa=base, resultado=resultado)
+
+    def reutilizable(self, etapa, clave):
+        return not self.forzar and os.path.exists(self._ruta(etapa, clave))
+
+    def cargar(self, etapa, clave):
+        import pandas as pd
+        return pd.read_pickle(self._ruta(etapa, clave))
+
+    def guardar(self, etapa, clave, df):
+        ruta = self._ruta(etapa, clave)
+        # Escritura atómica: un artefacto a medias nunca se confunde con uno válido
+        df.to_pickle(f"{ruta}.tmp", compression=None)
+        os.replace(f"{ruta}.tmp", ruta)
+        self._podar(etapa)
+
+    def _podar(self, etapa):
+        """
+        Conserva solo los 'versiones_por_etapa' artefactos más recientes de la etapa.
+        """
+        artefactos = sorted(glob.glob(os.path.join(self.directorio, f"{etapa.replace(':', '_')}__*.pkl")),
+                            key=os.path.getmtime, reverse=True)
+        for ruta in artefactos[self.versiones_por_etapa:]:
+            os.remove(ruta)
+
+    def obtener(self, etapa, clave, calcular):
+        """
+        Devuelve el artefacto de la etapa: lo carga si ya existe uno con esta clave o, si no,
+        lo calcula con calcular() y lo guarda.
+
+        Returns:
+            tuple: (DataFrame, reutilizado)
+        """
+        t0 = time.perf_counter()
+        if self.reutilizable(etapa, clave):
+            try:
+                df = self.cargar(etapa, clave)
+                self._registrar(etapa, clave, "reutilizada", time.perf_counter() - t0)
+                print(f"♻️ Etapa '{etapa}' sin cambios: se reutiliza el artefacto {clave[:16]}")
+                return df, True
+            except Exception as e:
+                print(f"⚠️ Artefacto de '{etapa}' ilegible ({e}), se recalcula")
+        print(f"🔹 Calculando etapa '{etapa}'...")
+        df = calcular()
+        self.guardar(etapa, clave, df)
+        self._registrar(etapa, clave, "calculada", time.perf_counter() - t0)
+        return df, False
+
+    def vigente(self, etapa, clave, salidas=()):
+        """
+        Para etapas sin artefacto propio (publicación): True si la última ejecución registró
+        esta misma clave y sus ficheros de salida siguen existiendo sin modificar.
+        """
+        registro = self.estado.get(etapa, {})
+        if self.forzar or registro.get("clave") != clave:
+            return False
+        try:
+            return registro.get("salidas") == [huella_fichero(ruta) for ruta in salidas]
+        except OSError:
+            return False
+
+    def marcar(self, etapa, clave, resultado, segundos=0.0, salidas=()):
+        self._registrar(etapa, clave, resultado, segundos)
+        self.estado[etapa]["salidas"] = [huella_fichero(ruta) for ruta in salidas]
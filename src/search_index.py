@@ -0,0 +1,269 @@
+from array import array
+import bisect
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from unidecode import unidecode
+
+NOMBRE_INDICE = "indice_busqueda.json.gz"
+VERSION_INDICE = 3
+
+
+def tokenizar_busqueda(texto, plegar=True):
+    """
+    Tokeniza un texto para el índice con el mismo plegado que el campo de búsqueda de la app
+    (minúsculas y unidecode) y se queda con las secuencias alfanuméricas.
+    Con plegar=False el texto ya viene plegado (las palabras clave de la app).
+    """
+    if texto is None:
+        return []
+    texto = str(texto)
+    return re.findall(r"[a-z0-9]+", unidecode(texto.lower()) if plegar else texto)
+
+
+def huella_csv(ruta, bloque=1 << 20):
+    """
+    Huella de licitaciones.csv tal y como está escrito en disco (tamaño + md5 del contenido),
+    para comprobar que el índice corresponde al CSV publicado sin depender de cómo pandas
+    interprete los tipos al leerlo.
+    """
+    h = hashlib.md5()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return f"{os.path.getsize(ruta)}-{h.hexdigest()}"
+
+
+class IndiceInvertido:
+    """
+    Índice invertido token → lista de documentos, usado por la app para la búsqueda por
+    palabras clave y para ordenar los resultados con BM25.
+
+    Los documentos son las posiciones de fila de licitaciones.csv. Se indexan todas sus
+    columnas, plegadas igual que el campo de búsqueda de la app, y los términos del PDF
+    limpio (lemas) de cada fila, que se guardan además aparte (postings_pdf):
+    - candidatos_csv(): superconjunto de las filas cuyo texto del CSV contiene la palabra
+      como subcadena (la app los confirma con esa misma búsqueda). Cada token de la palabra
+      se busca como subcadena de los términos del CSV con un array de sufijos ordenado del
+      vocabulario (bisect), sin recorrer el vocabulario entero.
+    - coincidencias_pdf(): filas en cuyo PDF aparecen todos los tokens de la palabra (o
+      sus lemas) como inicio de algún término. El PDF es una bolsa de lemas: en una frase
+      no se exige que las palabras vayan seguidas.
+
+    Cada lista de documentos (posting list) guarda los ids ordenados y, en las de BM25, la
+    frecuencia del token; en disco los ids se guardan como diferencias.
+    """
+
+    def __init__(self, postings=None, longitudes=None, huella="", lemas=None, postings_pdf=None,
+                 vocabulario_csv=None, k1=1.5, b=0.75):
+        self.postings = postings or {}  # token -> (ids, frecuencias), CSV + PDF (BM25)
+        self.postings_pdf = postings_pdf or {}  # token del PDF -> ids
+        self.vocabulario_csv = sorted(vocabulario_csv or ())
+        self.longitudes = longitudes or []
+        self.huella = huella
+        self.lemas = lemas or {}  # token del CSV -> tokens de sus lemas (si difieren)
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(self.longitudes)
+        self.longitud_media = (sum(self.longitudes) / self.n_docs) if self.n_docs else 0.0
+        self._terminos_pdf = sorted(self.postings_pdf)
+        self._sufijos = None
+
+    @classmethod
+    def construir(cls, df, terminos_extra=None, lemas=None, huella=""):
+        """
+        Construye el índice a partir del CSV publicado.
+
+        Args:
+            df: licitaciones.csv leído con dtype=str (mismas filas y en el mismo orden)
+            terminos_extra: dict {posición: Counter} con los términos del PDF de cada fila
+            lemas: dict palabra → lemas (la caché de lemas del NLP) para llevar las palabras
+                   clave que aparecen en el CSV a los lemas del PDF
+            huella: huella_csv del fichero publicado
+        """
+        terminos_extra = terminos_extra or {}
+        lemas = lemas or {}
+        postings = {}
+        postings_pdf = {}
+        longitudes = []
+        vocabulario_csv = set()
+        valores_columnas = [df[col].tolist() for col in df.columns]
+        for doc_id in range(len(df)):
+            frecuencias = Counter()
+            for valores in valores_columnas:
+                # str() también para los vacíos: el campo de búsqueda de la app contiene "nan"
+                frecuencias.update(tokenizar_busqueda(valores[doc_id]))
+            vocabulario_csv.update(frecuencias)
+            terminos_pdf = terminos_extra.get(doc_id, {})
+            for token in terminos_pdf:
+                postings_pdf.setdefault(token, []).append(doc_id)
+            frecuencias.update(terminos_pdf)
+            longitudes.append(sum(frecuencias.values()))
+            for token, tf in frecuencias.items():
+                ids, tfs = postings.setdefault(token, ([], []))
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        mapa_lemas = {}
+        for token in vocabulario_csv:
+            tokens_lema = tokenizar_busqueda(" ".join(lemas.get(token) or []))
+            if tokens_lema and tokens_lema != [token]:
+                mapa_lemas[token] = tokens_lema
+        print(f"✅ Índice de búsqueda construido: {len(longitudes)} documentos, {len(postings)} términos "
+              f"({len(postings_pdf)} del PDF)")
+        return cls(postings=postings, longitudes=longitudes, huella=huella, lemas=mapa_lemas,
+                   postings_pdf=postings_pdf, vocabulario_csv=vocabulario_csv)
+
+    @staticmethod
+    def _a_deltas(ids):
+        return [ids[0]] + [ids[i] - ids[i - 1] for i in range(1, len(ids))] if ids else []
+
+    @staticmethod
+    def _desde_deltas(deltas):
+        ids = []
+        acumulado = 0
+        for d in deltas:
+            acumulado += d
+            ids.append(acumulado)
+        return ids
+
+    def guardar(self, ruta):
+        postings_delta = {token: [self._a_deltas(ids), tfs] for token, (ids, tfs) in self.postings.items()}
+        pdf_delta = {token: self._a_deltas(ids) for token, ids in self.postings_pdf.items()}
+        datos = {"version": VERSION_INDICE, "huella": self.huella, "longitudes": self.longitudes,
+                 "lemas": self.lemas, "vocabulario_csv": self.vocabulario_csv,
+                 "postings": postings_delta, "postings_pdf": pdf_delta}
+        with gzip.open(ruta, "wt", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, separators=(",", ":"))
+        print(f"✅ Índice de búsqueda guardado en: {ruta}")
+
+    @classmethod
+    def cargar(cls, ruta):
+        with gzip.open(ruta, "rt", encoding="utf-8") as f:
+            datos = json.load(f)
+        if datos.get("version") != VERSION_INDICE:
+            raise ValueError(f"versión de índice {datos.get('version')} (se espera {VERSION_INDICE})")
+        postings = {token: (cls._desde_deltas(deltas), tfs) for token, (deltas, tfs) in datos["postings"].items()}
+        postings_pdf = {token: cls._desde_deltas(deltas) for token, deltas in datos["postings_pdf"].items()}
+        return cls(postings=postings, longitudes=datos["longitudes"], huella=datos.get("huella", ""),
+                   lemas=datos.get("lemas", {}), postings_pdf=postings_pdf,
+                   vocabulario_csv=datos["vocabulario_csv"])
+
+    def _idf(self, n_docs_token):
+        return math.log((self.n_docs - n_docs_token + 0.5) / (n_docs_token + 0.5) + 1)
+
+    def buscar(self, tokens, modo="OR"):
+        """
+        Busca los tokens y devuelve {doc_id: puntuación BM25}.
+        Solo recorre las listas de los tokens consultados (no todo el dataset).
+
+        Args:
+            tokens: tokens de la consulta (ver tokenizar_busqueda)
+            modo: "OR" (alguno de los tokens) o "AND" (todos los tokens)
+        """
+        tokens = list(dict.fromkeys(tokens))
+        if not tokens:
+            return {}
+        listas = [self.postings.get(token, ([], [])) for token in tokens]
+
+        candidatos = None
+        if modo == "AND":
+            # Intersección empezando por la lista más corta
+            for ids, _ in sorted(listas, key=lambda lista: len(lista[0])):
+                candidatos = set(ids) if candidatos is None else candidatos.intersection(ids)
+                if not candidatos:
+                    return {}
+
+        puntuaciones = {}
+        for ids, tfs in listas:
+            if not ids:
+                continue
+            idf = self._idf(len(ids))
+            if candidatos is None:
+                pares = zip(ids, tfs)
+            else:
+                # En modo AND solo se puntúan los candidatos (búsqueda binaria en la lista)
+                pares = ((doc_id, tfs[bisect.bisect_left(ids, doc_id)]) for doc_id in candidatos)
+            for doc_id, tf in pares:
+                norma = self.k1 * (1 - self.b + self.b * self.longitudes[doc_id] / self.longitud_media)
+                puntuaciones[doc_id] = puntuaciones.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norma)
+        return puntuaciones
+
+    def _sufijo(self, codigo):
+        return self.vocabulario_csv[codigo >> 16][codigo & 0xFFFF:]
+
+    def _docs_con_subcadena(self, token):
+        """
+        Documentos con algún término del CSV que contiene 'token'. Los sufijos de todos los
+        términos del vocabulario se ordenan una vez (término << 16 | posición, en un array de
+        enteros); los que empiezan por 'token' forman un rango contiguo que se localiza con
+        dos búsquedas binarias.
+        """
+        if self._sufijos is None:
+            codigos = [(t << 16) | i for t, termino in enumerate(self.vocabulario_csv)
+                       for i in range(min(len(termino), 0xFFFF))]
+            codigos.sort(key=self._sufijo)
+            self._sufijos = array("q", codigos)
+        # Los tokens solo tienen [a-z0-9]: todo lo que empieza por token es menor que token + "{"
+        inicio = bisect.bisect_left(self._sufijos, token, key=self._sufijo)
+        fin = bisect.bisect_left(self._sufijos, token + "{", lo=inicio, key=self._sufijo)
+        docs = set()
+        for t in {codigo >> 16 for codigo in self._sufijos[inicio:fin]}:
+            docs.update(self.postings[self.vocabulario_csv[t]][0])
+        return docs
+
+    def candidatos_csv(self, palabra):
+        """
+        Posiciones candidatas para la búsqueda por subcadena de 'palabra' (ya plegada y entera:
+        una frase no se parte) en el texto del CSV. Es un superconjunto del resultado real: hay
+        que confirmarlo con la búsqueda por subcadena. Devuelve None si la palabra no tiene
+        caracteres alfanuméricos (no se puede prefiltrar).
+        """
+        tokens = tokenizar_busqueda(palabra, plegar=False)
+        if not tokens:
+            return None
+        docs = None
+        for token in dict.fromkeys(tokens):
+            docs = self._docs_con_subcadena(token) if docs is None else docs & self._docs_con_subcadena(token)
+            if not docs:
+                break
+        return sorted(docs)
+
+    def _docs_pdf_con_prefijo(self, token):
+        inicio = bisect.bisect_left(self._terminos_pdf, token)
+        fin = bisect.bisect_left(self._terminos_pdf, token + "{", lo=inicio)
+        docs = set()
+        for termino in self._terminos_pdf[inicio:fin]:
+            docs.update(self.postings_pdf[termino])
+        return docs
+
+    def coincidencias_pdf(self, palabra):
+        """
+        Posiciones cuyo PDF contiene todos los tokens de 'palabra' (ya plegada), cada uno o
+        alguno de sus lemas como inicio de un término del PDF.
+        """
+        docs = None
+        for token in dict.fromkeys(tokenizar_busqueda(palabra, plegar=False)):
+            docs_token = set()
+            for variante in [token] + self.lemas.get(token, []):
+                docs_token |= self._docs_pdf_con_prefijo(variante)
+            docs = docs_token if docs is None else docs & docs_token
+            if not docs:
+                return []
+        return sorted(docs or ())
+
+    def terminos_consulta(self, palabras):
+        """
+        Tokens con los que se puntúan las palabras clave: sus tokens y los de sus lemas
+        (los términos del PDF son lemas).
+        """
+        terminos = []
+        for palabra in palabras:
+            for token in tokenizar_busqueda(palabra, plegar=False):
+                terminos.append(token)
+                terminos.extend(self.lemas.get(token, []))
+        return terminos
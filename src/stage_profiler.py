@@ -0,0 +1,136 @@
+import os
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+MODOS_PERFIL = ("cpu", "mem")
+
+
+def rss_pico_bytes():
+    """
+    Pico de memoria residente (RSS) del proceso en bytes, o None si no se puede medir (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+class PerfiladorEtapas:
+    """
+    Perfilado opcional por etapa del pipeline (main_scraping.py --profile cpu|mem).
+
+    - cpu: un cProfile por etapa → <etapa>.pstats y <etapa>.txt (top por tiempo acumulado).
+      Si una etapa se repite (p. ej. una vez por fuente) sus llamadas se acumulan.
+    - mem: tracemalloc → <etapa>_memoria.txt con las líneas que más memoria asignaron
+      y el pico de memoria trazada de la etapa.
+
+    En ambos modos se guarda perfil_resumen.json con la duración, el pico de RSS del
+    proceso tras cada etapa y, en modo mem, el pico trazado. Con modo=None no hace nada.
+
+    Las etapas no se anidan: una etapa abierta dentro de otra se aplana en la exterior (no
+    arranca un segundo cProfile, que Python 3.12+ rechaza, ni reinicia el pico de tracemalloc)
+    y solo se anota su duración con 'dentro_de'.
+    """
+
+    def __init__(self, modo, directorio, top=30):
+        if modo not in (None,) + MODOS_PERFIL:
+            raise ValueError(f"Modo de perfilado no válido: {modo} (usar {', '.join(MODOS_PERFIL)})")
+        self.modo = modo
+        self.directorio = directorio
+        self.top = top
+        self.perfiles = {}
+        self.resumen = []
+        self._activa = None
+        if self.modo:
+            os.makedirs(self.directorio, exist_ok=True)
+        if self.modo == "mem":
+            # Los informes de memoria se escriben por llamada (modo 'a'): se empieza de cero en cada ejecución
+            for fichero in os.listdir(self.directorio):
+                if fichero.endswith("_memoria.txt"):
+                    os.remove(os.path.join(self.directorio, fichero))
+            tracemalloc.start(25)
+
+    @contextmanager
+    def etapa(self, nombre):
+        if not self.modo:
+            yield
+            return
+
+        registro = {"etapa": nombre}
+        t0 = time.perf_counter()
+        if self._activa is not None:
+            registro["dentro_de"] = self._activa
+            try:
+                yield
+            finally:
+                registro["segundos"] = round(time.perf_counter() - t0, 3)
+                self.resumen.append(registro)
+            return
+
+        self._activa = nombre
+        if self.modo == "cpu":
+            perfil = self.perfiles.setdefault(nombre, cProfile.Profile())
+            perfil.enable()
+        else:
+            tracemalloc.reset_peak()
+            antes = self._snapshot()
+            memoria_inicial, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            self._activa = None
+            registro["segundos"] = round(time.perf_counter() - t0, 3)
+            if self.modo == "cpu":
+                perfil.disable()
+                self._guardar_cpu(nombre, perfil)
+            else:
+                memoria_final, pico = tracemalloc.get_traced_memory()
+                registro["memoria_trazada_pico_bytes"] = pico
+                registro["memoria_trazada_delta_bytes"] = memoria_final - memoria_inicial
+                self._guardar_mem(nombre, antes, self._snapshot(), pico)
+            registro["rss_pico_bytes"] = rss_pico_bytes()
+            self.resumen.append(registro)
+            print(f"🔬 Perfil {self.modo} de '{nombre}': {registro}")
+
+    @staticmethod
+    def _snapshot():
+        # Sin las asignaciones del propio tracemalloc ni de este módulo
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _guardar_cpu(self, nombre, perfil):
+        perfil.dump_stats(os.path.join(self.directorio, f"{nombre}.pstats"))
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(self.top)
+        with open(os.path.join(self.directorio, f"{nombre}.txt"), "w", encoding="utf-8") as f:
+            f.write(texto.getvalue())
+
+    def _guardar_mem(self, nombre, antes, despues, pico):
+        diferencias = despues.compare_to(antes, "lineno")
+        with open(os.path.join(self.directorio, f"{nombre}_memoria.txt"), "a", encoding="utf-8") as f:
+            f.write(f"### {nombre} — pico trazado {pico / 1024 ** 2:.1f} MiB\n")
+            for estadistica in diferencias[:self.top]:
+                f.write(f"{estadistica}\n")
+            f.write("\n")
+
+    def guardar_resumen(self):
+        if not self.modo:
+            return
+        if self.modo == "mem":
+            tracemalloc.stop()
+        ruta = os.path.join(self.directorio, "perfil_resumen.json")
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({"modo": self.modo, "rss_pico_bytes": rss_pico_bytes(), "etapas": self.resumen},
+                      f, ensure_ascii=False, indent=2)
+        print(f"🔬 Perfiles ({self.modo}) guardados en: {self.directorio}")
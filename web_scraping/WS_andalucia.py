@@ -5,18 +5,16 @@ import configparser
 from urllib.parse import urlencode, urlparse
 import re
 import pandas as pd
-from bs4 import BeautifulSoup
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
-from webdriver_manager.chrome import ChromeDriverManager
 import unicodedata
+from src.pipeline_metrics import metricas, BUCKETS_TAMANO
+from src.browser_factory import crear_navegador
+from src import html_parsing
 
 
 class ScraperAndalucia:
@@ -25,8 +23,9 @@ class ScraperAndalucia:
 
     Esta clase permite realizar scraping de licitaciones publicadas en el perfil
     de contratante de la Junta de Andalucía. Utiliza Selenium (con Chrome headless)
-    y BeautifulSoup para extraer información de la tabla principal y de los
-    detalles de cada licitación (incluyendo datos y PDF de prescripciones técnicas).
+    y lxml para extraer información
+    de la tabla principal y de los detalles de cada licitación (incluyendo datos
+    y PDF de prescripciones técnicas).
 
     Características principales:
     - Permite recorrer múltiples páginas de resultados (configurable con max_paginas).
@@ -46,6 +45,7 @@ class ScraperAndalucia:
         config.optionxform = str  
         config.read(config_file)
 
+        self.config_file = config_file
         paths = "input_output_path"
         urls = "urls"
         params = "and_params"
@@ -66,110 +66,85 @@ class ScraperAndalucia:
         self.BASE_URL = f"{self.BASE}?{urlencode(self.params)}"
         self.fecha = fecha 
 
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--window-size=1920,1080')
-
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
+        self.driver = crear_navegador(self.config_file, fuente="andalucia",
+                                      argumentos=('--headless', '--disable-blink-features=AutomationControlled',
+                                                  '--window-size=1920,1080'))
         self.wait = WebDriverWait(self.driver, self.TIMEOUT)
         os.makedirs(self.OUTPUT_DIR, exist_ok=True)
 
+    @staticmethod
+    def normalizar(texto):
+        texto = texto.lower()
+        texto = unicodedata.normalize("NFD", texto)
+        return ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
 
-    def extraer_info_licitacion_y_pdf_and(self, html: str, url_base: str, carpeta_destino="pdfs") -> dict:
-        from bs4 import BeautifulSoup
-        from urllib.parse import urljoin
-        import unicodedata
-        import os
-        import requests
+    def es_pliego_prescripciones(self, titulo, texto):
+        titulo = self.normalizar(titulo)
+        texto = self.normalizar(texto)
+        return "prescripciones tecnicas" in titulo or "prescripciones tecnicas" in texto \
+            or "ppt" in titulo or "ppt" in texto
 
-        def normalizar(texto):
-            texto = texto.lower()
-            texto = unicodedata.normalize("NFD", texto)
-            return ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    def descargar_pdf(self, url_pdf, nombre_archivo):
+        import requests
 
-        def descargar_pdf(url_pdf, nombre_archivo):
-            os.makedirs(self.OUTPUT_DIR_PDF, exist_ok=True)
-            ruta_local = os.path.join(self.OUTPUT_DIR_PDF, nombre_archivo)
-            try:
-                r = requests.get(url_pdf, stream=True)
+        os.makedirs(self.OUTPUT_DIR_PDF, exist_ok=True)
+        ruta_local = os.path.join(self.OUTPUT_DIR_PDF, nombre_archivo)
+        try:
+            with metricas.temporizador("scraper_pdf_descarga", fuente="andalucia"):
+                r = requests.get(url_pdf, stream=True, timeout=self.TIMEOUT)
                 if r.status_code == 200:
+                    n_bytes = 0
                     with open(ruta_local, "wb") as f:
                         for chunk in r.iter_content(1024):
                             f.write(chunk)
-                    print(f"✅ PDF descargado: {ruta_local}")
-                    return nombre_archivo
-                else:
-                    print(f"❌ Error al descargar: {url_pdf}")
-            except Exception as e:
-                print(f"⚠️ Excepción al descargar {url_pdf}: {e}")
-            return None
+                            n_bytes += len(chunk)
+            if r.status_code == 200:
+                metricas.contar("scraper_bytes_total", n_bytes, fuente="andalucia", tipo="pdf")
+                metricas.observar("scraper_pdf_bytes", n_bytes, buckets=BUCKETS_TAMANO, fuente="andalucia")
+                print(f"✅ PDF descargado: {ruta_local}")
+                return nombre_archivo
+            else:
+                print(f"❌ Error al descargar: {url_pdf}")
+        except Exception as e:
+            print(f"⚠️ Excepción al descargar {url_pdf}: {e}")
+        metricas.contar("scraper_errores_total", fuente="andalucia", tipo="pdf")
+        return None
+
+
+    def extraer_info_licitacion_y_pdf_and(self, html: str, url_base: str, carpeta_destino="pdfs") -> dict:
+        from urllib.parse import urljoin
 
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            raiz = html_parsing.parsear(html)
 
             # Quitar sección "Información de lotes"
-            for h2 in soup.select("h2.seccion-indice"):
-                if "información de lotes" in h2.get_text(strip=True).lower():
-                    div_lotes = h2.find_next_sibling("div", class_="contenido")
-                    if div_lotes:
-                        div_lotes.decompose()
+            for h2 in html_parsing.H2_SECCION_INDICE(raiz):
+                if "información de lotes" in html_parsing.texto(h2).lower():
+                    div_lotes = html_parsing.primero(html_parsing.DIV_CONTENIDO_HERMANO, h2)
+                    if div_lotes is not None:
+                        html_parsing.eliminar(div_lotes)
 
             resultado = {}
 
-            # --- MODO 2: div.field ---
-            for field in soup.select("div.field"):
-                label = field.select_one(".field__label")
-                item = field.select_one(".field__item")
-                if label and item:
-                    clave = label.get_text(strip=True)
-                    valor = item.get_text(strip=True)
-                    if clave and valor and clave not in resultado:
-                        resultado[clave] = valor
-
-            # --- MODO 1: div.block.ng-star-inserted ---
-            for bloque in soup.select("div.block.ng-star-inserted"):
-                label = bloque.select_one(".field__label")
-                item = bloque.select_one(".field__item")
-                if label and item:
-                    clave = label.get_text(strip=True)
-                    valor = item.get_text(strip=True)
-                    if clave and valor and clave not in resultado:
-                        resultado[clave] = valor
-
-            # --- MODO 3: <b>: <span> ---
-            for div in soup.select("div.contenido"):
-                for tag in div.find_all(["b", "strong"]):
-                    clave = tag.get_text(strip=True).rstrip(":")
-                    span = None
-                    for sib in tag.next_siblings:
-                        if getattr(sib, "name", None) == "span":
-                            span = sib
-                            break
-                    if span:
-                        valor = span.get_text(strip=True)
-                    else:
-                        textos = list(tag.parent.stripped_strings)
-                        valor = ' '.join(textos[1:]) if len(textos) > 1 else ""
-                    if clave and valor and clave not in resultado:
-                        resultado[clave] = valor
+            # --- MODO 2: div.field, MODO 1: div.block.ng-star-inserted y MODO 3: <b>: <span> ---
+            # (en ese orden: si una clave aparece en varios, se queda el primer valor)
+            pares = (html_parsing.pares_field(raiz)
+                     + html_parsing.pares_field(raiz, selector=html_parsing.DIV_BLOQUE_NG)
+                     + html_parsing.pares_negrita_span(raiz))
+            for clave, valor in pares:
+                if clave and valor and clave not in resultado:
+                    resultado[clave] = valor
 
             # --- Buscar PDF prescripciones técnicas ---
-            for h2 in soup.select("h2.seccion-indice"):
-                if "documentacion complementaria" in normalizar(h2.get_text(strip=True)):
-                    contenedor = h2.find_next("div")
-                    if contenedor:
-                        for link in contenedor.find_all("a", href=True):
-                            titulo = normalizar(link.get("title", ""))
-                            texto_link = normalizar(link.get_text(strip=True))
-                            if "prescripciones tecnicas" in titulo or "prescripciones tecnicas" in texto_link \
-                            or "ppt" in titulo or "ppt" in texto_link:
-                                url_pdf = urljoin(url_base, link["href"])
+            for h2 in html_parsing.H2_SECCION_INDICE(raiz):
+                if "documentacion complementaria" in self.normalizar(html_parsing.texto(h2)):
+                    contenedor = html_parsing.primero(html_parsing.DIV_SIGUIENTE, h2)
+                    if contenedor is not None:
+                        for link in html_parsing.ENLACES(contenedor):
+                            if self.es_pliego_prescripciones(link.get("title", ""), html_parsing.texto(link)):
+                                url_pdf = urljoin(url_base, link.get("href"))
                                 nombre_archivo = 'and_pliego_prescripciones_' + url_pdf.split("/")[-1] + ".pdf"
-                                nombre_guardado = descargar_pdf(url_pdf, nombre_archivo)
+                                nombre_guardado = self.descargar_pdf(url_pdf, nombre_archivo)
                                 if nombre_guardado:
                                     resultado["PDF Prescripciones Técnicas"] = nombre_guardado
                                 break  # solo queremos el primero
@@ -198,7 +173,9 @@ class ScraperAndalucia:
         except:
             print("❌ Timeout: no se encontró contenido estructurado")
 
-        detalle_dict = self.extraer_info_licitacion_y_pdf_and(html=self.driver.page_source, url_base=enlace_completo)
+        html = self.driver.page_source
+        metricas.contar("scraper_bytes_total", len(html), fuente="andalucia", tipo="detalle")
+        detalle_dict = self.extraer_info_licitacion_y_pdf_and(html=html, url_base=enlace_completo)
 
         self.driver.close()
         self.driver.switch_to.window(self.driver.window_handles[0])
@@ -222,6 +199,7 @@ class ScraperAndalucia:
         pagina = 1
 
         while True:
+            t_pagina = time.perf_counter()
             try:
                 self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.p-datatable-table")))
             except TimeoutException:
@@ -229,36 +207,38 @@ class ScraperAndalucia:
                 break
 
             time.sleep(1.5)
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            tabla = soup.select_one('table.p-datatable-table')
-            if not tabla:
+            raiz = html_parsing.parsear(self.driver.page_source)
+            tabla = html_parsing.primero(html_parsing.TABLA_RESULTADOS_AND, raiz)
+            if tabla is None:
                 print("ℹ️ No se encontró la tabla de resultados.")
                 break
 
-            cabeceras = [th.get_text(strip=True) for th in tabla.select('thead th')]
-            filas = tabla.select('tbody tr')
+            cabeceras = [html_parsing.texto(th) for th in html_parsing.CABECERAS_THEAD(tabla)]
+            filas = html_parsing.FILAS_TBODY(tabla)
             if not filas:
                 print("ℹ️ La tabla existe pero no contiene filas.")
                 break
 
             print(f"📄 Página {pagina}")
             for fila in filas:
-                celdas = fila.find_all('td')
+                celdas = html_parsing.CELDAS(fila)
                 if len(celdas) < len(cabeceras):
                     continue
 
-                fila_dict = {cabeceras[i]: celdas[i].get_text(strip=True) for i in range(len(cabeceras))}
-                enlace_tag = celdas[0].find('a', href=True)
+                fila_dict = {cabeceras[i]: html_parsing.texto(celdas[i]) for i in range(len(cabeceras))}
+                enlace_tag = html_parsing.primero(html_parsing.ENLACES, celdas[0])
                 dom_base = f"{urlparse(self.BASE).scheme}://{urlparse(self.BASE).netloc}"
-                enlace_completo = (dom_base + enlace_tag['href']) if enlace_tag else ''
+                enlace_completo = (dom_base + enlace_tag.get('href')) if enlace_tag is not None else ''
                 fila_dict['URL'] = enlace_completo
 
-                detalle_dict = self.extraer_info_completa(enlace_completo)
+                with metricas.temporizador("scraper_detalle", fuente="andalucia"):
+                    detalle_dict = self.extraer_info_completa(enlace_completo)
                 for clave, valor in detalle_dict.items():
                     if not fila_dict.get(clave):
                         fila_dict[clave] = valor
 
                 all_rows.append(fila_dict)
+            metricas.observar("scraper_pagina_segundos", time.perf_counter() - t_pagina, fuente="andalucia")
 
             try:
                 boton = self.driver.find_element(By.XPATH, "//div[@id='divPaginador']//button[contains(text(), 'SIGUIENTE')]")
@@ -1,11 +1,7 @@
 import configparser
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
 import re
 import unicodedata
 import os
@@ -15,6 +11,9 @@ from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from src.pipeline_metrics import metricas, BUCKETS_TAMANO
+from src.browser_factory import crear_navegador
+from src import html_parsing
 
 class ScraperEspana:
     def __init__(self, fecha, config_file="./config/scraper_config.ini", fecha_minima=None):
@@ -54,13 +53,9 @@ class ScraperEspana:
                 self.filters[key] = None
 
         self.fecha = fecha
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        self.driver = crear_navegador(config_file, fuente="espana",
+                                      argumentos=("--headless", "--no-sandbox", "--disable-dev-shm-usage",
+                                                  "--window-size=1920,1080"))
         self.wait = WebDriverWait(self.driver, self.TIMEOUT)
 
     def configurar_filtros(self):
@@ -112,15 +107,10 @@ class ScraperEspana:
             time.sleep(3)
             print(f"➡️ Detalle abierto correctamente: {enlace}")
 
-            # 👉 Extraer campos generales
-            bloques = self.driver.find_elements(By.CSS_SELECTOR, "ul.altoDetalleLicitacion")
-            for ul in bloques:
+            # 👉 Extraer campos generales (un solo page_source en lugar de dos llamadas al driver por campo)
+            raiz = html_parsing.parsear(self.driver.page_source)
+            for clave, valor in html_parsing.pares_tipo3_outputtext(raiz):
                 try:
-                    label = ul.find_element(By.CSS_SELECTOR, "span.tipo3")
-                    value = ul.find_element(By.CSS_SELECTOR, "span.outputText")
-                    clave = label.get_attribute("title") or label.text.strip()
-                    valor = value.get_attribute("title") or value.text.strip()
-
                     if "fecha" in clave.lower() and "límite" in clave.lower():
                         try:
                             fecha_limite = pd.to_datetime(valor, dayfirst=True)
@@ -158,11 +148,17 @@ class ScraperEspana:
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         nombre_pdf = f"esp_pliego_prescripciones_{timestamp}.pdf"
                         ruta = os.path.join(self.OUTPUT_DIR_PDF, nombre_pdf)
-                        r = requests.get(href, stream=True)
+                        with metricas.temporizador("scraper_pdf_descarga", fuente="espana"):
+                            r = requests.get(href, stream=True)
+                            if r.status_code == 200:
+                                n_bytes = 0
+                                with open(ruta, 'wb') as f:
+                                    for chunk in r.iter_content(1024):
+                                        f.write(chunk)
+                                        n_bytes += len(chunk)
                         if r.status_code == 200:
-                            with open(ruta, 'wb') as f:
-                                for chunk in r.iter_content(1024):
-                                    f.write(chunk)
+                            metricas.contar("scraper_bytes_total", n_bytes, fuente="espana", tipo="pdf")
+                            metricas.observar("scraper_pdf_bytes", n_bytes, buckets=BUCKETS_TAMANO, fuente="espana")
                             print(f"✅ PDF guardado en: {ruta}")
                             detalle["PDF Pliego Prescripciones Técnicas"] = nombre_pdf
                         else:
@@ -180,8 +176,12 @@ class ScraperEspana:
                     pdf_url = enlace_pdf.get_attribute("href")
                     if pdf_url:
                         print(f"📥 Encontrado PDF en la segunda tabla: {pdf_url}")
-                        response = requests.get(pdf_url)
+                        with metricas.temporizador("scraper_pdf_descarga", fuente="espana"):
+                            response = requests.get(pdf_url)
                         if response.status_code == 200:
+                            metricas.contar("scraper_bytes_total", len(response.content), fuente="espana", tipo="pdf")
+                            metricas.observar("scraper_pdf_bytes", len(response.content), buckets=BUCKETS_TAMANO,
+                                              fuente="espana")
                             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                             nombre_pdf = f"esp_pliego_prescripciones_{timestamp}.pdf"
                             ruta = os.path.join(self.OUTPUT_DIR_PDF, nombre_pdf)
@@ -206,6 +206,7 @@ class ScraperEspana:
 
         except Exception as e:
             print(f"❌ Error general en extracción de detalle: {e}")
+            metricas.contar("scraper_errores_total", fuente="espana", tipo="detalle")
             # ✅ Último intento de recuperar la sesión base
             try:
                 if len(self.driver.window_handles) > 1:
@@ -238,7 +239,8 @@ class ScraperEspana:
                     "enlace": enlace
                 }
 
-                detalle = self.extraer_detalle(enlace)
+                with metricas.temporizador("scraper_detalle", fuente="espana"):
+                    detalle = self.extraer_detalle(enlace)
                 if detalle is not None:
                     licitacion = {**base, **detalle}
                     licitaciones.append(licitacion)
@@ -255,7 +257,8 @@ class ScraperEspana:
 
         while True:
             print(f"📄 Procesando página {pagina}")
-            licitaciones = self.extraer_pagina()
+            with metricas.temporizador("scraper_pagina", fuente="espana"):
+                licitaciones = self.extraer_pagina()
             for lic in licitaciones:
                 lic["pagina"] = pagina
             todas_licitaciones.extend(licitaciones)
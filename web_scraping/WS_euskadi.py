@@ -4,24 +4,29 @@ import time
 import configparser
 import re
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
 import unicodedata
+from src.pipeline_metrics import metricas
+from src.browser_factory import crear_navegador
+from src import html_parsing
 
 class ScraperEuskadi:
     """
     ScraperEuskadi
 
-    Scraper para la Agencia Vasca del Agua (URA). Recorre las páginas de anuncios abiertos,
-    extrae datos de la tabla y detalles de cada licitación.
+    Scraper para la Agencia Vasca del Agua (URA). Recorre con Selenium las páginas de anuncios
+    abiertos recogiendo las filas de la tabla y después descarga por HTTP, en paralelo, el
+    detalle de cada licitación.
     """
 
     def __init__(self, fecha, fecha_minima, config_file="./config/scraper_config.ini"):
@@ -48,94 +53,123 @@ class ScraperEuskadi:
         self.MAX_PAGINAS = None if (max_paginas_str.strip().lower() in ["none", ""]) else int(max_paginas_str)
         self.TIMEOUT = config.getint(params, "timeout", fallback=30)
         self.FECHA_MINIMA = fecha_minima
+        # Detalles descargados a la vez por HTTP (1 = de uno en uno)
+        self.HILOS_DETALLE = max(1, config.getint(params, "hilos_detalle", fallback=8))
+        self._hilos = threading.local()
         self.fecha = fecha 
 
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
+        self.driver = crear_navegador(config_file, fuente="euskadi",
+                                      argumentos=("--headless", "--no-sandbox", "--disable-dev-shm-usage",
+                                                  "--window-size=1920,1080"))
         self.wait = WebDriverWait(self.driver, self.TIMEOUT)
         os.makedirs(self.OUTPUT_DIR, exist_ok=True)
 
     def extraer_pagina(self):
         """
-        Extrae la tabla de la página actual y los detalles de cada licitación.
+        Lee las filas de la tabla de la página actual (código, título y enlace al detalle)
+        de una sola vez desde el HTML, sin guardar WebElements que puedan quedar obsoletos.
         """
-        tabla = self.driver.find_element(By.ID, "tablaWidget")
-        filas = tabla.find_elements(By.XPATH, ".//tbody//tr")
+        raiz = html_parsing.parsear(self.driver.page_source)
+        url_actual = self.driver.current_url
 
         licitaciones = []
-        for fila in filas:
+        for fila in html_parsing.FILAS_TABLA_EUS(raiz):
             try:
-                celdas = fila.find_elements(By.TAG_NAME, "td")
+                celdas = html_parsing.CELDAS(fila)
                 if not celdas:
                     continue
 
-                codigo = celdas[0].text.strip()
-                enlace_elem = fila.find_element(By.TAG_NAME, "a")
-                enlace = enlace_elem.get_attribute("href")
-                titulo = enlace_elem.text.strip()
+                codigo = html_parsing.texto(celdas[0], " ")
+                enlace_elem = html_parsing.primero(html_parsing.PRIMER_ENLACE, fila)
+                enlace = urljoin(url_actual, enlace_elem.get("href"))
+                titulo = html_parsing.texto(enlace_elem, " ")
 
-                licitacion = {
+                licitaciones.append({
                     'codigo_expediente': codigo,
                     'titulo': titulo,
                     'enlace_detalle': enlace
-                }
-
-                detalle = self.extraer_detalle(enlace)
-                if detalle is not None:
-                    licitacion.update(detalle)
-                    licitaciones.append(licitacion)
-                    print(f"Extraída: {titulo[:50]}...")
+                })
 
             except:
+                metricas.contar("scraper_errores_total", fuente="euskadi", tipo="fila")
                 continue
 
         return licitaciones
 
-    def extraer_detalle(self, url):
+    def _sesion_http(self):
         """
-        Visita el detalle de la licitación y extrae la información disponible.
-        Filtra por FECHA_MINIMA si corresponde.
+        Sesión HTTP del hilo actual (una por hilo), con reintentos y las cookies y el
+        User-Agent del navegador para que el portal sirva el detalle igual que a Chrome.
         """
-        self.driver.get(url)
-        time.sleep(2)
+        sesion = getattr(self._hilos, "sesion", None)
+        if sesion is None:
+            sesion = requests.Session()
+            sesion.headers.update(self._cabeceras_http)
+            reintentos = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+            sesion.mount("http://", HTTPAdapter(max_retries=reintentos))
+            sesion.mount("https://", HTTPAdapter(max_retries=reintentos))
+            for cookie in self._cookies_navegador:
+                sesion.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"),
+                                   path=cookie.get("path", "/"))
+            self._hilos.sesion = sesion
+        return sesion
 
+    def extraer_detalle(self, url):
+        """
+        Descarga por HTTP el detalle de la licitación y extrae los campos de la cabeceraDetalle.
+        Filtra por FECHA_MINIMA si corresponde (devuelve None).
+        """
         detalle = {}
         try:
-            cabecera = self.driver.find_element(By.CLASS_NAME, "cabeceraDetalle")
-            soup = BeautifulSoup(cabecera.get_attribute('innerHTML'), 'html.parser')
-
-            for dt in soup.find_all('dt'):
-                campo = dt.get_text(strip=True).replace(':', '').strip()
-                dd = dt.find_next_sibling('dd')
-                if dd:
-                    valor = dd.get_text(strip=True)
-                    campo_limpio = re.sub(r'[^\w\s]', '', campo.lower())
-                    campo_limpio = re.sub(r'\s+', '_', campo_limpio.strip())
-
-                    if campo_limpio == 'fecha_de_publicacion':
-                        try:
-                            fecha_valor = pd.to_datetime(valor, dayfirst=True)
-                            if fecha_valor < self.FECHA_MINIMA:
-                                return None
-                        except:
-                            pass
-
-                    detalle[campo_limpio] = valor
-        except:
-            pass
+            with metricas.temporizador("scraper_detalle", fuente="euskadi"):
+                response = self._sesion_http().get(url, timeout=self.TIMEOUT)
+                response.raise_for_status()
+            metricas.contar("scraper_bytes_total", len(response.content), fuente="euskadi", tipo="detalle")
+            cabecera = html_parsing.primero(html_parsing.DIV_CABECERA_DETALLE, html_parsing.parsear(response.content))
+            if cabecera is None:
+                return detalle
+
+            for campo, valor in html_parsing.pares_dt_dd(cabecera):
+                campo = campo.replace(':', '').strip()
+                campo_limpio = re.sub(r'[^\w\s]', '', campo.lower())
+                campo_limpio = re.sub(r'\s+', '_', campo_limpio.strip())
+
+                if campo_limpio == 'fecha_de_publicacion':
+                    try:
+                        fecha_valor = pd.to_datetime(valor, dayfirst=True)
+                        if fecha_valor < self.FECHA_MINIMA:
+                            return None
+                    except:
+                        pass
+
+                detalle[campo_limpio] = valor
+        except Exception as e:
+            print(f"⚠️ Error extrayendo detalle {url}: {e}")
+            metricas.contar("scraper_errores_total", fuente="euskadi", tipo="detalle")
 
-        self.driver.back()
-        time.sleep(1)
         return detalle
 
+    def extraer_detalles(self, licitaciones):
+        """
+        Descarga en paralelo (HILOS_DETALLE hilos) los detalles de todas las licitaciones
+        recogidas del listado y los añade a cada fila, en el orden del listado.
+        """
+        self._cookies_navegador = self.driver.get_cookies()
+        self._cabeceras_http = {"User-Agent": self.driver.execute_script("return navigator.userAgent;")}
+
+        with ThreadPoolExecutor(max_workers=self.HILOS_DETALLE, thread_name_prefix="detalle_eus") as pool:
+            detalles = list(pool.map(lambda lic: self.extraer_detalle(lic['enlace_detalle']), licitaciones))
+
+        resultado = []
+        for licitacion, detalle in zip(licitaciones, detalles):
+            if detalle is not None:
+                pagina = licitacion.pop('pagina')
+                licitacion.update(detalle)
+                licitacion['pagina'] = pagina
+                resultado.append(licitacion)
+                print(f"Extraída: {licitacion['titulo'][:50]}...")
+        return resultado
+
     def siguiente_pagina(self):
         """
         Intenta pasar a la siguiente página del paginador.
@@ -161,9 +195,11 @@ class ScraperEuskadi:
         todas_licitaciones = []
         pagina = 1
 
+        # 1) Recorrer el listado recogiendo solo las filas y sus enlaces: el navegador no sale de la tabla
         while True:
             print(f"📄 Página {pagina}")
-            licitaciones = self.extraer_pagina()
+            with metricas.temporizador("scraper_pagina", fuente="euskadi"):
+                licitaciones = self.extraer_pagina()
 
             for lic in licitaciones:
                 lic['pagina'] = pagina
@@ -177,7 +213,9 @@ class ScraperEuskadi:
 
             pagina += 1
 
-        return todas_licitaciones
+        # 2) Detalles por HTTP, en paralelo
+        print(f"🔎 {len(todas_licitaciones)} licitaciones en el listado, descargando detalles...")
+        return self.extraer_detalles(todas_licitaciones)
     def limpiar_nombre_columna(self, nombre):
         """
         Limpia un nombre de columna:
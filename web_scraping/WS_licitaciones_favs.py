@@ -1,17 +1,14 @@
 import os
-import time
 import configparser
 import re
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
 from datetime import datetime
+from src import html_parsing
+from src.browser_factory import crear_navegador
 
 class ScraperLicFav:
     """
@@ -41,33 +38,37 @@ ESCRIBIR
         self.fecha_ultima_eje = pd.to_datetime(fecha_ultima_eje)
         self.fecha = fecha
 
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--window-size=1920,1080')
-
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
+        self.driver = crear_navegador(config_file, fuente="favoritas",
+                                      argumentos=('--headless', '--disable-blink-features=AutomationControlled',
+                                                  '--window-size=1920,1080'))
         self.wait = WebDriverWait(self.driver, self.TIMEOUT)
         os.makedirs(self.OUTPUT_DIR_FAV, exist_ok=True)
 
+    def esperar_secciones(self, selector):
+        """
+        Con carga eager, get() vuelve en cuanto el HTML está parseado y el contenido que
+        pinta JavaScript (la ficha Angular de Andalucía) puede no estar aún: se espera a las
+        secciones que se leen. Si no aparecen, se analiza la página tal cual (puede no tenerlas).
+        """
+        try:
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        except TimeoutException:
+            print(f"⚠️ Timeout esperando '{selector}', se analiza la página tal cual")
+
     def extraer_info_pagina_and(self,url):
         nuevos_documentos = []
         try:
             self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-            time.sleep(1)
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
+            self.esperar_secciones("h2.seccion-indice")
+            raiz = html_parsing.parsear(self.driver.page_source)
 
-            h2_doc = soup.find("h2", string=lambda t: t and "documentación complementaria" in t.lower())
-            if h2_doc:
+            h2_doc = html_parsing.titulo_que_contiene(raiz, "documentación complementaria")
+            if h2_doc is not None:
                 print("✅ Se encontró 'Documentación complementaria")
-                div_contenido = h2_doc.find_next(lambda tag: tag.name == "div" and "contenido" in tag.get("class", []))
-                if div_contenido:
-                    for p in div_contenido.find_all("p"):
-                        texto = p.get_text(strip=True)
+                div_contenido = html_parsing.primero(html_parsing.DIV_CONTENIDO_SIGUIENTE, h2_doc)
+                if div_contenido is not None:
+                    for p in html_parsing.PARRAFOS(div_contenido):
+                        texto = html_parsing.texto(p)
                         fechas_encontradas = re.findall(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}", texto)
                         for fecha_str in fechas_encontradas:
                             try:
@@ -91,23 +92,22 @@ ESCRIBIR
         nuevos_documentos = []
         try:
             self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-            time.sleep(1)
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
+            self.esperar_secciones("span[title='Resumen Licitación'], span.outputText[id*='FechaActualizacion']")
+            raiz = html_parsing.parsear(self.driver.page_source)
 
             # --- Caso 1: tabla tras Resumen Licitación ---
-            span_resumen = soup.find("span", attrs={"title": "Resumen Licitación"})
-            if span_resumen:
-                tabla = span_resumen.find_next("table")
-                if tabla:
+            span_resumen = html_parsing.primero(html_parsing.SPAN_RESUMEN_LICITACION, raiz)
+            if span_resumen is not None:
+                tabla = html_parsing.primero(html_parsing.TABLA_SIGUIENTE, span_resumen)
+                if tabla is not None:
                     print("✅ Se encontró 'Resumen Licitación'")
-                    for fila in tabla.select("tbody tr"):
-                        fecha_div = fila.select_one("td.fechaPubLeft div")
-                        tipo_div = fila.select_one("td.tipoDocumento div")
+                    for fila in html_parsing.FILAS_TBODY(tabla):
+                        fecha_div = html_parsing.primero(html_parsing.DIV_FECHA_PUB, fila)
+                        tipo_div = html_parsing.primero(html_parsing.DIV_TIPO_DOCUMENTO, fila)
 
-                        if fecha_div and tipo_div:
-                            fecha_texto = fecha_div.get_text(strip=True)
-                            tipo_texto = tipo_div.get_text(strip=True)
+                        if fecha_div is not None and tipo_div is not None:
+                            fecha_texto = html_parsing.texto(fecha_div)
+                            tipo_texto = html_parsing.texto(tipo_div)
                             try:
                                 fecha_doc = datetime.strptime(fecha_texto, "%d/%m/%Y %H:%M:%S")
                                 if fecha_doc >= self.fecha_ultima_eje:
@@ -129,10 +129,10 @@ ESCRIBIR
                 print("⚠️ No se encontró 'Resumen Licitación'")
 
             # --- Caso 2: Fecha actualización ---
-            span_fecha = soup.find("span", class_="outputText", id=lambda x: x and "FechaActualizacion" in x)
-            if span_fecha:
+            span_fecha = html_parsing.primero(html_parsing.SPAN_FECHA_ACTUALIZACION, raiz)
+            if span_fecha is not None:
                 print("✅ Se encontró 'Fecha de Actualización'")
-                fecha_texto = span_fecha.get_text(strip=True)
+                fecha_texto = html_parsing.texto(span_fecha)
                 try:
                     fecha_actualizacion = datetime.strptime(fecha_texto, "%d/%m/%Y %H:%M")
                     if fecha_actualizacion >= self.fecha_ultima_eje:
@@ -156,17 +156,16 @@ ESCRIBIR
         nuevos_documentos = []
         try:
             self.driver.get(url)
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-            time.sleep(1)
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
+            self.esperar_secciones("div.field--name-field-titulo, h2")
+            raiz = html_parsing.parsear(self.driver.page_source)
 
-            h2_pliegos = soup.find("h2", string=lambda s: s and "pliegos de condiciones" in s.lower())
-            if not h2_pliegos:
+            h2_pliegos = html_parsing.titulo_que_contiene(raiz, "pliegos de condiciones")
+            if h2_pliegos is None:
                 print("⚠️ No se encontró 'Pliegos de condiciones'.")
             else:
                 print("✅ Se encontró 'Pliegos de condiciones'")
-                for div in h2_pliegos.find_all_next("div", class_="field--name-field-titulo"):
-                    texto = div.get_text(strip=True)
+                for div in html_parsing.DIVS_TITULO_SIGUIENTES(h2_pliegos):
+                    texto = html_parsing.texto(div)
                     texto_normalizado = re.sub(r'\s+', ' ', texto).strip()
                     parte_texto = texto_normalizado.split('(')[0].strip()
                     match = re.search(r"Publicado el (\d{1,2}) de (\w+) del (\d{4}) (\d{2}:\d{2})", texto_normalizado)
@@ -213,16 +212,22 @@ ESCRIBIR
         df.to_csv(path, index=False, sep="\t", encoding="utf-8-sig")
         print(f"✅ Archivo guardado: {path}")
 
-    def ejecutar(self):
+    def ejecutar(self, progreso=None):
         """
         Ejecuta el scraping y guarda los datos en CSV.
         Devuelve un DataFrame con los datos extraídos.
+
+        Args:
+            progreso: callable opcional que recibe un dict por licitación procesada
+                      ({'indice', 'total', 'url', 'fuente', 'nuevos_documentos', 'error'})
         """
         df_copy = self.df.copy()
         row_nuevos_documentos = []
-        for _, row in self.df.iterrows():
+        total = len(self.df)
+        for i, (_, row) in enumerate(self.df.iterrows()):
             url = row[self.url_col]
             fuente = row[self.fuente_col]
+            error = None
             try:
                 if fuente == 'Andalucía':
                     print(f"Buscando actualizaciones en Andalucía para {url}")
@@ -238,6 +243,11 @@ ESCRIBIR
                     row_nuevos_documentos.append({})
             except Exception as e:
                 print(f"❌ Error en URL {url}: {e}")
+                error = str(e)
+                row_nuevos_documentos.append({})
+            if progreso:
+                progreso({'indice': i + 1, 'total': total, 'url': url, 'fuente': fuente,
+                          'nuevos_documentos': len(row_nuevos_documentos[-1]), 'error': error})
         self.driver.quit()
         df_copy['Nuevos Documentos'] = row_nuevos_documentos
         df_copy['Actualización'] = df_copy['Nuevos Documentos'].apply(lambda x: bool(x))
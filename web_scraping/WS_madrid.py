@@ -1,5 +1,4 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 from time import sleep
@@ -9,6 +8,8 @@ import configparser
 import os
 import re
 import unicodedata
+from src.pipeline_metrics import metricas
+from src import html_parsing
 
 class ScraperMadrid:
     def __init__(self, fecha, config_file="./config/scraper_config.ini", fecha_minima=None):
@@ -57,58 +58,57 @@ class ScraperMadrid:
         try:
             response = self.session.get(enlace, timeout=self.TIMEOUT)
             response.raise_for_status()
+            metricas.contar("scraper_bytes_total", len(response.content), fuente="madrid", tipo="detalle")
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            raiz = html_parsing.parsear(response.content)
             detalle = {}
 
-            fields = soup.find_all('div', class_='field')
-            for field in fields:
-                label_elem = field.find(class_='field__label')
-                value_elem = field.find(class_='field__item')
+            for label, content in html_parsing.pares_field(raiz, separador=" "):
+                label = label.replace(':', '')
 
-                if label_elem and value_elem:
-                    label = label_elem.get_text(strip=True).replace(':', '')
-                    content = value_elem.get_text(" ", strip=True)
+                campo_limpio = re.sub(r'[^\w\s]', '', label.lower())
+                campo_limpio = re.sub(r'\s+', '_', campo_limpio.strip())
 
-                    campo_limpio = re.sub(r'[^\w\s]', '', label.lower())
-                    campo_limpio = re.sub(r'\s+', '_', campo_limpio.strip())
+                if campo_limpio == 'fecha_y_hora_limite_de_presentacion_de_ofertas_o_solicitudes_de_participacion':
+                    fecha_dt = pd.to_datetime(content, dayfirst=True, errors='coerce')
+                    if pd.notnull(fecha_dt) and fecha_dt < self.FECHA_MINIMA:
+                        return None
 
-                    if campo_limpio == 'fecha_y_hora_limite_de_presentacion_de_ofertas_o_solicitudes_de_participacion':
-                        fecha_dt = pd.to_datetime(content, dayfirst=True, errors='coerce')
-                        if pd.notnull(fecha_dt) and fecha_dt < self.FECHA_MINIMA:
-                            return None
-
-                    detalle[campo_limpio] = content
+                detalle[campo_limpio] = content
 
             return detalle
 
         except Exception as e:
             print(f"⚠️ Error extrayendo detalle: {e}")
+            metricas.contar("scraper_errores_total", fuente="madrid", tipo="detalle")
             return {}
 
     def extraer_pagina(self):
         try:
-            response = self.session.get(f"{self.base_url}/contratos", params=self.params, timeout=self.TIMEOUT)
-            response.raise_for_status()
+            with metricas.temporizador("scraper_listado", fuente="madrid"):
+                response = self.session.get(f"{self.base_url}/contratos", params=self.params, timeout=self.TIMEOUT)
+                response.raise_for_status()
+            metricas.contar("scraper_bytes_total", len(response.content), fuente="madrid", tipo="listado")
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            raiz = html_parsing.parsear(response.content)
             contratos = []
 
-            contract_items = soup.select('div.contratos-result li')
+            contract_items = html_parsing.ITEMS_RESULTADOS_MAD(raiz)
             for item in contract_items:
-                link_elem = item.find('a')
-                if not link_elem:
+                link_elem = html_parsing.primero(html_parsing.PRIMER_ENLACE, item)
+                if link_elem is None:
                     continue
 
-                enlace = urljoin(self.base_url, link_elem['href'])
-                titulo = link_elem.get_text(strip=True)
+                enlace = urljoin(self.base_url, link_elem.attrib['href'])
+                titulo = html_parsing.texto(link_elem)
 
                 contrato = {
                     'titulo': titulo,
                     'enlace_detalle': enlace
                 }
 
-                detalle = self.extraer_detalle(enlace)
+                with metricas.temporizador("scraper_detalle", fuente="madrid"):
+                    detalle = self.extraer_detalle(enlace)
                 if detalle is not None:
                     contrato.update(detalle)
                     contratos.append(contrato)
@@ -118,6 +118,7 @@ class ScraperMadrid:
 
         except Exception as e:
             print(f"⚠️ Error extrayendo página: {e}")
+            metricas.contar("scraper_errores_total", fuente="madrid", tipo="listado")
             return []
 
     def siguiente_pagina(self):
@@ -130,7 +131,8 @@ class ScraperMadrid:
 
         while True:
             print(f"📄 Procesando página {pagina + 1}")
-            contratos = self.extraer_pagina()
+            with metricas.temporizador("scraper_pagina", fuente="madrid"):
+                contratos = self.extraer_pagina()
 
             if not contratos:
                 print(f"ℹ️ No se encontraron contratos en página {pagina + 1}")